@@ -0,0 +1,70 @@
+"""
+Benchmark suite for the serializers and hot API views (pytest-benchmark). Not part of the regular test run:
+
+    pytest benchmarks                                        # run and print timings
+    pytest benchmarks -k "not 100000"                        # skip the slow 100k-row cases
+    pytest benchmarks --benchmark-save=baseline              # store a run in benchmarks/baselines/<machine>/
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=median:15%
+                                                             # compare with the latest stored run; fail on a >15% slowdown
+
+Data is seeded once per run into the test database: a doctor with PATIENT_COUNT patients, one of whom has
+SUMMARY_SESSIONS short sessions and a session of SESSION_READINGS readings.
+"""
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from django.utils import timezone
+
+from accounts.models import CustomUser, PatientProfile
+from gamesession.ingest import METRIC_FIELDS
+from gamesession.models import Game, Session
+from gamesession.writers import BulkCreateWriter
+
+PATIENT_COUNT = 300
+SUMMARY_SESSIONS = 200
+SUMMARY_SESSION_READINGS = 100
+SESSION_READINGS = 20_000
+BASELINES = Path(__file__).parent / "baselines"
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # keep stored runs next to the suite, whichever directory pytest is started from
+    if config.getoption("benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{BASELINES}"
+
+def seed_session(session, count):
+    timestamps = [session.start_time + timedelta(seconds=i) for i in range(count)]
+    values = np.random.default_rng(session.id).uniform(0, 1, size=(count, len(METRIC_FIELDS)))
+    BulkCreateWriter().write(session.id, timestamps, values)
+
+@pytest.fixture(scope="session")
+def bench_data(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        doctor = CustomUser.objects.create_user(email="bench-doctor@example.com", username="bench-doctor",
+                                                password="bench", is_doctor=True)
+        # bulk_create skips the profile signal and password hashing, which would dominate the setup
+        users = CustomUser.objects.bulk_create([
+            CustomUser(email=f"bench-patient-{i}@example.com", username=f"bench-patient-{i}", is_patient=True)
+            for i in range(PATIENT_COUNT)
+        ])
+        PatientProfile.objects.bulk_create([PatientProfile(user=user, doctor=doctor.doctor_profile) for user in users])
+        patient = users[0]
+
+        game = Game.objects.create(name="Benchmark")
+        start = timezone.now() - timedelta(days=SUMMARY_SESSIONS + 1)
+        sessions = Session.objects.bulk_create([
+            Session(patient=patient, game=game, start_time=start + timedelta(days=i),
+                    end_time=start + timedelta(days=i, seconds=SUMMARY_SESSION_READINGS))
+            for i in range(SUMMARY_SESSIONS)
+        ])
+        for session in sessions:
+            seed_session(session, SUMMARY_SESSION_READINGS)
+        long_session = Session.objects.create(patient=patient, game=game, start_time=timezone.now() - timedelta(days=1))
+        seed_session(long_session, SESSION_READINGS)
+        long_session.end_time = long_session.start_time + timedelta(seconds=SESSION_READINGS)
+        long_session.save()
+
+    return SimpleNamespace(doctor=doctor, patient=patient, game=game, session=long_session)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+
+from gamesession.ingest import METRIC_FIELDS
+from gamesession.models import EEGReading, Session
+from gamesession.rendering import reading_columns, reading_rows
+from gamesession.serializers import EEGReadingSerializer, SessionSummarySerializer
+
+ROW_COUNTS = [1_000, 100_000]
+
+def rounds_for(size):
+    """
+    Rounds per benchmark so each case handles about as many rows in total (the 100k-row cases run once).
+    """
+    return max(1, 10_000 // size)
+
+def reading_values(count):
+    return np.random.default_rng(0).uniform(0, 1, size=(count, len(METRIC_FIELDS)))
+
+def posted_rows(session_id, count):
+    """
+    Readings as Unity POSTs them (JSON-decoded).
+    """
+    start = timezone.now()
+    return [{"session": session_id, "timestamp": (start + timedelta(seconds=i)).isoformat(), **dict(zip(METRIC_FIELDS, row))}
+            for i, row in enumerate(reading_values(count).tolist())]
+
+def reading_instances(session, count):
+    start = timezone.now()
+    return [EEGReading(id=i + 1, session=session, timestamp=start + timedelta(seconds=i), **dict(zip(METRIC_FIELDS, row)))
+            for i, row in enumerate(reading_values(count).tolist())]
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", ROW_COUNTS)
+def test_eeg_reading_validation(benchmark, bench_data, size):
+    rows = posted_rows(bench_data.session.id, size)
+
+    def validate():
+        serializer = EEGReadingSerializer(data=rows, many=True)
+        assert serializer.is_valid()
+    benchmark.pedantic(validate, rounds=rounds_for(size))
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", ROW_COUNTS)
+def test_eeg_reading_rendering(benchmark, bench_data, size):
+    readings = reading_instances(bench_data.session, size)
+    data = benchmark.pedantic(lambda: EEGReadingSerializer(readings, many=True).data, rounds=rounds_for(size))
+    assert len(data) == size
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", ROW_COUNTS)
+def test_eeg_reading_rendering_projected(benchmark, bench_data, size):
+    readings = reading_instances(bench_data.session, size)
+    fields = ["timestamp", "attention", "meditation"]
+    data = benchmark.pedantic(lambda: EEGReadingSerializer(readings, many=True, fields=fields).data,
+                              rounds=rounds_for(size))
+    assert list(data[0]) == fields
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("render", [reading_rows, reading_columns], ids=["rows", "columns"])
+@pytest.mark.parametrize("size", ROW_COUNTS)
+def test_eeg_reading_fast_rendering(benchmark, bench_data, size, render):
+    # the read endpoints' path: values_list() tuples instead of model instances and serializer fields
+    fields = EEGReadingSerializer.Meta.fields
+    rows = [tuple(getattr(reading, "session_id" if name == "session" else name) for name in fields)
+            for reading in reading_instances(bench_data.session, size)]
+    benchmark.pedantic(lambda: render(rows, fields), rounds=rounds_for(size))
+
+@pytest.mark.django_db
+def test_session_summary_list(benchmark, bench_data):
+    # sessions with their reading aggregates, as the session list endpoints serve them (readings are not nested)
+    def render():
+        sessions = Session.objects.filter(patient=bench_data.patient).with_reading_summary().order_by("start_time")
+        return SessionSummarySerializer(sessions, many=True).data
+    data = benchmark(render)
+    assert len(data) == Session.objects.filter(patient=bench_data.patient).count()
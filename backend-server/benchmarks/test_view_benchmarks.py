@@ -0,0 +1,55 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+def get(client, url, params=None):
+    response = client.get(url, params)
+    assert response.status_code == 200, response.content[:200]
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    return response
+
+@pytest.mark.django_db
+def test_doctor_patient_list(benchmark, bench_data):
+    client = client_for(bench_data.doctor)
+    response = benchmark(get, client, reverse("list_patients"))
+    assert len(response.data) == bench_data.doctor.doctor_profile.patients.count()
+
+@pytest.mark.django_db
+def test_patient_session_list(benchmark, bench_data):
+    client = client_for(bench_data.patient)
+    benchmark(get, client, reverse("get_my_sessions"))
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("fields", [None, "timestamp,attention,meditation"])
+def test_eeg_readings_page(benchmark, bench_data, fields):
+    client = client_for(bench_data.doctor)
+    url = reverse("get_eeg_by_session_doctor", args=[bench_data.session.id, bench_data.patient.id])
+    params = {"page_size": 5000, **({"fields": fields} if fields else {})}
+    response = benchmark(get, client, url, params)
+    assert len(response.data["results"]) == 5000
+
+@pytest.mark.django_db
+def test_eeg_readings_page_columns(benchmark, bench_data):
+    client = client_for(bench_data.doctor)
+    url = reverse("get_eeg_by_session_doctor", args=[bench_data.session.id, bench_data.patient.id])
+    response = benchmark(get, client, url, {"page_size": 5000, "shape": "columns"})
+    assert len(response.data["results"]["timestamp"]) == 5000
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_eeg_downsampled(benchmark, bench_data, method):
+    client = client_for(bench_data.patient)
+    url = reverse("get_my_downsampled_eeg", args=[bench_data.session.id])
+    benchmark(get, client, url, {"points": 1000, "method": method, "channels": "attention,meditation,theta"})
+
+@pytest.mark.django_db
+def test_eeg_export(benchmark, bench_data):
+    client = client_for(bench_data.doctor)
+    data = benchmark(get, client, reverse("export_eeg"), {"session": bench_data.session.id})
+    assert len(data) > bench_data.session.eeg_readings.count() * 8
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from accounts.models import DoctorProfile, PatientProfile, CustomUser
+from gamesession.models import PatientDayRollup
 
 class PatientSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(source='user.id', read_only=True) # force the CustomUser.id
@@ -60,4 +61,22 @@ class PatientAddSerializer(serializers.Serializer):
         patient_profile = validated_data['patient_profile'] # reverse relation
         patient_profile.doctor = doctor_profile # establishes the patient-doctor relationship through profiles
         patient_profile.save()
-        return patient_profile
\ No newline at end of file
+        return patient_profile
+
+class PatientDayTrendSerializer(serializers.ModelSerializer):
+    """
+    One day of a patient's rollup (see gamesession/rollups.py), with means instead of sums.
+    """
+    attention_mean = serializers.SerializerMethodField()
+    meditation_mean = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PatientDayRollup
+        fields = ['day', 'session_count', 'reading_count', 'attention_mean', 'attention_min', 'attention_max',
+                  'meditation_mean', 'meditation_min', 'meditation_max']
+
+    def get_attention_mean(self, obj):
+        return obj.attention_sum / obj.reading_count if obj.reading_count else None
+
+    def get_meditation_mean(self, obj):
+        return obj.meditation_sum / obj.reading_count if obj.reading_count else None
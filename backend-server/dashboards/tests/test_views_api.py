@@ -3,6 +3,8 @@ from rest_framework.test import APIClient
 from django.urls import reverse
 from dashboards.views import PatientProfileList, PatientsCreateList
 from accounts.models import CustomUser, DoctorProfile, PatientProfile
+from gamesession.models import PatientDayRollup
+from datetime import date
 
 
 @pytest.fixture
@@ -174,3 +176,28 @@ def test_patients_delete_patient(api_client, doctor_custom_user, patient_1_custo
 
     assert delete_response.status_code == 200
     assert f"patient with user ID {patient_1_custom_user.id}" in delete_response.data
+
+@pytest.mark.django_db
+def test_patient_trends_reads_day_rollups(api_client, doctor_custom_user, patient_1_custom_user, patient_2_custom_user):
+    """
+    Tests that a doctor gets their patient's daily trend (means from the rollup sums), filtered by date,
+    and cannot see trends of another doctor's (or no doctor's) patient.
+    """
+    doctor_custom_user.doctor_profile.patients.add(patient_1_custom_user.patient_profile)
+    for day, attention_sum in ((date(2026, 1, 5), 30.0), (date(2026, 1, 6), 60.0)):
+        PatientDayRollup.objects.create(patient=patient_1_custom_user, day=day, session_count=1, reading_count=100,
+                                        attention_sum=attention_sum, meditation_sum=50.0)
+
+    api_client.force_authenticate(user=doctor_custom_user)
+    url = reverse('patient_trends', kwargs={'patient_user_id': patient_1_custom_user.id})
+
+    response = api_client.get(url)
+    assert response.status_code == 200
+    assert [d["attention_mean"] for d in response.data] == [0.3, 0.6]
+
+    response = api_client.get(url, {"start": "2026-01-06"})
+    assert [d["day"] for d in response.data] == ["2026-01-06"]
+    assert api_client.get(url, {"end": "not-a-date"}).status_code == 400
+
+    other_url = reverse('patient_trends', kwargs={'patient_user_id': patient_2_custom_user.id})
+    assert api_client.get(other_url).status_code == 403
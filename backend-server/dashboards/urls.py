@@ -1,5 +1,5 @@
 from django.urls import path
-from dashboards.views import PatientsCreateList, PatientProfileList, PatientDelete
+from dashboards.views import PatientsCreateList, PatientProfileList, PatientDelete, PatientTrends
 
 # URLConf
 urlpatterns = [
@@ -7,4 +7,5 @@ urlpatterns = [
     path('patients/', PatientsCreateList.as_view(), name='list_patients'), # list logged-in doctor's patients
     path('patients/profiles/all/', PatientProfileList.as_view(), name='list_all_patient_users'), # list all patient profiles (testing purposes: looking up patient PROFILE ids)
     path('patients/delete/<int:patient_user_id>/', PatientDelete.as_view(), name='delete_patient'),
+    path('patients/<int:patient_user_id>/trends/', PatientTrends.as_view(), name='patient_trends'), # daily attention/meditation trend from rollups
 ]
\ No newline at end of file
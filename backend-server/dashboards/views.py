@@ -3,9 +3,10 @@ from rest_framework.response import Response
 from rest_framework import status
 from accounts.models import DoctorProfile, PatientProfile, CustomUser
 from accounts.serializers import AllUsersSerializer
-from .serializers import PatientAddSerializer, DoctorSerializer, PatientSerializer
+from .serializers import PatientAddSerializer, DoctorSerializer, PatientSerializer, PatientDayTrendSerializer
 # from .serializers import 
 from rest_framework.permissions import IsAuthenticated
+from django.utils.dateparse import parse_date
 
 class PatientProfileList(APIView):
     """
@@ -73,4 +74,40 @@ class PatientDelete(APIView):
         patient_profile.doctor = None
         patient_profile.save()
 
-        return Response(f"patient with user ID {patient_user_id} removed from {request.user.username}'s record", status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(f"patient with user ID {patient_user_id} removed from {request.user.username}'s record", status=status.HTTP_200_OK)
+
+class PatientTrends(APIView):
+    """
+    Returns a doctor's patient's day-by-day attention/meditation trend, read from the precomputed day rollups.
+    Optional query params: start, end (YYYY-MM-DD, inclusive).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, patient_user_id):
+        user = request.user
+        if not user.is_doctor:
+            return Response("only doctors can see patient trends", status=status.HTTP_403_FORBIDDEN)
+
+        doctor = getattr(user, "doctor_profile", None)
+        try:
+            patient_profile = PatientProfile.objects.get(user__id=patient_user_id)
+        except PatientProfile.DoesNotExist:
+            return Response("patient profile not found", status=status.HTTP_404_NOT_FOUND)
+
+        if doctor is None or patient_profile.doctor_id != doctor.id:
+            return Response("patient does not belong to this doctor", status=status.HTTP_403_FORBIDDEN)
+
+        days = patient_profile.user.day_rollups.order_by("day")
+        for param, lookup in (("start", "day__gte"), ("end", "day__lte")):
+            value = request.query_params.get(param)
+            if value is None:
+                continue
+            try:
+                day = parse_date(value)
+            except ValueError:
+                day = None
+            if day is None:
+                return Response({param: "expected a date (YYYY-MM-DD)."}, status=status.HTTP_400_BAD_REQUEST)
+            days = days.filter(**{lookup: day})
+
+        return Response(PatientDayTrendSerializer(days, many=True).data, status=status.HTTP_200_OK)
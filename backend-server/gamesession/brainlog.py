@@ -0,0 +1,199 @@
+"""
+Import of BrainLogger recordings (Unity's BrainLog_*.csv, written while offline) into a Session.
+
+The file has one line per raw sample (~512 Hz), each carrying the latest eSense and band power values:
+
+    Timestamp,Attention,Meditation,RawEEG,Delta,Theta,LowAlpha,HighAlpha,LowBeta,HighBeta,LowGamma,MidGamma
+
+The raw column becomes RawEEGChunks; every line where eSense/band values change (about once a second) becomes an
+EEG-Reading, with attention/meditation scaled from 0..100 to 0..1 like the values Unity streams.
+Lines before the headset reports eSense (-1) only contribute raw samples.
+The file is read as a stream a chunk of lines at a time, so memory use does not depend on the file size.
+A file whose time range overlaps the EEG data the session already has (e.g. the same file imported again) is
+rejected with BrainLogOverlap, so re-imports never duplicate readings or raw samples.
+"""
+import csv
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import CompactedReadings, EEGReading, RawEEGChunk, Session
+from .raw import DEFAULT_SAMPLE_RATE, RAW_DTYPE, save_raw_samples
+from .writers import get_writer
+
+BRAINLOG_HEADER = ["Timestamp", "Attention", "Meditation", "RawEEG",
+                   "Delta", "Theta", "LowAlpha", "HighAlpha", "LowBeta", "HighBeta", "LowGamma", "MidGamma"]
+BRAINLOG_CHUNK_LINES = DEFAULT_SAMPLE_RATE * 64 # whole seconds of raw samples, so raw chunks stay aligned
+ESENSE_SCALE = 100.0
+MAX_REPORTED_LINES = 20
+
+class BrainLogOverlap(ValueError):
+    pass
+
+@dataclass
+class BrainLogImport:
+    readings: int = 0
+    raw_samples: int = 0
+    first_time: object = None
+    last_time: object = None
+    skipped_lines: list = field(default_factory=list) # line numbers (1-based, header is line 1), first few only
+    skipped_count: int = 0
+
+    def skip(self, line_number):
+        self.skipped_count += 1
+        if len(self.skipped_lines) < MAX_REPORTED_LINES:
+            self.skipped_lines.append(line_number)
+
+def _read_chunks(lines, result):
+    """
+    Yields (line_numbers, rows) of well-formed lines; rows is a list of 12 strings each.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None or [name.strip() for name in header] != BRAINLOG_HEADER:
+        raise ValueError(f"not a BrainLogger file: the header must be {','.join(BRAINLOG_HEADER)}.")
+
+    numbers, rows = [], []
+    for row in reader:
+        if len(row) != len(BRAINLOG_HEADER):
+            if row: # blank lines are not worth reporting
+                result.skip(reader.line_num)
+            continue
+        numbers.append(reader.line_num)
+        rows.append(row)
+        if len(rows) == BRAINLOG_CHUNK_LINES:
+            yield numbers, rows
+            numbers, rows = [], []
+    if rows:
+        yield numbers, rows
+
+def _parse_values(numbers, rows, result):
+    """
+    Returns (line_numbers, timestamps (str), values) with values a float array of the 11 numeric columns;
+    lines with a non-numeric value are skipped.
+    """
+    try:
+        values = np.array([row[1:] for row in rows], dtype=np.float64)
+    except ValueError: # junk somewhere in the chunk: find it line by line
+        keep = []
+        for i, row in enumerate(rows):
+            try:
+                [float(value) for value in row[1:]]
+                keep.append(i)
+            except ValueError:
+                result.skip(numbers[i])
+        numbers, rows = [numbers[i] for i in keep], [rows[i] for i in keep]
+        values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(BRAINLOG_HEADER) - 1)
+    finite = np.isfinite(values).all(axis=1)
+    for i in np.flatnonzero(~finite):
+        result.skip(numbers[i])
+    return [n for n, ok in zip(numbers, finite) if ok], [row[0] for row, ok in zip(rows, finite) if ok], values[finite]
+
+def _parse_time(value):
+    """
+    BrainLogger writes ISO timestamps with or without an offset; those without are taken as the server's time zone.
+    Returns None if the value is no (valid) timestamp.
+    """
+    try:
+        parsed = parse_datetime(value.strip())
+    except ValueError: # well formatted but out of range, e.g. month 13
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+def _stored_range(session):
+    """
+    (first, last) time of the EEG data the session has (reading rows, compacted readings, raw chunks); None if none.
+    """
+    times = list(EEGReading.objects.filter(session=session).aggregate(Min("timestamp"), Max("timestamp")).values())
+    compacted = CompactedReadings.objects.filter(session=session).values_list("first_time", "last_time").first()
+    times += compacted or []
+    first_chunk = RawEEGChunk.objects.filter(session=session).order_by("start_time").first()
+    if first_chunk is not None:
+        last_chunk = RawEEGChunk.objects.filter(session=session).order_by("-start_time").first()
+        times += [first_chunk.start_time,
+                  last_chunk.start_time + timedelta(seconds=(last_chunk.sample_count - 1) / last_chunk.sample_rate)]
+    times = [time for time in times if time is not None]
+    return (min(times), max(times)) if times else None
+
+def import_brainlog(session, lines):
+    """
+    Imports a BrainLogger CSV (any iterable of text lines, e.g. an open file) into the session, in one transaction.
+    Returns a BrainLogImport. Raises ValueError if the file is not a BrainLogger CSV or has no usable lines,
+    BrainLogOverlap if it overlaps the session's stored EEG data.
+    """
+    result = BrainLogImport()
+    previous = None # eSense/band values of the last line of the previous chunk
+
+    with transaction.atomic():
+        Session.objects.select_for_update().get(pk=session.pk) # one import (or compaction) at a time
+        stored = _stored_range(session)
+        for numbers, rows in _read_chunks(lines, result):
+            numbers, timestamps, values = _parse_values(numbers, rows, result)
+            if not timestamps:
+                continue
+
+            chunk_start = _parse_time(timestamps[0])
+            if chunk_start is None:
+                raise ValueError(f"line {numbers[0]}: timestamp has wrong format.")
+            chunk_end = _parse_time(timestamps[-1]) or chunk_start
+            if stored is not None and chunk_start <= stored[1] and chunk_end >= stored[0]:
+                raise BrainLogOverlap(f"line {numbers[0]}: the session already has EEG data from {stored[0].isoformat()} "
+                                      f"to {stored[1].isoformat()}; was this file imported before?")
+            result.first_time = result.first_time or chunk_start
+
+            raw = values[:, 2]
+            info = np.iinfo(RAW_DTYPE)
+            save_raw_samples(session, chunk_start, DEFAULT_SAMPLE_RATE, np.clip(raw, info.min, info.max).astype(RAW_DTYPE))
+            result.raw_samples += len(raw)
+
+            # eSense and band powers only change about once a second; keep the lines where they do
+            metrics = np.delete(values, 2, axis=1) # columns in METRIC_FIELDS order
+            changed = np.ones(len(metrics), dtype=bool)
+            changed[1:] = (metrics[1:] != metrics[:-1]).any(axis=1)
+            if previous is not None:
+                changed[0] = (metrics[0] != previous).any()
+            previous = metrics[-1]
+            changed &= (metrics[:, 0] >= 0) & (metrics[:, 1] >= 0) # -1: no eSense from the headset yet
+
+            keep, timestamps_kept = [], []
+            for i in np.flatnonzero(changed):
+                timestamp = _parse_time(timestamps[i])
+                if timestamp is None:
+                    result.skip(numbers[i])
+                    continue
+                keep.append(i)
+                timestamps_kept.append(timestamp)
+            readings = metrics[keep]
+            readings[:, :2] /= ESENSE_SCALE # attention, meditation
+            result.readings += get_writer().write(session.id, timestamps_kept, readings)
+
+            result.last_time = chunk_end
+
+        if result.raw_samples == 0:
+            raise ValueError("the file has no usable lines.")
+    return result
+
+def import_brainlog_file(lines, patient, session=None, game=None, prescription=None):
+    """
+    Imports into the patient's existing session, or into a new session of `game` spanning the recording.
+    Returns (session, BrainLogImport); nothing is saved if the import fails.
+    """
+    with transaction.atomic():
+        created = session is None
+        if created:
+            session = Session.objects.create(patient=patient, game=game, prescription=prescription,
+                                             start_time=timezone.now()) # replaced by the first sample's time below
+        result = import_brainlog(session, lines)
+        if created or session.start_time > result.first_time:
+            session.start_time = result.first_time
+        if session.end_time is None or session.end_time < result.last_time:
+            session.end_time = result.last_time
+        session.save()
+    return session, result
@@ -0,0 +1,79 @@
+"""
+Publish/subscribe for live session data.
+Ingest publishes newly saved readings to a session's channel; live WebSocket subscribers (doctors watching a session)
+receive them as they arrive instead of polling the EEG endpoints.
+
+The backend is chosen by settings.EEG_LIVE_BROKER (dotted path). The default InProcessBroker only reaches
+subscribers in the same process; a multi-process deployment swaps in a backend with the same interface
+(publish / subscribe) over a shared broker.
+"""
+import asyncio
+import contextlib
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_BROKER = "gamesession.broker.InProcessBroker"
+
+def session_channel(session_id):
+    return f"session-{session_id}"
+
+class Subscription:
+    """
+    Messages for one subscriber. Bounded, so a slow subscriber loses its oldest messages instead of holding up ingest.
+    """
+    def __init__(self, max_messages):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_messages)
+        self.dropped = 0
+
+    def deliver(self, message):
+        # runs on the subscriber's event loop
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+class InProcessBroker:
+    """
+    Delivers to subscribers in this process. publish() is thread-safe, so sync views and async sockets can both call it.
+    """
+    max_messages = 256
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {} # channel -> set of Subscription
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscriptions = list(self.subscribers.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError: # subscriber's loop already closed
+                pass
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, channel):
+        subscription = Subscription(self.max_messages)
+        with self.lock:
+            self.subscribers.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self.lock:
+                self.subscribers[channel].discard(subscription)
+                if not self.subscribers[channel]:
+                    del self.subscribers[channel]
+
+_broker = None
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, "EEG_LIVE_BROKER", DEFAULT_BROKER))()
+    return _broker
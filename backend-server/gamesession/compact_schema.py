@@ -0,0 +1,76 @@
+"""
+Migration of EEG-Readings to the compact row schema: the ten metrics as 4-byte floats (RealField in
+gamesession/models.py) instead of 8-byte doubles, 40 bytes less per row.
+
+On PostgreSQL, ALTER COLUMN ... TYPE would rewrite every partition in one statement while holding an exclusive lock
+on the table, so the change is made in three steps that keep ingestion running:
+
+    python manage.py migrate gamesession 0009   adds an empty "<metric>_compact" real column per metric (catalog only)
+    python manage.py compact_eeg_schema         copies existing rows into them, one id range per transaction
+    python manage.py migrate                    0010 copies rows written since, then swaps the columns in
+
+Skipping the middle step is fine for small tables: 0010 then copies everything itself. Other databases get a plain
+ALTER from 0010. Readings are only ever inserted, never updated, so a row copied once stays correct.
+
+Rows copied before the swap keep the bytes of the dropped columns until they are rewritten (VACUUM FULL of a month's
+partition, or retention dropping it, see gamesession/partitions.py); rows written after it are compact.
+"""
+import time
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+
+from .ingest import METRIC_FIELDS
+from .models import EEGReading
+
+TABLE = EEGReading._meta.db_table
+COMPACT_SUFFIX = "_compact"
+DEFAULT_BATCH_SIZE = 50000 # ids per UPDATE
+
+def compact_column(name):
+    return f"{name}{COMPACT_SUFFIX}"
+
+def has_compact_columns():
+    """
+    True between migrations 0009 and 0010 on PostgreSQL, while the rows are being copied.
+    """
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        columns = {column.name for column in connection.introspection.get_table_description(cursor, TABLE)}
+    return compact_column(METRIC_FIELDS[0]) in columns
+
+@dataclass
+class Backfill:
+    rows: int = 0
+    batches: int = 0
+
+def backfill_compact_columns(batch_size=DEFAULT_BATCH_SIZE, pause=0.0, on_batch=None):
+    """
+    Copies the metrics of rows not copied yet into the "_compact" columns, batch_size ids at a time, each batch its own
+    short transaction (pause: seconds to sleep between batches, to leave I/O to ingestion). on_batch(Backfill, last id)
+    is called after every batch. Returns the Backfill totals.
+    """
+    quote = connection.ops.quote_name
+    table, marker = quote(TABLE), quote(compact_column(METRIC_FIELDS[0]))
+    copied = ", ".join(f"{quote(compact_column(name))} = {quote(name)}" for name in METRIC_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT min(id), max(id) FROM {table} WHERE {marker} IS NULL")
+        first_id, last_id = cursor.fetchone()
+
+    result = Backfill()
+    if first_id is None:
+        return result
+    # rows inserted after last_id are left to migration 0010, which copies whatever is still missing
+    for lower in range(first_id, last_id + 1, batch_size):
+        upper = min(lower + batch_size, last_id + 1)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"UPDATE {table} SET {copied} WHERE id >= %s AND id < %s AND {marker} IS NULL",
+                           [lower, upper])
+            result.rows += cursor.rowcount
+        result.batches += 1
+        if on_batch:
+            on_batch(result, upper - 1)
+        if pause and upper <= last_id:
+            time.sleep(pause)
+    return result
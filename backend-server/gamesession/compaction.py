@@ -0,0 +1,202 @@
+"""
+Compaction of ended sessions' EEG-Readings: a session's rows are packed into one CompactedReadings blob and deleted,
+so reading back a whole past session is one row fetch and a decompress instead of an index scan over thousands of rows.
+
+Compaction is optional. With settings.EEG_COMPACT_AFTER_SECONDS set, ending a session queues its compaction that long
+afterwards (late uploads, report and rollups come first); manage.py compact_sessions compacts older sessions in bulk.
+
+The per-session EEG endpoints, downsampling, the ack endpoint, reports and exports read compacted sessions through
+load_readings(), which returns the same values the rows held. Readings saved for a session after it was compacted
+(e.g. a BrainLogger import) are merged in on read and packed the next time the session is compacted.
+
+Blob layout (format 1), zlib-compressed: the columns one after the other, n little-endian 8-byte values each,
+byte-shuffled (first the lowest byte of every value, then the next, ...) so that the bytes that hardly change between
+neighbouring values form long runs:
+
+    id                                  int64, delta-encoded
+    timestamp                           int64 microseconds since the Unix epoch (UTC), delta-encoded
+    seq                                 int64, -1 for none
+    attention ... mid_gamma             float64, in METRIC_FIELDS order
+"""
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.db import transaction
+
+from .ingest import METRIC_FIELDS
+from .models import CompactedReadings, EEGReading, Session
+from .rollups import ROLLUP_METRICS, update_session_rollups
+
+FORMAT = 1
+COMPRESSION_LEVEL = 6
+NO_SEQ = -1
+DELETE_BATCH_SIZE = 10000 # ids per DELETE; PostgreSQL takes at most 65535 parameters per statement
+ROW_COLUMNS = ["id", "timestamp", "seq"] + METRIC_FIELDS # the values_list() columns ReadingArrays.from_rows() takes
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+def to_microseconds(value):
+    return (value - EPOCH) // ONE_MICROSECOND
+
+@dataclass
+class ReadingArrays:
+    """
+    One session's readings as columns, in (timestamp, id) order.
+    """
+    session_id: int
+    ids: np.ndarray # int64
+    timestamps: np.ndarray # int64 microseconds since the Unix epoch
+    seqs: np.ndarray # int64, NO_SEQ for none
+    values: np.ndarray # float64, shape (n, len(METRIC_FIELDS))
+
+    @classmethod
+    def from_rows(cls, session_id, rows):
+        """
+        From values_list(*ROW_COLUMNS) tuples, in (timestamp, id) order.
+        """
+        columns = list(zip(*rows)) or [()] * len(ROW_COLUMNS)
+        return cls(session_id,
+                   np.array(columns[0], dtype=np.int64),
+                   np.array([to_microseconds(timestamp) for timestamp in columns[1]], dtype=np.int64),
+                   np.array([NO_SEQ if seq is None else seq for seq in columns[2]], dtype=np.int64),
+                   np.array(columns[3:], dtype=np.float64).T.reshape(len(rows), len(METRIC_FIELDS)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def take(self, index):
+        """
+        The readings at `index` (a slice or an index array).
+        """
+        return ReadingArrays(self.session_id, self.ids[index], self.timestamps[index], self.seqs[index], self.values[index])
+
+    def merged(self, other):
+        """
+        These readings and those of `other` (same session), in (timestamp, id) order.
+        """
+        merged = ReadingArrays(self.session_id, np.concatenate([self.ids, other.ids]),
+                               np.concatenate([self.timestamps, other.timestamps]),
+                               np.concatenate([self.seqs, other.seqs]), np.concatenate([self.values, other.values]))
+        return merged.take(np.lexsort((merged.ids, merged.timestamps)))
+
+    def window(self, start=None, end=None):
+        """
+        The readings with start <= timestamp < end.
+        """
+        lower = 0 if start is None else int(np.searchsorted(self.timestamps, to_microseconds(start), "left"))
+        upper = len(self) if end is None else int(np.searchsorted(self.timestamps, to_microseconds(end), "left"))
+        return self.take(slice(lower, max(lower, upper)))
+
+    def position_after(self, session_id, timestamp, pk):
+        """
+        Index of the first reading after the keyset position (session_id, timestamp, id).
+        """
+        if session_id != self.session_id:
+            return 0 if session_id < self.session_id else len(self)
+        moment = to_microseconds(timestamp)
+        lower = int(np.searchsorted(self.timestamps, moment, "left"))
+        upper = int(np.searchsorted(self.timestamps, moment, "right"))
+        return lower + int(np.searchsorted(self.ids[lower:upper], pk, "right"))
+
+    def column(self, name):
+        """
+        A column as a list of the values values_list() returns for it ("session_id" included).
+        """
+        if name == "session_id":
+            return [self.session_id] * len(self)
+        if name == "id":
+            return self.ids.tolist()
+        if name == "timestamp":
+            return [EPOCH + timedelta(microseconds=moment) for moment in self.timestamps.tolist()]
+        if name == "seq":
+            return [None if seq == NO_SEQ else seq for seq in self.seqs.tolist()]
+        return self.values[:, METRIC_FIELDS.index(name)].tolist()
+
+    def rows(self, columns):
+        """
+        values_list()-like tuples of `columns`.
+        """
+        return list(zip(*(self.column(name) for name in columns)))
+
+def _shuffle(column):
+    return np.ascontiguousarray(column).view(np.uint8).reshape(-1, 8).T.tobytes()
+
+def encode_readings(arrays):
+    columns = [np.diff(arrays.ids, prepend=0), np.diff(arrays.timestamps, prepend=0), arrays.seqs]
+    columns = [column.astype("<i8") for column in columns] + [arrays.values[:, i].astype("<f8")
+                                                              for i in range(len(METRIC_FIELDS))]
+    return zlib.compress(b"".join(_shuffle(column) for column in columns), COMPRESSION_LEVEL)
+
+def decode_readings(session_id, data, count):
+    raw = np.frombuffer(zlib.decompress(bytes(data)), dtype=np.uint8)
+    column_count = 3 + len(METRIC_FIELDS)
+    if raw.size != column_count * 8 * count:
+        raise ValueError(f"compacted readings of session {session_id}: expected {count} readings")
+    columns = raw.reshape(column_count, 8, count).transpose(0, 2, 1).copy() # back to (column, value, byte)
+    integers = columns[:3].view("<i8").reshape(3, count)
+    floats = columns[3:].view("<f8").reshape(len(METRIC_FIELDS), count)
+    return ReadingArrays(session_id, np.cumsum(integers[0]), np.cumsum(integers[1]), integers[2].copy(),
+                         np.ascontiguousarray(floats.T))
+
+def decode_compacted(compacted):
+    if compacted.format != FORMAT:
+        raise ValueError(f"compacted readings of session {compacted.session_id}: unknown format {compacted.format}")
+    return decode_readings(compacted.session_id, compacted.data, compacted.reading_count)
+
+def _set_stats(compacted, arrays):
+    compacted.reading_count = len(arrays)
+    compacted.first_time = EPOCH + timedelta(microseconds=int(arrays.timestamps[0]))
+    compacted.last_time = EPOCH + timedelta(microseconds=int(arrays.timestamps[-1]))
+    for metric in ROLLUP_METRICS:
+        column = arrays.values[:, METRIC_FIELDS.index(metric)]
+        setattr(compacted, f"{metric}_sum", float(column.sum()))
+        setattr(compacted, f"{metric}_min", float(column.min()))
+        setattr(compacted, f"{metric}_max", float(column.max()))
+
+def compact_session(session):
+    """
+    Packs an ended session's reading rows into its CompactedReadings (together with what an earlier compaction packed)
+    and deletes them. Returns the CompactedReadings, or None if the session has no readings.
+    Raises ValueError if the session has not ended.
+    """
+    with transaction.atomic():
+        session = Session.objects.select_for_update().get(pk=session.pk)
+        if session.end_time is None:
+            raise ValueError(f"session {session.id} has not ended")
+        update_session_rollups(session) # rollups are computed from the rows, so they have to be up to date first
+
+        rows = list(session.eeg_readings.order_by("timestamp", "id").values_list(*ROW_COLUMNS))
+        compacted = CompactedReadings.objects.filter(session=session).first()
+        if not rows:
+            return compacted
+
+        arrays = ReadingArrays.from_rows(session.id, rows)
+        if compacted is None:
+            compacted = CompactedReadings(session=session)
+        else:
+            arrays = decode_compacted(compacted).merged(arrays)
+        _set_stats(compacted, arrays)
+        compacted.format = FORMAT
+        compacted.data = encode_readings(arrays)
+        compacted.save()
+
+        # exactly the rows packed: one saved meanwhile stays a row until the next compaction
+        ids = [row[0] for row in rows]
+        for offset in range(0, len(ids), DELETE_BATCH_SIZE):
+            session.eeg_readings.filter(id__in=ids[offset:offset + DELETE_BATCH_SIZE]).delete()
+    return compacted
+
+def load_readings(session):
+    """
+    The readings of a compacted session as ReadingArrays, rows saved since included; None if the session has not
+    been compacted (its readings are all EEGReading rows then).
+    """
+    compacted = CompactedReadings.objects.filter(session_id=session.id).first()
+    if compacted is None:
+        return None
+    arrays = decode_compacted(compacted)
+    rows = list(EEGReading.objects.filter(session_id=session.id).order_by("timestamp", "id").values_list(*ROW_COLUMNS))
+    return arrays.merged(ReadingArrays.from_rows(session.id, rows)) if rows else arrays
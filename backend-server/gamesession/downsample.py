@@ -0,0 +1,70 @@
+"""
+Peak-preserving downsampling of a session's EEG channels for charts.
+Both methods pick whole readings (by index), so every channel in the result shares the same timestamps.
+    minmax: splits the session into equal-count buckets and keeps the min and max reading of each channel per bucket.
+    lttb: Largest-Triangle-Three-Buckets per channel, keeping the points that best preserve the line's shape.
+"""
+import math
+
+import numpy as np
+
+METHODS = ("minmax", "lttb")
+
+def minmax_indices(values, buckets):
+    """
+    Indices of the min and max of values in each of `buckets` equal-count buckets, in time order.
+    """
+    n = len(values)
+    size = math.ceil(n / buckets)
+    rows = math.ceil(n / size)
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = values
+    padded = padded.reshape(rows, size) # one row per bucket; only the last can hold NaN padding
+
+    offsets = np.arange(rows) * size
+    lows = offsets + np.nanargmin(padded, axis=1)
+    highs = offsets + np.nanargmax(padded, axis=1)
+    return np.union1d(lows, highs)
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets (Steinarsson, 2013). Keeps the first and last points and, for each bucket in between,
+    the point forming the largest triangle with the previously kept point and the average of the next bucket.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int) # threshold - 2 buckets between the fixed end points
+    kept = np.empty(threshold, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for b in range(threshold - 2):
+        lo, hi = edges[b], max(edges[b + 1], edges[b] + 1)
+        next_lo, next_hi = hi, (edges[b + 2] if b + 2 < len(edges) else n)
+        avg_x = x[next_lo:max(next_hi, next_lo + 1)].mean()
+        avg_y = y[next_lo:max(next_hi, next_lo + 1)].mean()
+
+        # twice the triangle area for every candidate in the bucket at once
+        areas = np.abs((x[previous] - avg_x) * (y[lo:hi] - y[previous]) - (x[previous] - x[lo:hi]) * (avg_y - y[previous]))
+        previous = lo + int(np.argmax(areas))
+        kept[b + 1] = previous
+    return np.unique(kept)
+
+def downsample(timestamps, channels, points, method="minmax"):
+    """
+    timestamps: list of datetimes in time order; channels: {name: list of floats}, same length.
+    Returns the indices of the readings to keep, at most about `points` of them.
+    """
+    n = len(timestamps)
+    if n <= points:
+        return np.arange(n)
+
+    if method == "minmax":
+        buckets = max(1, points // (2 * len(channels))) # each channel contributes up to 2 readings per bucket
+        picked = [minmax_indices(np.asarray(values, dtype=np.float64), buckets) for values in channels.values()]
+    else:
+        x = np.array([t.timestamp() for t in timestamps])
+        threshold = max(3, points // len(channels))
+        picked = [lttb_indices(x, np.asarray(values, dtype=np.float64), threshold) for values in channels.values()]
+    return np.unique(np.concatenate(picked))
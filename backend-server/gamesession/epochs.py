@@ -0,0 +1,109 @@
+"""
+Event-locked epochs: the EEG-Readings in a fixed window around every SessionEvent of one type, e.g. attention from 2 s
+before to 5 s after each "level_start". Each epoch is summarised by its channel means, overall and per time bin
+(offset from the event, bin_seconds wide), and the epochs are averaged bin by bin, each epoch weighing the same.
+
+The session's readings are loaded once as arrays (compacted or not, see gamesession/compaction.py); every window is
+located with one np.searchsorted over the timestamps and all epochs are reduced together with np.add.at, so the cost
+does not grow with a query per event. Windows are [event - before, event + after) and may overlap.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+
+import numpy as np
+
+from .compaction import ROW_COLUMNS, ReadingArrays, load_readings, to_microseconds
+from .ingest import METRIC_FIELDS
+
+@dataclass
+class Epochs:
+    reading_counts: np.ndarray # (events,)
+    means: np.ndarray # (events, channels), NaN for an epoch without readings
+    bin_counts: np.ndarray # (events, bins)
+    bin_means: np.ndarray # (events, bins, channels), NaN for an empty bin
+
+def extract_epochs(timestamps, values, event_times, before, after, bin_width):
+    """
+    timestamps: int64 microseconds, sorted; values: (n, channels) floats; event_times: int64 microseconds;
+    before, after, bin_width: microseconds (ints > 0, before + after > 0).
+    """
+    event_count, channel_count = len(event_times), values.shape[1]
+    bin_count = -(-(before + after) // bin_width)
+    lower = np.searchsorted(timestamps, event_times - before, "left")
+    upper = np.searchsorted(timestamps, event_times + after, "left")
+    counts = upper - lower
+
+    # every (epoch, reading) pair at once: epoch numbers repeated by count, reading indices running from each lower
+    epoch = np.repeat(np.arange(event_count), counts)
+    firsts = np.cumsum(counts) - counts
+    index = lower[epoch] + np.arange(len(epoch)) - firsts[epoch]
+    bins = np.minimum((timestamps[index] - event_times[epoch] + before) // bin_width, bin_count - 1)
+    picked = values[index]
+
+    sums = np.zeros((event_count, channel_count))
+    np.add.at(sums, epoch, picked)
+    bin_sums = np.zeros((event_count * bin_count, channel_count))
+    cell = epoch * bin_count + bins
+    np.add.at(bin_sums, cell, picked)
+    bin_counts = np.bincount(cell, minlength=event_count * bin_count).reshape(event_count, bin_count)
+
+    with np.errstate(invalid="ignore", divide="ignore"): # empty epochs and bins become NaN
+        means = sums / counts[:, None]
+        bin_means = bin_sums.reshape(event_count, bin_count, channel_count) / bin_counts[:, :, None]
+    return Epochs(counts, means, bin_counts, bin_means)
+
+def average_epochs(means):
+    """
+    Mean over the epochs axis (0), skipping NaN (empty epochs or bins); NaN where every epoch is empty.
+    """
+    present = ~np.isnan(means)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(present, means, 0.0).sum(axis=0) / present.sum(axis=0)
+
+def _floats(array):
+    # JSON-ready: NaN as None
+    return [None if np.isnan(value) else float(value) for value in array]
+
+def session_readings_between(session, start, end):
+    """
+    The session's readings with start <= timestamp < end as ReadingArrays.
+    """
+    compacted = load_readings(session)
+    if compacted is not None:
+        return compacted.window(start, end)
+    rows = session.eeg_readings.filter(timestamp__gte=start, timestamp__lt=end).order_by("timestamp", "id")
+    return ReadingArrays.from_rows(session.id, list(rows.values_list(*ROW_COLUMNS)))
+
+def session_epochs(session, event_type, channels, before, after, bin_seconds):
+    """
+    Epochs of `channels` around the session's `event_type` events; before, after and bin_seconds in seconds.
+    Returns the JSON-ready result of the epochs endpoint.
+    """
+    events = list(session.events.filter(event_type=event_type).order_by("timestamp", "id")
+                  .values_list("id", "timestamp", "value"))
+    window = {"before": before, "after": after, "bin_seconds": bin_seconds}
+    before_us, after_us, bin_us = round(before * 1e6), round(after * 1e6), round(bin_seconds * 1e6)
+    bin_count = -(-(before_us + after_us) // bin_us)
+    offsets = [round(-before + i * bin_seconds, 6) for i in range(bin_count)]
+    result = {"session": session.id, "event_type": event_type, **window, "bin_offsets": offsets, "epochs": [],
+              "average": {"epoch_count": 0, "mean": dict.fromkeys(channels), "bins": {name: [None] * bin_count for name in channels}}}
+    if not events:
+        return result
+
+    readings = session_readings_between(session, events[0][1] - timedelta(seconds=before),
+                                        events[-1][1] + timedelta(seconds=after))
+    columns = [METRIC_FIELDS.index(name) for name in channels]
+    epochs = extract_epochs(readings.timestamps, readings.values[:, columns],
+                            np.array([to_microseconds(timestamp) for _, timestamp, _ in events], dtype=np.int64),
+                            before_us, after_us, bin_us)
+
+    for i, (event_id, timestamp, value) in enumerate(events):
+        result["epochs"].append({
+            "event": event_id, "timestamp": timestamp, "value": value, "reading_count": int(epochs.reading_counts[i]),
+            "mean": dict(zip(channels, _floats(epochs.means[i]))),
+            "bins": {name: _floats(epochs.bin_means[i, :, c]) for c, name in enumerate(channels)},
+        })
+    mean, bin_means = average_epochs(epochs.means), average_epochs(epochs.bin_means)
+    result["average"] = {"epoch_count": int((epochs.reading_counts > 0).sum()), "mean": dict(zip(channels, _floats(mean))),
+                         "bins": {name: _floats(bin_means[:, c]) for c, name in enumerate(channels)}}
+    return result
@@ -0,0 +1,227 @@
+"""
+Bulk export of EEG-Readings as a NumPy .npz archive, for analysis outside the app:
+
+    data = numpy.load("session.npz")["readings"]      # structured array, one row per reading
+    data["timestamp"], data["attention"], ...          # whole columns as float64 / datetime64[us] (UTC)
+
+The archive is written while rows are read from the database (a server-side cursor on PostgreSQL), a chunk at a time,
+so memory use does not grow with the export size. Compacted sessions (gamesession/compaction.py) are unpacked one at a
+time and written in session order among the rows.
+
+Raw EEG (RawEEGChunks, e.g. archived by retention) goes into an .npz of its own, written the same way:
+
+    data = numpy.load("raw.npz")
+    data["chunks"]      # one row per chunk: session, start_time, sample_rate, sample_count
+    data["samples"]     # int16, every chunk's samples one after the other in the order of "chunks"
+"""
+import io
+import zipfile
+from itertools import islice
+
+import numpy as np
+from numpy.lib import format as npy_format
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+
+from .compaction import decode_compacted
+from .ingest import METRIC_FIELDS
+from .models import CompactedReadings, EEGReading
+from .raw import RAW_DTYPE, decode_chunk
+
+EXPORT_DTYPE = np.dtype([("session", "<i8"), ("timestamp", "<M8[us]")] + [(field, "<f8") for field in METRIC_FIELDS])
+EXPORT_CONTENT_TYPE = "application/octet-stream"
+RAW_CHUNK_DTYPE = np.dtype([("session", "<i8"), ("start_time", "<M8[us]"), ("sample_rate", "<i8"), ("sample_count", "<i8")])
+RAW_CHUNK_BATCH = 100 # raw chunks decoded at a time (~100 s of samples)
+
+class _StreamSink(io.RawIOBase):
+    """
+    Write-only, unseekable file for zipfile; take() hands out what was written since the last call.
+    """
+    def __init__(self):
+        self.parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+def select_readings(session_id=None, patient_id=None, start=None, end=None):
+    """
+    Readings of a session and/or a patient's sessions, optionally with start <= timestamp < end.
+    """
+    readings = EEGReading.objects.all()
+    if session_id is not None:
+        readings = readings.filter(session_id=session_id)
+    if patient_id is not None:
+        readings = readings.filter(session__patient_id=patient_id)
+    if start is not None:
+        readings = readings.filter(timestamp__gte=start)
+    if end is not None:
+        readings = readings.filter(timestamp__lt=end)
+    return readings
+
+class CompactedSelection:
+    """
+    The compacted sessions of an export, with the time window to apply to their readings.
+    """
+    def __init__(self, queryset, start=None, end=None):
+        self.queryset, self.start, self.end = queryset.order_by("session_id"), start, end
+
+    def __iter__(self):
+        """
+        Yields the ReadingArrays of each session in the window, in session order.
+        """
+        for compacted in self.queryset.iterator(chunk_size=20):
+            readings = decode_compacted(compacted).window(self.start, self.end)
+            if len(readings):
+                yield readings
+
+    def count(self):
+        if self.start is None and self.end is None:
+            return self.queryset.aggregate(count=Sum("reading_count"))["count"] or 0
+        return sum(len(readings) for readings in self)
+
+def select_compacted(session_id=None, patient_id=None, start=None, end=None):
+    """
+    The compacted sessions matching select_readings' arguments.
+    """
+    compacted = CompactedReadings.objects.all()
+    if session_id is not None:
+        compacted = compacted.filter(session_id=session_id)
+    if patient_id is not None:
+        compacted = compacted.filter(session__patient_id=patient_id)
+    if start is not None:
+        compacted = compacted.filter(last_time__gte=start)
+    if end is not None:
+        compacted = compacted.filter(first_time__lt=end)
+    return CompactedSelection(compacted, start, end)
+
+def prepare_export(readings, compacted=None):
+    """
+    Fixes the rows to export (readings saved until now) and returns (readings, row_count).
+    row_count includes the readings of `compacted` (from select_compacted), if given.
+    """
+    last_id = readings.aggregate(last_id=Max("id"))["last_id"] or 0
+    readings = readings.filter(id__lte=last_id).order_by("session_id", "timestamp", "id")
+    return readings, readings.count() + (compacted.count() if compacted is not None else 0)
+
+def _to_array(rows):
+    chunk = np.empty(len(rows), dtype=EXPORT_DTYPE)
+    columns = list(zip(*rows))
+    chunk["session"] = columns[0]
+    microseconds = np.rint(np.array([t.timestamp() for t in columns[1]]) * 1e6).astype(np.int64)
+    chunk["timestamp"] = microseconds.view("<M8[us]")
+    for i, field in enumerate(METRIC_FIELDS, start=2):
+        chunk[field] = columns[i]
+    return chunk
+
+def _compacted_to_array(readings):
+    chunk = np.empty(len(readings), dtype=EXPORT_DTYPE)
+    chunk["session"] = readings.session_id
+    chunk["timestamp"] = readings.timestamps.view("<M8[us]")
+    for i, field in enumerate(METRIC_FIELDS):
+        chunk[field] = readings.values[:, i]
+    return chunk
+
+def _row_chunks(readings, chunk_rows):
+    rows = readings.values_list("session_id", "timestamp", *METRIC_FIELDS).iterator(chunk_size=chunk_rows)
+    while chunk := list(islice(rows, chunk_rows)):
+        yield _to_array(chunk)
+
+def _in_session_order(chunks, compacted):
+    """
+    The row chunks with each compacted session's readings put in before the rows of later sessions.
+    """
+    sessions = iter(compacted)
+    pending = next(sessions, None)
+    for chunk in chunks:
+        while pending is not None and pending.session_id <= chunk["session"][-1]:
+            split = int(np.searchsorted(chunk["session"], pending.session_id, "left"))
+            yield chunk[:split]
+            yield _compacted_to_array(pending)
+            chunk, pending = chunk[split:], next(sessions, None)
+        yield chunk
+    while pending is not None:
+        yield _compacted_to_array(pending)
+        pending = next(sessions, None)
+
+def _write_member(archive, sink, name, dtype, row_count, chunks):
+    """
+    Writes row_count rows of dtype, taken from the arrays `chunks` yields, as the archive member name.npy.
+    Yields the archive's bytes written so far after each chunk.
+    """
+    written = 0
+    with archive.open(f"{name}.npy", "w", force_zip64=True) as member:
+        header = {"descr": npy_format.dtype_to_descr(dtype), "fortran_order": False, "shape": (row_count,)}
+        npy_format.write_array_header_2_0(member, header)
+        for chunk in chunks:
+            chunk = chunk[:row_count - written] # rows saved after row_count was taken are left out
+            if len(chunk):
+                member.write(chunk.tobytes())
+                written += len(chunk)
+                yield sink.take()
+            if written == row_count:
+                break
+        if written < row_count:
+            # rows were deleted while exporting; the header's shape can no longer be met
+            raise RuntimeError(f"export ended after {written} of {row_count} {name}")
+
+def _archive(sink, compress):
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    return zipfile.ZipFile(sink, "w", compression, allowZip64=True)
+
+def iter_npz(readings, row_count, compress=False, compacted=None):
+    """
+    Yields the bytes of an .npz holding the readings (from prepare_export) as one structured array, "readings",
+    together with the readings of `compacted` if given (the same selection passed to prepare_export).
+    compress deflates the archive (like numpy.savez_compressed): smaller files, slower to write and load.
+    """
+    chunk_rows = getattr(settings, "EEG_EXPORT_CHUNK_ROWS", 10000)
+    sink = _StreamSink()
+    chunks = _row_chunks(readings, chunk_rows)
+    if compacted is not None:
+        chunks = _in_session_order(chunks, compacted)
+    with _archive(sink, compress) as archive:
+        yield from _write_member(archive, sink, "readings", EXPORT_DTYPE, row_count, chunks)
+    yield sink.take() # central directory
+
+def prepare_raw_export(chunks):
+    """
+    Fixes the RawEEGChunks to export (those saved until now, in session and time order).
+    Returns (chunks, chunk_count, sample_count).
+    """
+    last_id = chunks.aggregate(last_id=Max("id"))["last_id"] or 0
+    chunks = chunks.filter(id__lte=last_id).order_by("session_id", "start_time", "id")
+    totals = chunks.aggregate(count=Count("id"), samples=Sum("sample_count"))
+    return chunks, totals["count"], totals["samples"] or 0
+
+def _raw_chunk_rows(chunks):
+    rows = chunks.values_list("session_id", "start_time", "sample_rate", "sample_count").iterator(chunk_size=RAW_CHUNK_BATCH)
+    while batch := list(islice(rows, RAW_CHUNK_BATCH)):
+        array = np.empty(len(batch), dtype=RAW_CHUNK_DTYPE)
+        columns = list(zip(*batch))
+        array["session"], array["sample_rate"], array["sample_count"] = columns[0], columns[2], columns[3]
+        microseconds = np.rint(np.array([t.timestamp() for t in columns[1]]) * 1e6).astype(np.int64)
+        array["start_time"] = microseconds.view("<M8[us]")
+        yield array
+
+def _raw_samples(chunks):
+    data = chunks.values_list("data", flat=True).iterator(chunk_size=RAW_CHUNK_BATCH)
+    while batch := list(islice(data, RAW_CHUNK_BATCH)):
+        yield np.concatenate([decode_chunk(chunk) for chunk in batch])
+
+def iter_raw_npz(chunks, chunk_count, sample_count, compress=False):
+    """
+    Yields the bytes of an .npz of raw EEG (from prepare_raw_export): "chunks" and "samples", see the module docstring.
+    """
+    sink = _StreamSink()
+    with _archive(sink, compress) as archive:
+        yield from _write_member(archive, sink, "chunks", RAW_CHUNK_DTYPE, chunk_count, _raw_chunk_rows(chunks))
+        yield from _write_member(archive, sink, "samples", RAW_DTYPE, sample_count, _raw_samples(chunks))
+    yield sink.take() # central directory
@@ -0,0 +1,163 @@
+"""
+Batch ingestion of EEG-Readings.
+Unity can POST many readings for one session at once (as rows or as columns).
+Numbers are validated a whole column at a time with NumPy, valid rows are written in one go by the ingest writer
+(COPY on PostgreSQL, see gamesession/writers.py),
+and invalid rows are reported back by their index in the batch.
+
+Readings may carry "seq", a sequence number the client increments per session. A reading whose seq is already stored
+for the session is acknowledged but not saved again, so a client can resend a batch it got no answer for, and resume
+after reconnecting from the highest seq the server has (GET sessions/me/<id>/eeg/ack/).
+"""
+from datetime import datetime
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import EEGReading, Session
+from .broker import get_broker, session_channel
+
+METRIC_FIELDS = ["attention", "meditation",
+                 "delta", "theta", "low_alpha", "high_alpha",
+                 "low_beta", "high_beta", "low_gamma", "mid_gamma"]
+READING_FIELDS = ["timestamp"] + METRIC_FIELDS
+SEQ_FIELD = "seq" # optional column
+
+MAX_BATCH_SIZE = 5000 # rows accepted per request
+
+REQUIRED_ERROR = "This field is required."
+NUMBER_ERROR = "A valid number is required."
+DATETIME_ERROR = "Datetime has wrong format."
+INTEGER_ERROR = "A valid integer is required."
+MAX_SEQ = 2 ** 63 - 1
+
+def rows_to_columns(rows):
+    """
+    Turns a list of reading dicts into {field: [values]}; missing keys become None.
+    The seq column is only included if some row has one.
+    """
+    fields = READING_FIELDS + [SEQ_FIELD] if any(SEQ_FIELD in row for row in rows) else READING_FIELDS
+    return {field: [row.get(field) for row in rows] for field in fields}
+
+def _parse_float_column(values):
+    """
+    Returns a float64 array for the column, with NaN where a value is not a finite number.
+    The whole column is converted in one call; only a column containing junk falls back to per-value conversion.
+    """
+    try:
+        column = np.asarray(values, dtype=np.float64)
+        if column.ndim == 1: # nested lists would come back 2-D
+            return column
+    except (TypeError, ValueError):
+        pass
+
+    column = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        try:
+            column[i] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return column
+
+def _parse_timestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime): # MessagePack timestamp extension
+        return value
+    try:
+        parsed = parse_datetime(str(value))
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed) # same as DRF's DateTimeField with USE_TZ
+    return parsed
+
+def _valid_seq(value):
+    return value is None or (isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= MAX_SEQ)
+
+def validate_columns(columns):
+    """
+    Validates columnar readings (every field in READING_FIELDS, all the same length, and optionally SEQ_FIELD).
+    Returns (valid_rows, errors):
+        valid_rows: list of (row_index, timestamp, {metric: value}, seq or None) for rows that passed
+        errors: list of {"index": row_index, "errors": {field: [message]}} for rows that did not
+    """
+    row_errors = {}
+
+    def add_error(index, field, message):
+        row_errors.setdefault(index, {})[field] = [message]
+
+    timestamps = [_parse_timestamp(value) for value in columns["timestamp"]] # ISO strings, no useful NumPy fast path
+    for i, (raw, parsed) in enumerate(zip(columns["timestamp"], timestamps)):
+        if parsed is None:
+            add_error(i, "timestamp", REQUIRED_ERROR if raw is None else DATETIME_ERROR)
+
+    metrics = {}
+    for field in METRIC_FIELDS:
+        values = columns[field]
+        column = _parse_float_column(values)
+        for i in np.flatnonzero(~np.isfinite(column)).tolist():
+            add_error(i, field, REQUIRED_ERROR if values[i] is None else NUMBER_ERROR)
+        metrics[field] = column.tolist()
+
+    seqs = columns.get(SEQ_FIELD) or [None] * len(timestamps)
+    for i, seq in enumerate(seqs):
+        if not _valid_seq(seq):
+            add_error(i, SEQ_FIELD, INTEGER_ERROR)
+
+    valid_rows = [
+        (i, timestamps[i], {field: metrics[field][i] for field in METRIC_FIELDS}, seqs[i])
+        for i in range(len(timestamps)) if i not in row_errors
+    ]
+    errors = [{"index": i, "errors": row_errors[i]} for i in sorted(row_errors)]
+    return valid_rows, errors
+
+def drop_stored_seqs(session_id, valid_rows):
+    """
+    Leaves out rows whose seq is already stored for the session, or repeats an earlier row's seq in the batch.
+    """
+    seqs = {row[3] for row in valid_rows if row[3] is not None}
+    if not seqs:
+        return valid_rows
+    seen = set(EEGReading.objects.filter(session_id=session_id, seq__in=seqs).values_list("seq", flat=True))
+    kept = []
+    for row in valid_rows:
+        seq = row[3]
+        if seq is not None:
+            if seq in seen:
+                continue
+            seen.add(seq)
+        kept.append(row)
+    return kept
+
+def save_readings(session, valid_rows):
+    """
+    Writes validated rows for a session in a single transaction, with the configured writer (see gamesession/writers.py).
+    Rows with a seq already stored are skipped. Returns the number of rows created.
+    """
+    from .writers import get_writer # writers imports METRIC_FIELDS from here
+    with transaction.atomic():
+        if any(seq is not None for _, _, _, seq in valid_rows):
+            # one batch with seqs per session at a time: a concurrent resend then finds the first copy's seqs stored,
+            # so created and duplicates are counted exactly
+            Session.objects.select_for_update().get(pk=session.pk)
+        valid_rows = drop_stored_seqs(session.id, valid_rows)
+        timestamps = [timestamp for _, timestamp, _, _ in valid_rows]
+        values = [[metrics[field] for field in METRIC_FIELDS] for _, _, metrics, _ in valid_rows]
+        seqs = [seq for _, _, _, seq in valid_rows]
+        created = get_writer().write(session.id, timestamps, np.array(values, dtype=np.float64).reshape(-1, len(METRIC_FIELDS)),
+                                     seqs=seqs if any(seq is not None for seq in seqs) else None)
+        rows = [(timestamp, metrics) for _, timestamp, metrics, _ in valid_rows]
+        transaction.on_commit(lambda: publish_readings(session.id, rows))
+    return created
+
+def publish_readings(session_id, rows):
+    """
+    Sends saved readings, as (timestamp, {metric: value}) pairs, to the session's live subscribers
+    (see gamesession/broker.py).
+    """
+    if not rows:
+        return
+    readings = [{"timestamp": timestamp.isoformat(), **metrics} for timestamp, metrics in rows]
+    get_broker().publish(session_channel(session_id), {"type": "readings", "session": session_id, "readings": readings})
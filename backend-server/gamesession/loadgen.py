@@ -0,0 +1,318 @@
+"""
+Load generator for the ingest path: simulates many Unity clients at once (run with manage.py load_test).
+Each simulated patient does what EegSessionUploader does: log in (accounts login), start a session, send readings
+at a fixed rate for a while, and end the session. Readings go out one per POST (what Unity does today), in batches
+per POST, or over the ingest WebSocket.
+
+Only the standard library is used (asyncio streams with keep-alive HTTP/1.1 and a minimal WebSocket client),
+so the harness runs anywhere the server does.
+"""
+import asyncio
+import base64
+import json
+import os
+import random
+import statistics
+import struct
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+from .ingest import METRIC_FIELDS
+
+MODES = ("single", "batch", "websocket")
+
+class LoadTestError(Exception):
+    pass
+
+@dataclass
+class EndpointStats:
+    latencies: list = field(default_factory=list) # seconds, successful calls only
+    errors: int = 0
+    readings: int = 0
+
+class Stats:
+    def __init__(self):
+        self.endpoints = defaultdict(EndpointStats)
+        self.error_samples = []
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, endpoint, seconds, ok, readings=0, error=None):
+        stats = self.endpoints[endpoint]
+        if ok:
+            stats.latencies.append(seconds)
+            stats.readings += readings
+        else:
+            stats.errors += 1
+            if error and len(self.error_samples) < 10:
+                self.error_samples.append(f"{endpoint}: {error}")
+
+    def report(self):
+        """
+        One line per endpoint: calls, throughput, error rate and latency percentiles (ms).
+        """
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        lines = [f"{'endpoint':<28} {'calls':>7} {'calls/s':>8} {'readings/s':>10} {'errors':>7} "
+                 f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+        for name, stats in sorted(self.endpoints.items()):
+            calls = len(stats.latencies) + stats.errors
+            cells = [percentile(stats.latencies, p) * 1000 if stats.latencies else float("nan") for p in (50, 95, 99)]
+            lines.append(f"{name:<28} {calls:>7} {calls / elapsed:>8.1f} {stats.readings / elapsed:>10.1f} "
+                         f"{stats.errors / calls if calls else 0:>7.1%} {cells[0]:>8.1f} {cells[1]:>8.1f} {cells[2]:>8.1f}")
+        lines.append(f"elapsed {elapsed:.1f}s")
+        lines += [f"error: {sample}" for sample in self.error_samples]
+        return "\n".join(lines)
+
+def percentile(values, p):
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    return statistics.quantiles(ordered, n=100, method="inclusive")[p - 1]
+
+class HTTPConnection:
+    """
+    One keep-alive HTTP/1.1 connection (what a Unity client holds). JSON in, (status, parsed body) out.
+    """
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        if parts.scheme != "http":
+            raise LoadTestError("only http:// servers are supported (run against a local server).")
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None, token=None):
+        try:
+            return await self._request(method, path, body, token)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            await self.close() # don't reuse a connection left mid-response
+            raise
+
+    async def _request(self, method, path, body, token):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode() if body is not None else b""
+        headers = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Content-Type: application/json",
+                   f"Content-Length: {len(data)}", "Connection: keep-alive"]
+        if token:
+            headers.append(f"Authorization: Bearer {token}")
+        self.writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + data)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            await self.close()
+            raise ConnectionError("server closed the connection")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            payload = b""
+            while (size := int((await self.reader.readline()).strip(), 16)):
+                payload += await self.reader.readexactly(size)
+                await self.reader.readline()
+            await self.reader.readline()
+        else:
+            payload = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+        if response_headers.get("connection") == "close":
+            await self.close()
+        try:
+            return status, json.loads(payload) if payload else None
+        except ValueError:
+            return status, payload.decode(errors="replace")
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+class WebSocketConnection:
+    """
+    Minimal client side of RFC 6455: text frames only, enough to talk to the ingest socket.
+    """
+    async def connect(self, base_url, path):
+        parts = urlsplit(base_url)
+        self.reader, self.writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.writer.write((f"GET {path} HTTP/1.1\r\nHost: {parts.hostname}:{parts.port or 80}\r\nUpgrade: websocket\r\n"
+                           f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        while await self.reader.readline() not in (b"\r\n", b""):
+            pass
+        if b" 101 " not in status_line:
+            raise LoadTestError(f"WebSocket handshake failed: {status_line.decode().strip()}")
+
+    async def send_text(self, text):
+        payload, mask = text.encode(), os.urandom(4)
+        length = len(payload)
+        header = bytes([0x81]) # FIN + text
+        if length < 126:
+            header += bytes([0x80 | length])
+        elif length < 1 << 16:
+            header += bytes([0x80 | 126]) + struct.pack(">H", length)
+        else:
+            header += bytes([0x80 | 127]) + struct.pack(">Q", length)
+        keystream = (mask * (length // 4 + 1))[:length]
+        masked = (int.from_bytes(payload, "big") ^ int.from_bytes(keystream, "big")).to_bytes(length, "big")
+        self.writer.write(header + mask + masked)
+        await self.writer.drain()
+
+    async def receive_text(self):
+        """
+        Returns the next text message, or None once the server closes.
+        """
+        while True:
+            first, second = await self.reader.readexactly(2)
+            length = second & 0x7F
+            if length == 126:
+                (length,) = struct.unpack(">H", await self.reader.readexactly(2))
+            elif length == 127:
+                (length,) = struct.unpack(">Q", await self.reader.readexactly(8))
+            payload = await self.reader.readexactly(length) # server frames are not masked
+            opcode = first & 0x0F
+            if opcode == 0x8:
+                return None
+            if opcode == 0x1:
+                return payload.decode()
+
+    async def close(self):
+        self.writer.write(bytes([0x88, 0x80]) + os.urandom(4)) # close frame, empty masked payload
+        await self.writer.drain()
+        self.writer.close()
+
+def make_reading(timestamp, session_id=None):
+    reading = {"timestamp": timestamp.isoformat(), **{name: random.random() for name in METRIC_FIELDS}}
+    if session_id is not None:
+        reading["session"] = session_id
+    return reading
+
+@dataclass
+class LoadTestConfig:
+    base_url: str
+    patients: list # (email, password)
+    game_id: int
+    mode: str = "single"
+    rate: float = 1.0 # readings per second per patient
+    duration: float = 30.0 # seconds of streaming per patient
+    batch_interval: float = 1.0 # seconds of readings per POST / WebSocket message (batch, websocket)
+    ramp_up: float = 5.0 # seconds over which patients start
+
+class LoadTest:
+    def __init__(self, config):
+        self.config = config
+        self.stats = Stats()
+
+    async def timed(self, endpoint, call, readings=0, expect=(200, 201)):
+        started = time.perf_counter()
+        try:
+            status, body = await call
+        except (OSError, asyncio.IncompleteReadError, ValueError, LoadTestError) as e:
+            self.stats.record(endpoint, time.perf_counter() - started, False, error=repr(e))
+            return None
+        ok = status in expect
+        self.stats.record(endpoint, time.perf_counter() - started, ok, readings, error=None if ok else f"{status} {body}")
+        return body if ok else None
+
+    async def run(self):
+        config = self.config
+        delays = [config.ramp_up * i / max(1, len(config.patients)) for i in range(len(config.patients))]
+        self.stats = Stats()
+        await asyncio.gather(*(self.patient(email, password, delay) for (email, password), delay in zip(config.patients, delays)))
+        self.stats.finished = time.perf_counter()
+        return self.stats
+
+    async def patient(self, email, password, delay):
+        await asyncio.sleep(delay)
+        connection = HTTPConnection(self.config.base_url)
+        try:
+            tokens = await self.timed("POST login", connection.request("POST", "/api/accounts/login/",
+                                                                       {"email": email, "password": password}))
+            if not tokens:
+                return
+            token = tokens["access"]
+            session = await self.timed("POST sessions/start", connection.request(
+                "POST", "/api/gamesession/sessions/start/", {"game_id": self.config.game_id}, token))
+            if not session:
+                return
+
+            if self.config.mode == "websocket":
+                await self.stream_websocket(session["id"], token)
+            else:
+                await self.stream_http(connection, session["id"], token)
+
+            await self.timed("POST sessions/end", connection.request(
+                "POST", f"/api/gamesession/sessions/{session['id']}/end/", {}, token))
+        finally:
+            await connection.close()
+
+    def schedule(self):
+        """
+        Returns (send times relative to the start, readings per send). A slow server doesn't stretch the schedule:
+        the next send just goes out late, as a real headset keeps producing readings.
+        """
+        config = self.config
+        per_send = 1 if config.mode == "single" else max(1, round(config.rate * config.batch_interval))
+        interval = per_send / config.rate
+        return [i * interval for i in range(int(config.duration / interval))], per_send
+
+    def readings(self, count, session_id=None):
+        now = datetime.now(timezone.utc)
+        return [make_reading(now - timedelta(seconds=(count - 1 - i) / self.config.rate), session_id) for i in range(count)]
+
+    async def stream_http(self, connection, session_id, token):
+        loop = asyncio.get_running_loop()
+        offsets, per_send = self.schedule()
+        start = loop.time()
+        for offset in offsets:
+            await asyncio.sleep(max(0.0, start + offset - loop.time()))
+            if per_send == 1:
+                body, endpoint = self.readings(1, session_id)[0], "POST eeg-readings (single)"
+            else:
+                body, endpoint = {"session": session_id, "readings": self.readings(per_send)}, "POST eeg-readings (batch)"
+            await self.timed(endpoint, connection.request("POST", "/api/gamesession/eeg-readings/", body, token), per_send)
+
+    async def stream_websocket(self, session_id, token):
+        socket = WebSocketConnection()
+        started = time.perf_counter()
+        try:
+            await socket.connect(self.config.base_url, f"/ws/gamesession/sessions/{session_id}/ingest/?token={token}")
+        except (OSError, asyncio.IncompleteReadError, LoadTestError) as e:
+            self.stats.record("WS connect", time.perf_counter() - started, False, error=repr(e))
+            return
+        self.stats.record("WS connect", time.perf_counter() - started, True)
+
+        loop = asyncio.get_running_loop()
+        offsets, per_send = self.schedule()
+        start = loop.time()
+        try:
+            for message_id, offset in enumerate(offsets):
+                await asyncio.sleep(max(0.0, start + offset - loop.time()))
+                sent = time.perf_counter()
+                await socket.send_text(json.dumps({"id": message_id, "readings": self.readings(per_send)}))
+                # wait for this message's ack (the server only acks once it has room, see gamesession/streaming.py)
+                while True:
+                    text = await socket.receive_text()
+                    if text is None:
+                        raise ConnectionError("server closed the WebSocket")
+                    message = json.loads(text)
+                    if message.get("type") == "ack" and message.get("id") == message_id:
+                        ok = not message["errors"]
+                        self.stats.record("WS ingest ack", time.perf_counter() - sent, ok, message["accepted"],
+                                          error=None if ok else str(message["errors"][:1]))
+                        break
+                    if message.get("type") == "error":
+                        self.stats.record("WS ingest ack", time.perf_counter() - sent, False, error=message["error"])
+                        break
+        except (OSError, asyncio.IncompleteReadError) as e:
+            self.stats.record("WS ingest ack", 0.0, False, error=repr(e))
+        finally:
+            try:
+                await socket.close()
+            except OSError:
+                pass
@@ -0,0 +1,66 @@
+"""
+Measures EEG-Reading write throughput (rows/sec) of each ingest writer (gamesession/writers.py), writing batches the
+size of a batch POST into one session. Every run is rolled back, so nothing is left behind.
+
+    python manage.py benchmark_eeg_ingest
+    python manage.py benchmark_eeg_ingest --rows 1000000 --batch-size 5000 --repeat 3
+
+COPY only runs on PostgreSQL; elsewhere only bulk_create is measured.
+"""
+import statistics
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from gamesession.ingest import METRIC_FIELDS, MAX_BATCH_SIZE
+from gamesession.models import Game, Session
+from gamesession.writers import BulkCreateWriter, CopyWriter
+
+BENCHMARK_EMAIL = "benchmark-ingest@example.com"
+BENCHMARK_GAME = "Benchmark"
+
+class Command(BaseCommand):
+    help = "Reports EEG-Reading ingest throughput for bulk_create and (on PostgreSQL) COPY."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200000, help="rows written per run")
+        parser.add_argument("--batch-size", type=int, default=MAX_BATCH_SIZE, help="rows per write (one batch POST)")
+        parser.add_argument("--repeat", type=int, default=3, help="runs per writer")
+
+    def handle(self, *args, **options):
+        writers = {"bulk_create": BulkCreateWriter()}
+        if connection.vendor == "postgresql":
+            writers["copy"] = CopyWriter()
+
+        rows, batch_size = options["rows"], options["batch_size"]
+        start = timezone.now()
+        timestamps = [start + timedelta(milliseconds=i * 2) for i in range(batch_size)] # ~512 Hz
+        values = np.random.default_rng(0).random((batch_size, len(METRIC_FIELDS)))
+        self.stdout.write(f"{rows} rows in batches of {batch_size} ({connection.vendor})")
+
+        for name, writer in writers.items():
+            rates = []
+            for _ in range(options["repeat"]):
+                with transaction.atomic():
+                    session = self.get_session()
+                    started = time.perf_counter()
+                    written = 0
+                    while written < rows:
+                        count = min(batch_size, rows - written)
+                        with transaction.atomic(): # one transaction per batch, as in save_readings
+                            written += writer.write(session.id, timestamps[:count], values[:count])
+                    rates.append(written / (time.perf_counter() - started))
+                    transaction.set_rollback(True)
+            self.stdout.write(f"{name}: median {statistics.median(rates):,.0f} rows/s "
+                              f"(min {min(rates):,.0f}, max {max(rates):,.0f})")
+
+    def get_session(self):
+        patient, _ = CustomUser.objects.get_or_create(email=BENCHMARK_EMAIL, defaults={"username": BENCHMARK_EMAIL,
+                                                                                      "is_patient": True})
+        game, _ = Game.objects.get_or_create(name=BENCHMARK_GAME)
+        return Session.objects.create(patient=patient, game=game, start_time=timezone.now())
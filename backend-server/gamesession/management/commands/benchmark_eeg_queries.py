@@ -0,0 +1,142 @@
+"""
+Seeds a benchmark patient with many sessions of EEG-Readings, then reports query plans and latencies of the main
+read paths with and without the composite indexes (the "without" run drops them inside a transaction that is rolled back).
+
+    python manage.py benchmark_eeg_queries --sessions 2000 --readings-per-session 10000   # 20M readings
+    python manage.py benchmark_eeg_queries --skip-seed --repeat 50
+    python manage.py benchmark_eeg_queries --cleanup
+
+Run against a development database: dropping an index locks the table until the transaction ends.
+"""
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from gamesession.models import EEGReading, Game, Prescription, Session
+from gamesession.ingest import METRIC_FIELDS
+
+BENCHMARK_EMAIL = "benchmark-patient@example.com"
+BENCHMARK_DOCTOR_EMAIL = "benchmark-doctor@example.com"
+BENCHMARK_GAME = "Benchmark"
+BRIN_INDEX_NAME = "eegreading_ts_brin_idx" # created by migration 0004 on PostgreSQL
+
+class Command(BaseCommand):
+    help = "Seeds EEG readings and reports query plans/latencies for the EEG and session read paths, before and after indexing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=200)
+        parser.add_argument("--readings-per-session", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=20, help="timed runs per query")
+        parser.add_argument("--skip-seed", action="store_true", help="reuse previously seeded data")
+        parser.add_argument("--no-explain", action="store_true", help="only print latencies")
+        parser.add_argument("--cleanup", action="store_true", help="delete the benchmark data and exit")
+
+    def handle(self, *args, **options):
+        if options["cleanup"]:
+            CustomUser.objects.filter(email__in=[BENCHMARK_EMAIL, BENCHMARK_DOCTOR_EMAIL]).delete()
+            Game.objects.filter(name=BENCHMARK_GAME).delete()
+            self.stdout.write("benchmark data deleted")
+            return
+
+        patient, doctor, game = self.get_fixtures()
+        if not options["skip_seed"]:
+            self.seed(patient, doctor, game, options["sessions"], options["readings_per_session"])
+
+        total = EEGReading.objects.filter(session__patient=patient).count()
+        self.stdout.write(f"{total} readings in {patient.sessions.count()} benchmark sessions ({connection.vendor})")
+
+        queries = self.get_queries(patient, doctor)
+        with transaction.atomic():
+            self.drop_indexes()
+            self.run_queries("without composite indexes", queries, options)
+            transaction.set_rollback(True) # puts the indexes back
+        self.run_queries("with composite indexes", queries, options)
+
+    def get_fixtures(self):
+        patient, _ = CustomUser.objects.get_or_create(email=BENCHMARK_EMAIL, defaults={"is_patient": True})
+        doctor, _ = CustomUser.objects.get_or_create(email=BENCHMARK_DOCTOR_EMAIL, defaults={"is_doctor": True})
+        game, _ = Game.objects.get_or_create(name=BENCHMARK_GAME)
+        return patient, doctor, game
+
+    def seed(self, patient, doctor, game, session_count, readings_per_session):
+        self.stdout.write(f"seeding {session_count} sessions x {readings_per_session} readings...")
+        started = time.perf_counter()
+
+        Prescription.objects.get_or_create(doctor=doctor, patient=patient, game=game)
+        first_start = timezone.now() - timedelta(days=session_count)
+        sessions = Session.objects.bulk_create([
+            Session(patient=patient, game=game, start_time=first_start + timedelta(days=i),
+                    end_time=first_start + timedelta(days=i, seconds=readings_per_session))
+            for i in range(session_count)
+        ])
+
+        if connection.vendor == "postgresql":
+            # generate rows inside the database; tens of millions of ORM objects would take hours
+            metrics = ", ".join(METRIC_FIELDS)
+            randoms = ", ".join("random() * 100" for _ in METRIC_FIELDS)
+            with connection.cursor() as cursor:
+                for session in sessions:
+                    cursor.execute(
+                        f"INSERT INTO {EEGReading._meta.db_table} (session_id, timestamp, {metrics}) "
+                        f"SELECT %s, %s + g * interval '1 second', {randoms} FROM generate_series(0, %s - 1) g",
+                        [session.id, session.start_time, readings_per_session],
+                    )
+        else:
+            for session in sessions:
+                EEGReading.objects.bulk_create([
+                    EEGReading(session=session, timestamp=session.start_time + timedelta(seconds=i),
+                               **{field: float(i % 100) for field in METRIC_FIELDS})
+                    for i in range(readings_per_session)
+                ], batch_size=5000)
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {EEGReading._meta.db_table}")
+        self.stdout.write(f"seeded in {time.perf_counter() - started:.1f}s")
+
+    def get_queries(self, patient, doctor):
+        sessions = list(patient.sessions.order_by("start_time"))
+        session = sessions[len(sessions) // 2] # middle of the table, not the first rows inserted
+        window_start = session.start_time + timedelta(minutes=10)
+        return {
+            "session readings, first page": EEGReading.objects.filter(session=session).order_by("timestamp", "id")[:500],
+            "session readings, 5 min window": EEGReading.objects.filter(
+                session=session, timestamp__gte=window_start, timestamp__lt=window_start + timedelta(minutes=5)
+            ).order_by("timestamp"),
+            "readings across sessions by time": EEGReading.objects.filter(
+                timestamp__gte=window_start, timestamp__lt=window_start + timedelta(minutes=1)
+            ),
+            "patient sessions by start_time": Session.objects.filter(patient=patient).order_by("-start_time")[:50],
+            "doctor active prescriptions": Prescription.objects.filter(doctor=doctor, active=True),
+            "patient active prescriptions": Prescription.objects.filter(patient=patient, active=True),
+        }
+
+    def drop_indexes(self):
+        names = [index.name for model in (EEGReading, Session, Prescription) for index in model._meta.indexes]
+        if connection.vendor == "postgresql":
+            names.append(BRIN_INDEX_NAME)
+        with connection.cursor() as cursor:
+            for name in names:
+                cursor.execute(f"DROP INDEX IF EXISTS {connection.ops.quote_name(name)}")
+
+    def run_queries(self, label, queries, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {label} =="))
+        for name, queryset in queries.items():
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                list(queryset.all()) # .all() clones, so nothing is cached between runs
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(f"{name}: median {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms")
+
+            if not options["no_explain"]:
+                analyze = {"analyze": True} if connection.vendor == "postgresql" else {}
+                for line in queryset.explain(**analyze).splitlines():
+                    self.stdout.write(f"    {line}")
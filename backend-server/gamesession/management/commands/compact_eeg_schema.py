@@ -0,0 +1,37 @@
+"""
+Copies EEG-Readings into the compact (4-byte) metric columns in batches, between migrations 0009 and 0010
+(see gamesession/compact_schema.py):
+
+    python manage.py migrate gamesession 0009
+    python manage.py compact_eeg_schema --batch-size 20000 --pause 0.1
+    python manage.py migrate
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from gamesession.compact_schema import DEFAULT_BATCH_SIZE, backfill_compact_columns, has_compact_columns
+
+class Command(BaseCommand):
+    help = "Copies EEG-Reading metrics into the compact columns added by migration 0009, one batch at a time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="ids per transaction")
+        parser.add_argument("--pause", type=float, default=0.0, help="seconds to wait between batches")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if connection.vendor != "postgresql":
+            self.stdout.write(f"nothing to copy on {connection.vendor}: migration 0010 alters the columns directly")
+            return
+        if not has_compact_columns():
+            self.stdout.write("no compact columns: run migrate gamesession 0009 first (or 0010 has already swapped them in)")
+            return
+
+        def progress(result, last_id):
+            self.stdout.write(f"batch {result.batches}: up to id {last_id}, {result.rows} readings copied")
+
+        result = backfill_compact_columns(options["batch_size"], options["pause"],
+                                          on_batch=progress if options["verbosity"] > 1 else None)
+        self.stdout.write(f"{result.rows} readings copied in {result.batches} batches; "
+                          f"run migrate to swap in the compact columns")
@@ -0,0 +1,33 @@
+"""
+Periodic rollup pass (see gamesession/rollups.py): rolls up readings of every session whose rollup is missing
+or behind, including sessions still in progress. Run it from cron, e.g. every few minutes:
+
+    python manage.py compact_rollups
+    python manage.py compact_rollups --since-days 2    # only sessions started in the last 2 days
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from gamesession.models import Session
+from gamesession.rollups import update_session_rollups
+
+class Command(BaseCommand):
+    help = "Brings session-minute, session and patient-day rollups up to date."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since-days", type=int, default=None, help="only sessions started this many days ago or later")
+
+    def handle(self, *args, **options):
+        sessions = Session.objects.annotate(last_reading_id=Max("eeg_readings__id")).filter(
+            Q(rollup__isnull=True) | Q(last_reading_id__gt=F("rollup__last_reading_id")), last_reading_id__isnull=False)
+        if options["since_days"] is not None:
+            sessions = sessions.filter(start_time__gte=timezone.now() - timedelta(days=options["since_days"]))
+
+        updated = 0
+        for session in sessions.order_by("id"):
+            update_session_rollups(session)
+            updated += 1
+        self.stdout.write(f"rolled up {updated} session(s)")
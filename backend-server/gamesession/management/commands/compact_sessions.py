@@ -0,0 +1,39 @@
+"""
+Packs the EEG-Readings of ended sessions into one compressed blob per session (see gamesession/compaction.py).
+Picks up sessions never compacted and compacted sessions that got readings since. Run it from cron, e.g. nightly:
+
+    python manage.py compact_sessions                          # sessions that ended at least a day ago
+    python manage.py compact_sessions --ended-hours 1 --limit 500
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from gamesession.compaction import compact_session
+from gamesession.models import EEGReading, Session
+
+class Command(BaseCommand):
+    help = "Compacts the EEG-Readings of sessions that ended a while ago."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ended-hours", type=float, default=24.0, help="only sessions ended at least this long ago")
+        parser.add_argument("--limit", type=int, default=None, help="compact at most this many sessions")
+
+    def handle(self, *args, **options):
+        sessions = Session.objects.filter(
+            Exists(EEGReading.objects.filter(session=OuterRef("pk"))),
+            end_time__lte=timezone.now() - timedelta(hours=options["ended_hours"])).order_by("id")
+        if options["limit"] is not None:
+            sessions = sessions[:options["limit"]]
+
+        count = readings = blob_bytes = 0
+        for session in sessions:
+            compacted = compact_session(session)
+            if compacted is None: # its readings were deleted meanwhile
+                continue
+            count += 1
+            readings += compacted.reading_count
+            blob_bytes += len(compacted.data)
+        self.stdout.write(f"compacted {count} session(s): {readings} readings in {blob_bytes} bytes")
@@ -0,0 +1,46 @@
+"""
+Maintains EEG-Reading storage (see gamesession/partitions.py). Run it daily from cron:
+
+    python manage.py eeg_partitions                        # create partitions for the coming months
+    python manage.py eeg_partitions --retention            # ...and archive/drop months past EEG_RETENTION_MONTHS
+                                                           # (readings, compacted readings and raw chunks)
+    python manage.py eeg_partitions --retention --retention-months 24 --dry-run
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from gamesession.partitions import apply_retention, ensure_partitions, is_partitioned
+
+class Command(BaseCommand):
+    help = "Creates upcoming monthly EEG-Reading partitions and applies the retention policy."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=getattr(settings, "EEG_PARTITION_MONTHS_AHEAD", 3))
+        parser.add_argument("--retention", action="store_true",
+                            help="archive and remove expired months of readings, compacted readings and raw chunks")
+        parser.add_argument("--retention-months", type=int, default=getattr(settings, "EEG_RETENTION_MONTHS", None))
+        parser.add_argument("--archive-dir", default=getattr(settings, "EEG_ARCHIVE_DIR", "eeg-archive"))
+        parser.add_argument("--keep-detached", action="store_true", help="detach expired partitions but don't drop them")
+        parser.add_argument("--dry-run", action="store_true", help="only report what retention would do")
+
+    def handle(self, *args, **options):
+        if is_partitioned():
+            if not options["dry_run"]:
+                for name in ensure_partitions(options["months_ahead"]):
+                    self.stdout.write(f"created partition {name}")
+        else:
+            self.stdout.write("EEG-Readings are not partitioned (PostgreSQL only); skipping partition creation")
+
+        if not options["retention"]:
+            return
+        if options["retention_months"] is None:
+            raise CommandError("no retention period: set EEG_RETENTION_MONTHS or pass --retention-months.")
+
+        handled = apply_retention(options["retention_months"], options["archive_dir"],
+                                  keep_detached=options["keep_detached"], dry_run=options["dry_run"])
+        for month in handled:
+            action = "would archive" if options["dry_run"] else "archived"
+            target = f" to {month.path}" if month.path else ""
+            self.stdout.write(f"{action} {month.label}: {month.rows} {month.kind}{target}")
+        if not handled:
+            self.stdout.write("nothing older than the retention period")
@@ -0,0 +1,43 @@
+"""
+Exports EEG-Readings to a NumPy .npz file (see gamesession/export.py).
+
+    python manage.py export_eeg --session 12 -o session-12.npz
+    python manage.py export_eeg --patient 4 --start 2025-01-01 --end 2025-02-01 -o patient-4-jan.npz
+"""
+import argparse
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from gamesession.export import select_readings, select_compacted, prepare_export, iter_npz
+
+def _datetime(value):
+    # argparse turns ArgumentTypeError (and ValueError from parse_datetime) into a usage error
+    parsed = parse_datetime(value) if "T" in value or " " in value else parse_datetime(f"{value}T00:00:00")
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f"not a date or datetime: {value}")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+class Command(BaseCommand):
+    help = "Writes EEG-Readings of a session, a patient and/or a time range to an .npz file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--session", type=int)
+        parser.add_argument("--patient", type=int, help="patient user id")
+        parser.add_argument("--start", type=_datetime, help="ISO date or datetime (inclusive)")
+        parser.add_argument("--end", type=_datetime, help="ISO date or datetime (exclusive)")
+        parser.add_argument("-o", "--output", required=True, help="path of the .npz file to write")
+
+    def handle(self, *args, **options):
+        if options["session"] is None and options["patient"] is None and options["start"] is None:
+            raise CommandError("give --session, --patient and/or --start to limit the export.")
+
+        selection = {"session_id": options["session"], "patient_id": options["patient"],
+                     "start": options["start"], "end": options["end"]}
+        compacted = select_compacted(**selection)
+        readings, row_count = prepare_export(select_readings(**selection), compacted)
+        with open(options["output"], "wb") as output:
+            for data in iter_npz(readings, row_count, compacted=compacted):
+                output.write(data)
+        self.stdout.write(f"wrote {row_count} readings to {options['output']}")
@@ -0,0 +1,45 @@
+"""
+Imports a BrainLogger CSV (Unity's BrainLog_*.csv) into a session, streaming the file (see gamesession/brainlog.py).
+
+    python manage.py import_brainlog BrainLog_20250105_100000.csv --session 12
+    python manage.py import_brainlog BrainLog_20250105_100000.csv --patient 4 --game 1
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser
+from gamesession.brainlog import import_brainlog_file
+from gamesession.models import Game, Session
+from gamesession.tasks import enqueue_session_import_jobs
+
+class Command(BaseCommand):
+    help = "Imports a BrainLogger CSV into an existing session, or into a new session for a patient and game."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--session", type=int, help="existing session id")
+        parser.add_argument("--patient", type=int, help="patient user id (new session)")
+        parser.add_argument("--game", type=int, help="game id (new session)")
+
+    def handle(self, *args, **options):
+        session = patient = game = None
+        try:
+            if options["session"] is not None:
+                session = Session.objects.get(id=options["session"])
+                patient = session.patient
+            elif options["patient"] is not None and options["game"] is not None:
+                patient = CustomUser.objects.get(id=options["patient"])
+                game = Game.objects.get(id=options["game"])
+            else:
+                raise CommandError("give --session, or --patient and --game for a new session.")
+        except (Session.DoesNotExist, CustomUser.DoesNotExist, Game.DoesNotExist) as e:
+            raise CommandError(str(e))
+
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as lines:
+                session, result = import_brainlog_file(lines, patient, session=session, game=game)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            raise CommandError(f"{options['path']}: {e}")
+
+        enqueue_session_import_jobs(session)
+        self.stdout.write(f"session {session.id}: {result.readings} readings, {result.raw_samples} raw samples, "
+                          f"{result.skipped_count} lines skipped")
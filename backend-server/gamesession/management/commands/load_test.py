@@ -0,0 +1,70 @@
+"""
+Simulates many Unity clients against a running server (see gamesession/loadgen.py) and reports per-endpoint
+throughput, error rates and p50/p95/p99 latencies.
+
+    python manage.py load_test --setup --patients 50                        # create the load test patients once
+    python manage.py load_test --patients 50 --rate 1 --duration 60         # one reading per POST, like Unity today
+    python manage.py load_test --patients 200 --mode batch --rate 10
+    python manage.py load_test --patients 200 --mode websocket --rate 10 --url http://127.0.0.1:8000   # uvicorn
+
+The server must use the same database as this command (patients are created directly in it).
+"""
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser
+from gamesession.loadgen import MODES, LoadTest, LoadTestConfig, LoadTestError
+from gamesession.models import Game
+
+LOAD_TEST_GAME = "Load test"
+LOAD_TEST_PASSWORD = "load-test-password"
+
+def patient_email(index):
+    return f"loadtest-patient-{index}@example.com"
+
+class Command(BaseCommand):
+    help = "Runs a load test of simulated patients: login, start session, stream readings, end session."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument("--patients", type=int, default=10)
+        parser.add_argument("--mode", choices=MODES, default="single",
+                            help="single: one reading per POST; batch: one POST per --batch-interval; websocket: ingest socket")
+        parser.add_argument("--rate", type=float, default=1.0, help="readings per second per patient")
+        parser.add_argument("--duration", type=float, default=30.0, help="seconds of streaming per patient")
+        parser.add_argument("--batch-interval", type=float, default=1.0, help="seconds of readings per request (batch, websocket)")
+        parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds over which patients start")
+        parser.add_argument("--setup", action="store_true", help="create the load test patients and game, then exit")
+
+    def handle(self, *args, **options):
+        if options["setup"]:
+            self.setup(options["patients"])
+            return
+
+        game = Game.objects.filter(name=LOAD_TEST_GAME).first()
+        if game is None:
+            raise CommandError("no load test data: run with --setup first.")
+        config = LoadTestConfig(
+            base_url=options["url"].rstrip("/"),
+            patients=[(patient_email(i), LOAD_TEST_PASSWORD) for i in range(options["patients"])],
+            game_id=game.id, mode=options["mode"], rate=options["rate"], duration=options["duration"],
+            batch_interval=options["batch_interval"], ramp_up=options["ramp_up"],
+        )
+        self.stdout.write(f"{options['patients']} patients, {options['mode']} mode, {options['rate']} readings/s each, "
+                          f"{options['duration']}s against {config.base_url}")
+        try:
+            stats = asyncio.run(LoadTest(config).run())
+        except LoadTestError as e:
+            raise CommandError(str(e))
+        self.stdout.write(stats.report())
+
+    def setup(self, count):
+        Game.objects.get_or_create(name=LOAD_TEST_GAME)
+        created = 0
+        for i in range(count):
+            email = patient_email(i)
+            if not CustomUser.objects.filter(email=email).exists():
+                CustomUser.objects.create_user(email=email, username=email, password=LOAD_TEST_PASSWORD, is_patient=True)
+                created += 1
+        self.stdout.write(f"{created} load test patients created ({count} available)")
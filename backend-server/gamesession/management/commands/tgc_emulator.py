@@ -0,0 +1,54 @@
+"""
+Emulates a ThinkGear Connector with a synthetic headset (see gamesession/thinkgear.py), for running Unity or the
+ingest path without hardware.
+
+    python manage.py tgc_emulator                                        # TGC on 127.0.0.1:13854, real time
+    python manage.py tgc_emulator --port 13860 --speed 4 --dropout-rate 2 --seed 7
+    python manage.py tgc_emulator --brainlog BrainLog_synthetic.csv --seconds 600   # a recording for import_brainlog
+"""
+import asyncio
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gamesession.thinkgear import TGC_PORT, SignalModel, ThinkGearEmulator, serve
+
+class Command(BaseCommand):
+    help = "Runs a synthetic ThinkGear Connector on TCP, or writes a synthetic BrainLogger CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=TGC_PORT)
+        parser.add_argument("--seconds", type=int, help="length of each recording (default: until disconnected)")
+        parser.add_argument("--speed", type=float, default=1.0, help="playback speed; 0 streams as fast as possible")
+        parser.add_argument("--brainlog", metavar="PATH", help="write a BrainLogger CSV of --seconds instead of serving")
+        parser.add_argument("--seed", type=int)
+        parser.add_argument("--attention", type=float, default=SignalModel.attention)
+        parser.add_argument("--meditation", type=float, default=SignalModel.meditation)
+        parser.add_argument("--noise", type=float, default=SignalModel.noise)
+        parser.add_argument("--blink-rate", type=float, default=SignalModel.blink_rate, help="blinks per minute")
+        parser.add_argument("--dropout-rate", type=float, default=SignalModel.dropout_rate,
+                            help="contact losses per minute")
+        parser.add_argument("--dropout-seconds", type=float, default=SignalModel.dropout_seconds)
+
+    def handle(self, *args, **options):
+        model = SignalModel(attention=options["attention"], meditation=options["meditation"], noise=options["noise"],
+                            blink_rate=options["blink_rate"], dropout_rate=options["dropout_rate"],
+                            dropout_seconds=options["dropout_seconds"], seed=options["seed"])
+
+        if options["brainlog"]:
+            if not options["seconds"]:
+                raise CommandError("--brainlog needs --seconds.")
+            with open(options["brainlog"], "w") as output:
+                output.writelines(ThinkGearEmulator(model).brainlog_lines(datetime.now(dt_timezone.utc), options["seconds"]))
+            self.stdout.write(f"{options['seconds']}s BrainLogger recording written to {options['brainlog']}")
+            return
+
+        def ready(port):
+            self.stdout.write(f"ThinkGear Connector emulator on {options['host']}:{port} (Ctrl-C to stop)")
+        try:
+            asyncio.run(serve(model, options["host"], options["port"], options["seconds"], options["speed"], ready))
+        except KeyboardInterrupt:
+            pass
+        except OSError as e:
+            raise CommandError(str(e))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamesession', '0002_game_rename_user_session_patient_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RawEEGChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField()),
+                ('sample_rate', models.PositiveIntegerField(default=512)),
+                ('sample_count', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='raw_chunks', to='gamesession.session')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['session', 'start_time'], name='rawchunk_session_start_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+BRIN_INDEX_NAME = 'eegreading_ts_brin_idx'
+
+
+def create_brin_index(apps, schema_editor):
+    # readings are inserted in roughly timestamp order, so a BRIN index is tiny and cheap to maintain (PostgreSQL only)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {BRIN_INDEX_NAME} ON gamesession_eegreading USING brin ("timestamp")'
+    )
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {BRIN_INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamesession', '0003_raweegchunk'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eegreading',
+            index=models.Index(fields=['session', 'timestamp'], name='eegreading_session_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['doctor', 'active'], name='rx_doctor_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['patient', 'active'], name='rx_patient_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['patient', 'start_time'], name='session_patient_start_idx'),
+        ),
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
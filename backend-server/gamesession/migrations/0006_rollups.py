@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamesession', '0005_report_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reading_count', models.PositiveIntegerField(default=0)),
+                ('attention_sum', models.FloatField(default=0)),
+                ('attention_min', models.FloatField(blank=True, null=True)),
+                ('attention_max', models.FloatField(blank=True, null=True)),
+                ('meditation_sum', models.FloatField(default=0)),
+                ('meditation_min', models.FloatField(blank=True, null=True)),
+                ('meditation_max', models.FloatField(blank=True, null=True)),
+                ('last_reading_id', models.BigIntegerField(default=0)),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rollup', to='gamesession.session')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='PatientDayRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reading_count', models.PositiveIntegerField(default=0)),
+                ('attention_sum', models.FloatField(default=0)),
+                ('attention_min', models.FloatField(blank=True, null=True)),
+                ('attention_max', models.FloatField(blank=True, null=True)),
+                ('meditation_sum', models.FloatField(default=0)),
+                ('meditation_min', models.FloatField(blank=True, null=True)),
+                ('meditation_max', models.FloatField(blank=True, null=True)),
+                ('day', models.DateField()),
+                ('session_count', models.PositiveIntegerField(default=0)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('patient', 'day'), name='unique_patient_day_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SessionMinuteRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reading_count', models.PositiveIntegerField(default=0)),
+                ('attention_sum', models.FloatField(default=0)),
+                ('attention_min', models.FloatField(blank=True, null=True)),
+                ('attention_max', models.FloatField(blank=True, null=True)),
+                ('meditation_sum', models.FloatField(default=0)),
+                ('meditation_min', models.FloatField(blank=True, null=True)),
+                ('meditation_max', models.FloatField(blank=True, null=True)),
+                ('minute', models.DateTimeField()),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='minute_rollups', to='gamesession.session')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('session', 'minute'), name='unique_session_minute_rollup')],
+            },
+        ),
+    ]
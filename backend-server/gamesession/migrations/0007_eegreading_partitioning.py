@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+
+from django.db import migrations
+
+TABLE = 'gamesession_eegreading'
+LEGACY = f'{TABLE}_legacy'
+DEFAULT = f'{TABLE}_default'
+SEQUENCE = f'{TABLE}_id_seq'
+MONTHS_AHEAD = 3
+
+
+def next_month(value):
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_eegreading(apps, schema_editor):
+    """
+    Turns gamesession_eegreading into a table partitioned by month of "timestamp" (PostgreSQL only).
+    Existing rows are not copied: the old table becomes the first partition, covering everything up to the end of
+    the month of its newest row (or this month); monthly partitions and a default partition are added after it.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    execute = schema_editor.execute
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass', [TABLE])
+        if cursor.fetchone():
+            return
+        cursor.execute(f'SELECT max("timestamp"), coalesce(max(id), 0) FROM {TABLE}')
+        latest, max_id = cursor.fetchone()
+        # indexes and foreign keys are recreated on the parent under the same names (minus the primary key)
+        cursor.execute('SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s',
+                       [TABLE])
+        indexes = cursor.fetchall()
+        cursor.execute("SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass "
+                       "AND contype IN ('p', 'f')", [TABLE])
+        constraints = cursor.fetchall()
+        cursor.execute("SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'", [TABLE])
+        is_identity = cursor.fetchone()[0] != ''
+
+    now = datetime.now(timezone.utc)
+    first_month = next_month(max(latest, now) if latest else now)
+
+    execute(f'ALTER TABLE {TABLE} RENAME TO {LEGACY}')
+    for name, definition in constraints:
+        if definition.startswith('PRIMARY KEY'):
+            execute(f'ALTER TABLE {LEGACY} DROP CONSTRAINT {name}') # a partition cannot keep its own primary key
+    primary_key_indexes = {name for name, definition in constraints if definition.startswith('PRIMARY KEY')}
+    for name, _ in indexes:
+        if name not in primary_key_indexes:
+            execute(f'ALTER INDEX {name} RENAME TO {name[:56]}_legacy')
+
+    # the parent owns the id sequence; the old table's identity/serial default goes away
+    if is_identity:
+        execute(f'ALTER TABLE {LEGACY} ALTER COLUMN id DROP IDENTITY')
+    else:
+        execute(f'ALTER TABLE {LEGACY} ALTER COLUMN id DROP DEFAULT')
+    execute(f'DROP SEQUENCE IF EXISTS {SEQUENCE}')
+    execute(f'CREATE SEQUENCE {SEQUENCE}')
+    if max_id:
+        execute(f"SELECT setval('{SEQUENCE}', {max_id})")
+
+    execute(f'CREATE TABLE {TABLE} (LIKE {LEGACY}) PARTITION BY RANGE ("timestamp")')
+    execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE}')")
+    execute(f'ALTER SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id')
+    execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, "timestamp")')
+    execute(f"ALTER TABLE {TABLE} ATTACH PARTITION {LEGACY} FOR VALUES FROM (MINVALUE) TO ('{first_month.isoformat()}')")
+
+    # matching indexes of the old table are attached to these rather than rebuilt
+    for name, definition in indexes:
+        if name not in primary_key_indexes:
+            execute(definition.replace('CREATE INDEX', 'CREATE INDEX IF NOT EXISTS', 1))
+    for name, definition in constraints:
+        if definition.startswith('FOREIGN KEY'):
+            execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}')
+
+    execute(f'CREATE TABLE {DEFAULT} PARTITION OF {TABLE} DEFAULT')
+    month = first_month
+    for _ in range(MONTHS_AHEAD):
+        name = f'{TABLE}_p{month:%Y_%m}'
+        execute(f"CREATE TABLE {name} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')")
+        month = next_month(month)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamesession', '0006_rollups'),
+    ]
+
+    operations = [
+        # not reversed: the partitioned table has the same columns, so earlier migrations' code works against it
+        migrations.RunPython(partition_eegreading, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamesession', '0007_eegreading_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eegreading',
+            name='seq',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='eegreading',
+            constraint=models.UniqueConstraint(fields=('session', 'seq', 'timestamp'), name='eegreading_session_seq_uniq'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+TABLE = 'gamesession_eegreading'
+METRICS = ['attention', 'meditation', 'delta', 'theta', 'low_alpha', 'high_alpha',
+           'low_beta', 'high_beta', 'low_gamma', 'mid_gamma']
+
+
+def add_compact_columns(apps, schema_editor):
+    """
+    Adds a nullable 4-byte "<metric>_compact" column next to every metric (PostgreSQL only): without a default this is
+    a catalog change, not a table rewrite. manage.py compact_eeg_schema fills them in batches and migration 0010 swaps
+    them in for the 8-byte columns (see gamesession/compact_schema.py).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    columns = ', '.join(f'ADD COLUMN IF NOT EXISTS {name}_compact real' for name in METRICS)
+    schema_editor.execute(f'ALTER TABLE {TABLE} {columns}')
+
+
+def drop_compact_columns(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    columns = ', '.join(f'DROP COLUMN IF EXISTS {name}_compact' for name in METRICS)
+    schema_editor.execute(f'ALTER TABLE {TABLE} {columns}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamesession', '0008_eegreading_seq'),
+    ]
+
+    operations = [
+        # database only: the model keeps describing the metric columns that exist until 0010
+        migrations.RunPython(add_compact_columns, drop_compact_columns),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations, models
+
+import gamesession.models
+
+TABLE = 'gamesession_eegreading'
+METRICS = ['attention', 'meditation', 'delta', 'theta', 'low_alpha', 'high_alpha',
+           'low_beta', 'high_beta', 'low_gamma', 'mid_gamma']
+
+
+def swap_in_compact_columns(apps, schema_editor):
+    """
+    Makes the metric columns 4 bytes wide.
+    PostgreSQL: copies the rows manage.py compact_eeg_schema has not (all of them if it never ran), then replaces every
+    metric column by its "_compact" twin from 0009; rows are not rewritten here, only renamed and checked for NULLs.
+    Elsewhere: a plain ALTER to the RealField column type.
+    """
+    EEGReading = apps.get_model('gamesession', 'EEGReading')
+    if schema_editor.connection.vendor != 'postgresql':
+        for name in METRICS:
+            old_field = EEGReading._meta.get_field(name)
+            new_field = gamesession.models.RealField()
+            new_field.set_attributes_from_name(name)
+            schema_editor.alter_field(EEGReading, old_field, new_field)
+        return
+
+    execute = schema_editor.execute
+    copied = ', '.join(f'{name}_compact = {name}' for name in METRICS)
+    execute(f'UPDATE {TABLE} SET {copied} WHERE attention_compact IS NULL')
+    execute(f'ALTER TABLE {TABLE} ' + ', '.join(f'DROP COLUMN {name}' for name in METRICS))
+    for name in METRICS:
+        execute(f'ALTER TABLE {TABLE} RENAME COLUMN {name}_compact TO {name}')
+    execute(f'ALTER TABLE {TABLE} ' + ', '.join(f'ALTER COLUMN {name} SET NOT NULL' for name in METRICS))
+
+
+def widen_metric_columns(apps, schema_editor):
+    EEGReading = apps.get_model('gamesession', 'EEGReading')
+    for name in METRICS:
+        old_field = EEGReading._meta.get_field(name)
+        new_field = models.FloatField()
+        new_field.set_attributes_from_name(name)
+        schema_editor.alter_field(EEGReading, old_field, new_field)
+    if schema_editor.connection.vendor == 'postgresql': # 0009's reverse drops these again
+        schema_editor.execute(f'ALTER TABLE {TABLE} ' +
+                              ', '.join(f'ADD COLUMN IF NOT EXISTS {name}_compact real' for name in METRICS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamesession', '0009_eegreading_compact_columns'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(swap_in_compact_columns, widen_metric_columns)],
+            state_operations=[
+                migrations.AlterField(model_name='eegreading', name=name, field=gamesession.models.RealField())
+                for name in METRICS
+            ],
+        ),
+    ]
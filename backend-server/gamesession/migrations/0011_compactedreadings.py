@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamesession', '0010_eegreading_compact_schema'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompactedReadings',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reading_count', models.PositiveIntegerField(default=0)),
+                ('attention_sum', models.FloatField(default=0)),
+                ('attention_min', models.FloatField(blank=True, null=True)),
+                ('attention_max', models.FloatField(blank=True, null=True)),
+                ('meditation_sum', models.FloatField(default=0)),
+                ('meditation_min', models.FloatField(blank=True, null=True)),
+                ('meditation_max', models.FloatField(blank=True, null=True)),
+                ('compacted_at', models.DateTimeField(auto_now=True)),
+                ('first_time', models.DateTimeField()),
+                ('last_time', models.DateTimeField()),
+                ('format', models.PositiveSmallIntegerField(default=1)),
+                ('data', models.BinaryField()),
+                ('session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='compacted_readings', to='gamesession.session')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
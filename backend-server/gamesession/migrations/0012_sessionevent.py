@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamesession', '0011_compactedreadings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField()),
+                ('event_type', models.CharField(max_length=50)),
+                ('value', models.FloatField(blank=True, null=True)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='gamesession.session')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['session', 'event_type', 'timestamp'], name='event_session_type_ts_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+CONSTRAINT = models.UniqueConstraint(fields=('session', 'seq'), name='eegreading_session_seq_only_uniq')
+
+
+def add_session_seq_constraint(apps, schema_editor):
+    """
+    Adds the unique (session, seq) constraint except on PostgreSQL, where the table is partitioned by "timestamp" and
+    a unique constraint has to include it (eegreading_session_seq_uniq, migration 0008, is the one enforced there).
+    Readings that repeat an earlier reading's (session, seq) under another timestamp are deleted first.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        return
+    EEGReading = apps.get_model('gamesession', 'EEGReading')
+    first_ids = list(EEGReading.objects.filter(seq__isnull=False).values('session', 'seq')
+                 .annotate(first_id=models.Min('id')).values_list('first_id', flat=True))
+    EEGReading.objects.filter(seq__isnull=False).exclude(id__in=first_ids).delete()
+    # the constraint's own SQL: SQLite's add_constraint() rebuilds the table from this (older) model state instead
+    schema_editor.execute(CONSTRAINT.create_sql(EEGReading, schema_editor))
+
+
+def remove_session_seq_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        return
+    schema_editor.execute(CONSTRAINT.remove_sql(apps.get_model('gamesession', 'EEGReading'), schema_editor))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamesession', '0012_sessionevent'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(add_session_seq_constraint, remove_session_seq_constraint)],
+            state_operations=[migrations.AddConstraint(model_name='eegreading', constraint=CONSTRAINT)],
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Cast, Coalesce, Greatest, Least, NullIf
 from django.conf import settings
 
 # Create your models here.
@@ -16,6 +17,37 @@ class Prescription(models.Model): # connects doctor to patient through game
     created_at = models.DateTimeField(auto_now_add=True)
     active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["doctor", "active"], name="rx_doctor_active_idx"),
+            models.Index(fields=["patient", "active"], name="rx_patient_active_idx"),
+        ]
+
+class SessionQuerySet(models.QuerySet):
+    def with_reading_summary(self):
+        """
+        Annotates each session with reading counts and attention/meditation min/max/mean,
+        aggregated by the database in the same query instead of loading the readings.
+        A compacted session (see gamesession/compaction.py) keeps its stats with the blob; rows saved since are added in.
+        """
+        compacted = "compacted_readings__"
+        row_count, compacted_count = models.Count("eeg_readings"), Coalesce(models.F(f"{compacted}reading_count"), 0)
+        annotations = {"reading_count": row_count + compacted_count}
+        for metric in ("attention", "meditation"):
+            # a compacted session can have rows saved after its compaction (merged on read): combine both sources.
+            # Least/Greatest of NULL is NULL on some databases, so each side falls back to the other
+            row_min, row_max = models.Min(f"eeg_readings__{metric}"), models.Max(f"eeg_readings__{metric}")
+            compacted_min, compacted_max = models.F(f"{compacted}{metric}_min"), models.F(f"{compacted}{metric}_max")
+            annotations[f"{metric}_min"] = Least(Coalesce(row_min, compacted_min), Coalesce(compacted_min, row_min),
+                                                 output_field=models.FloatField())
+            annotations[f"{metric}_max"] = Greatest(Coalesce(row_max, compacted_max), Coalesce(compacted_max, row_max),
+                                                    output_field=models.FloatField())
+            row_sum = Coalesce(models.Sum(Cast(f"eeg_readings__{metric}", models.FloatField())), 0.0)
+            annotations[f"{metric}_mean"] = models.ExpressionWrapper(
+                (row_sum + Coalesce(models.F(f"{compacted}{metric}_sum"), 0.0)) / NullIf(row_count + compacted_count, 0),
+                output_field=models.FloatField())
+        return self.annotate(**annotations)
+
 class Session(models.Model):
     patient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="sessions")
     game = models.ForeignKey(Game, on_delete=models.CASCADE)
@@ -23,22 +55,125 @@ class Session(models.Model):
     start_time = models.DateTimeField()
     end_time = models.DateTimeField(blank=True, null=True) 
 
+    objects = SessionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["patient", "start_time"], name="session_patient_start_idx")]
+
+class RealField(models.FloatField):
+    """
+    A 4-byte float column (PostgreSQL "real", MySQL "float") instead of FloatField's 8-byte double; SQLite only has one
+    REAL type. ~7 significant digits: Unity sends 32-bit floats, BrainLogger band powers are integers below 2**24.
+    """
+    def db_type(self, connection):
+        if connection.vendor == "postgresql":
+            return "real"
+        if connection.vendor == "mysql":
+            return "float"
+        return super().db_type(connection)
+
 class EEGReading(models.Model):
     session = models.ForeignKey(Session, on_delete=models.CASCADE, related_name="eeg_readings")
     timestamp = models.DateTimeField()
-    attention = models.FloatField()
-    meditation = models.FloatField()
-    delta = models.FloatField()
-    theta = models.FloatField()
-    low_alpha = models.FloatField()
-    high_alpha = models.FloatField()
-    low_beta  = models.FloatField()
-    high_beta  = models.FloatField()
-    low_gamma = models.FloatField()
-    mid_gamma = models.FloatField()
-    # add marker, blinked, level_index variables
+    # 4-byte metrics halve the row's payload (migrated in batches on PostgreSQL, see gamesession/compact_schema.py)
+    attention = RealField()
+    meditation = RealField()
+    delta = RealField()
+    theta = RealField()
+    low_alpha = RealField()
+    high_alpha = RealField()
+    low_beta  = RealField()
+    high_beta  = RealField()
+    low_gamma = RealField()
+    mid_gamma = RealField()
+    # the client's per-session sequence number (optional): a resent reading with a seq already stored is not saved twice
+    seq = models.PositiveBigIntegerField(blank=True, null=True)
+    # in-game markers (blinks, level changes, ...) are SessionEvents, not reading columns
+
+    class Meta:
+        # every read path filters by session and orders/filters by timestamp
+        # (a BRIN index on timestamp is added on PostgreSQL only, see migration 0004)
+        indexes = [models.Index(fields=["session", "timestamp"], name="eegreading_session_ts_idx")]
+        constraints = [
+            # ingest de-duplicates on (session, seq) (see save_readings in gamesession/ingest.py); this backs it up for
+            # concurrent resends. "timestamp" is part of it because PostgreSQL enforces uniqueness per partition only
+            # (see gamesession/partitions.py); it only catches a resend that repeats its timestamp.
+            models.UniqueConstraint(fields=["session", "seq", "timestamp"], name="eegreading_session_seq_uniq"),
+            # the plain (session, seq) rule, which also catches a resend with a new timestamp: created on every
+            # database but PostgreSQL, where it can't be (see migration 0013)
+            models.UniqueConstraint(fields=["session", "seq"], name="eegreading_session_seq_only_uniq"),
+        ]
+
+class SessionEvent(models.Model):
+    # something that happened in the game at a point in time (e.g. "blink", "level_start", "cube_lit"), to line up with
+    # the EEG-Readings around it (see gamesession/epochs.py)
+    session = models.ForeignKey(Session, on_delete=models.CASCADE, related_name="events")
+    timestamp = models.DateTimeField()
+    event_type = models.CharField(max_length=50)
+    value = models.FloatField(blank=True, null=True) # e.g. the level index or score, if the event has one
+    data = models.JSONField(default=dict, blank=True) # anything else the game sends along
+
+    class Meta:
+        # epoch extraction reads one session's events of one type in time order
+        indexes = [models.Index(fields=["session", "event_type", "timestamp"], name="event_session_type_ts_idx")]
 
 class Report(models.Model):
+    # computed once when the session ends (gamesession/reports.py) so dashboards don't re-aggregate readings
     session = models.OneToOneField(Session, on_delete=models.CASCADE, related_name="report")
     created_at = models.DateTimeField(auto_now_add=True)
-    # what will the report look like and how will it be stored?
\ No newline at end of file
+    sample_count = models.PositiveIntegerField(default=0)
+    duration_seconds = models.FloatField(blank=True, null=True) # first to last reading
+    summary = models.JSONField(default=dict) # per-channel stats, time above threshold, band ratios, gaps
+
+class RawEEGChunk(models.Model):
+    # raw ThinkGear samples (512 Hz) stored as one compressed int16 array per second instead of one row per sample
+    session = models.ForeignKey(Session, on_delete=models.CASCADE, related_name="raw_chunks")
+    start_time = models.DateTimeField() # time of the first sample in the chunk
+    sample_rate = models.PositiveIntegerField(default=512)
+    sample_count = models.PositiveIntegerField()
+    data = models.BinaryField() # zlib-compressed little-endian int16 samples (see gamesession/raw.py)
+
+    class Meta:
+        indexes = [models.Index(fields=["session", "start_time"], name="rawchunk_session_start_idx")]
+
+# Rollups for long-term trends (maintained by gamesession/rollups.py); means are sum / reading_count
+class RollupStats(models.Model):
+    reading_count = models.PositiveIntegerField(default=0)
+    attention_sum = models.FloatField(default=0)
+    attention_min = models.FloatField(blank=True, null=True)
+    attention_max = models.FloatField(blank=True, null=True)
+    meditation_sum = models.FloatField(default=0)
+    meditation_min = models.FloatField(blank=True, null=True)
+    meditation_max = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        abstract = True
+
+class SessionMinuteRollup(RollupStats):
+    session = models.ForeignKey(Session, on_delete=models.CASCADE, related_name="minute_rollups")
+    minute = models.DateTimeField() # start of the minute (UTC)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["session", "minute"], name="unique_session_minute_rollup")]
+
+class SessionRollup(RollupStats):
+    session = models.OneToOneField(Session, on_delete=models.CASCADE, related_name="rollup")
+    last_reading_id = models.BigIntegerField(default=0) # readings with a higher id are not rolled up yet
+
+class PatientDayRollup(RollupStats):
+    patient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="day_rollups")
+    day = models.DateField() # UTC
+    session_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["patient", "day"], name="unique_patient_day_rollup")]
+
+class CompactedReadings(RollupStats):
+    # all EEG-Readings of an ended session packed into one compressed columnar blob (gamesession/compaction.py);
+    # the stats fields keep session lists' summaries without unpacking it
+    session = models.OneToOneField(Session, on_delete=models.CASCADE, related_name="compacted_readings")
+    compacted_at = models.DateTimeField(auto_now=True)
+    first_time = models.DateTimeField()
+    last_time = models.DateTimeField()
+    format = models.PositiveSmallIntegerField(default=1) # blob layout version
+    data = models.BinaryField()
@@ -0,0 +1,149 @@
+"""
+Query helpers for the EEG read endpoints: time-window filtering, field projection and keyset (cursor) pagination.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+def parse_time_window(request):
+    """
+    Reads optional start/end (ISO datetimes) from the query string. Returns {"start": ..., "end": ...} with only the ones given.
+    """
+    window = {}
+    for name in ("start", "end"):
+        value = request.query_params.get(name)
+        if value is None:
+            continue
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: "Datetime has wrong format."})
+        window[name] = timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+    return window
+
+def filter_time_window(queryset, request):
+    """
+    Keeps readings with start <= timestamp < end.
+    """
+    window = parse_time_window(request)
+    if "start" in window:
+        queryset = queryset.filter(timestamp__gte=window["start"])
+    if "end" in window:
+        queryset = queryset.filter(timestamp__lt=window["end"])
+    return queryset
+
+def parse_fields(request, allowed, param="fields"):
+    """
+    Reads ?fields=a,b,c (or another comma-separated param). Returns None (all fields) if not given.
+    """
+    value = request.query_params.get(param)
+    if not value:
+        return None
+    fields = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValidationError({param: f"unknown fields: {', '.join(unknown)}."})
+    return fields
+
+class EEGReadingKeysetPagination:
+    """
+    Cursor pagination for EEG-Readings ordered by (session, timestamp, id).
+    Each page continues strictly after the last row of the previous one, so deep pages cost the same as the first
+    (no OFFSET) and rows inserted while paging do not shift the pages.
+    Query params: page_size (default 500, max 5000) and cursor (taken from the "next" link).
+    Response: {"next": <url or null>, "results": [...]}.
+    """
+    page_size = 500
+    max_page_size = 5000
+    ordering = ("session_id", "timestamp", "id")
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            session_id, timestamp, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(session_id__gt=session_id)
+                | Q(session_id=session_id, timestamp__gt=timestamp)
+                | Q(session_id=session_id, timestamp=timestamp, id__gt=pk)
+            )
+
+        rows = list(queryset.order_by(*self.ordering)[:page_size + 1]) # one extra row tells us if there is a next page
+        self.next_cursor = self.encode_cursor(*self.cursor_key(rows[page_size - 1])) if len(rows) > page_size else None
+        return rows[:page_size]
+
+    def paginate_values(self, queryset, request, columns):
+        """
+        Like paginate_queryset, but returns values_list() tuples of `columns`, followed by any ordering columns
+        not among them.
+        """
+        return self.paginate_queryset(queryset.values_list(*self._select(columns)), request)
+
+    def paginate_arrays(self, arrays, request, columns):
+        """
+        Like paginate_values, for the ReadingArrays of a compacted session (see gamesession/compaction.py):
+        the cursor's position is found by binary search in the sorted columns instead of by a query.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        selected = self._select(columns)
+
+        cursor = request.query_params.get("cursor")
+        start = arrays.position_after(*self.decode_cursor(cursor)) if cursor else 0
+        rows = arrays.take(slice(start, start + page_size + 1)).rows(selected)
+        self.next_cursor = self.encode_cursor(*self.cursor_key(rows[page_size - 1])) if len(rows) > page_size else None
+        return rows[:page_size]
+
+    def _select(self, columns):
+        # `columns` plus the ordering columns not among them; cursor_key reads the ordering back out of such a row
+        selected = list(columns) + [name for name in self.ordering if name not in columns]
+        positions = [selected.index(name) for name in self.ordering]
+        self.cursor_key = lambda row: [row[i] for i in positions]
+        return selected
+
+    @staticmethod
+    def cursor_key(reading):
+        return reading.session_id, reading.timestamp, reading.id
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), "cursor", self.next_cursor)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get("page_size", self.page_size))
+        except ValueError:
+            raise ValidationError({"page_size": "A valid integer is required."})
+        if page_size < 1:
+            raise ValidationError({"page_size": "Ensure this value is greater than or equal to 1."})
+        return min(page_size, self.max_page_size)
+
+    @staticmethod
+    def encode_cursor(session_id, timestamp, pk):
+        key = [session_id, timestamp.isoformat(), pk]
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            session_id, timestamp, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            timestamp = parse_datetime(timestamp)
+            if timestamp is None:
+                raise ValueError
+            return int(session_id), timestamp, int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound("Invalid cursor")
@@ -0,0 +1,56 @@
+"""
+Request body parsers for the EEG ingest endpoints: JSON or MessagePack (application/msgpack), either one optionally
+compressed with Content-Encoding: gzip or deflate.
+
+MessagePack carries floats as 8-byte binary instead of decimal text, and timestamps either as ISO strings or as the
+MessagePack timestamp extension. Sent in the "columns" layout ({"session": 3, "columns": {"timestamp": [...],
+"attention": [...], ...}}), field names are not repeated per reading either.
+"""
+import io
+import zlib
+
+import msgpack
+from django.conf import settings
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from rest_framework.parsers import BaseParser, JSONParser
+
+from .rendering import MSGPACK_MEDIA_TYPE
+
+CONTENT_ENCODINGS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS} # zlib wbits for each format
+
+def decode_body(stream, parser_context):
+    """
+    Returns the request body stream, decompressed if it was sent with a Content-Encoding. The decompressed body is
+    held to DATA_UPLOAD_MAX_MEMORY_SIZE, the limit Django applies to uncompressed bodies.
+    """
+    encoding = parser_context["request"].META.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+    if encoding in ("", "identity"):
+        return stream
+    if encoding not in CONTENT_ENCODINGS:
+        raise UnsupportedMediaType(encoding, detail=f"Unsupported Content-Encoding \"{encoding}\" in request.")
+
+    limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+    decompressor = zlib.decompressobj(CONTENT_ENCODINGS[encoding])
+    try:
+        body = decompressor.decompress(stream.read(), (limit + 1) if limit else 0)
+    except zlib.error:
+        raise ParseError(f"Request body is not valid {encoding} data.")
+    if limit and len(body) > limit:
+        raise ParseError(f"Decompressed request body is larger than {limit} bytes.")
+    if not decompressor.eof:
+        raise ParseError(f"Request body is truncated {encoding} data.")
+    return io.BytesIO(body)
+
+class CompressedJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        return super().parse(decode_body(stream, parser_context), media_type, parser_context)
+
+class MessagePackParser(BaseParser):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        body = decode_body(stream, parser_context).read()
+        try:
+            return msgpack.unpackb(body, timestamp=3) # timestamp extension -> aware datetime
+        except (ValueError, TypeError) as e: # ExtraData, FormatError, StackError and truncated input are ValueErrors
+            raise ParseError(f"MessagePack parse error - {e}")
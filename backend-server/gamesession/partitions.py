@@ -0,0 +1,245 @@
+"""
+Monthly range partitioning of EEG-Readings by timestamp (PostgreSQL; the table is converted by migration 0007),
+and the retention policy for old readings.
+
+    gamesession_eegreading                  partitioned parent, primary key (id, timestamp)
+    gamesession_eegreading_legacy           rows from before partitioning: (MINVALUE) .. first partitioned month
+    gamesession_eegreading_p2026_01 ...     one partition per month, created ahead by manage.py eeg_partitions
+    gamesession_eegreading_default          catch-all for months without a partition (e.g. a device with a bad clock);
+                                            its rows move into a month's partition when that partition is created
+
+Unique constraints on EEGReading must include "timestamp" on PostgreSQL (a partitioned table can only enforce
+uniqueness per partition).
+
+Retention (settings.EEG_RETENTION_MONTHS) writes each month older than the cutoff to a compressed .npz
+(gamesession/export.py format) in settings.EEG_ARCHIVE_DIR, then detaches and drops its partition: a metadata change
+instead of a table-wide DELETE and the vacuum after it. On databases without partitioning the month's rows are deleted.
+The same goes, a month per file, for the other EEG data, which is deleted: compacted readings (gamesession/compaction.py)
+of sessions whose last reading is before the cutoff, and raw chunks (gamesession/raw.py) that start before it.
+An archive never replaces an earlier one of the same month; it gets a numbered name instead.
+"""
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.db import connection, transaction
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .export import CompactedSelection, iter_npz, iter_raw_npz, prepare_export, prepare_raw_export
+from .models import CompactedReadings, EEGReading, RawEEGChunk
+
+TABLE = EEGReading._meta.db_table
+LEGACY_PARTITION = f"{TABLE}_legacy"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+BOUND_PATTERN = re.compile(r"FROM \((?P<lower>.+?)\) TO \((?P<upper>.+?)\)")
+
+@dataclass
+class Partition:
+    name: str
+    lower: datetime = None # None: MINVALUE
+    upper: datetime = None # None: MAXVALUE
+    is_default: bool = False
+
+    @property
+    def label(self):
+        return self.name[len(TABLE) + 1:] if self.name.startswith(f"{TABLE}_") else self.name
+
+def month_start(value):
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y_%m}"
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [TABLE])
+        return cursor.fetchone() is not None
+
+def _parse_bound(value):
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return parse_datetime(value.strip("'"))
+
+def list_partitions():
+    """
+    The partitions of the EEG-Reading table, ordered by lower bound (the default partition last).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass", [TABLE])
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound)
+        if match is None:
+            partitions.append(Partition(name, is_default=True))
+        else:
+            partitions.append(Partition(name, _parse_bound(match["lower"]), _parse_bound(match["upper"])))
+    first = datetime.min.replace(tzinfo=dt_timezone.utc)
+    return sorted(partitions, key=lambda p: (p.is_default, p.lower or first))
+
+def _literal(value):
+    return f"'{value.isoformat()}'"
+
+def create_month_partition(month):
+    """
+    Creates and attaches the partition for a month, moving that month's rows out of the default partition.
+    Writes into the default partition wait for it (reads don't); they only land there when cron has lapsed.
+    """
+    name, table = connection.ops.quote_name(partition_name(month)), connection.ops.quote_name(TABLE)
+    default = connection.ops.quote_name(DEFAULT_PARTITION)
+    lower, upper = _literal(month), _literal(add_months(month, 1))
+    in_month = f'"timestamp" >= {lower} AND "timestamp" < {upper}'
+    with transaction.atomic(), connection.cursor() as cursor:
+        # no rows may land in the default partition until the new one is attached: one inserted after the move would
+        # make ATTACH fail, or (without the lock, under READ COMMITTED) be deleted without being copied
+        cursor.execute(f"LOCK TABLE {default} IN EXCLUSIVE MODE")
+        cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+        cursor.execute(f"WITH moved AS (DELETE FROM {default} WHERE {in_month} RETURNING *) "
+                       f"INSERT INTO {name} SELECT * FROM moved")
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})")
+
+def ensure_partitions(months_ahead, now=None):
+    """
+    Makes sure the current month and the next `months_ahead` months have partitions. Returns the names created.
+    """
+    partitions = [p for p in list_partitions() if not p.is_default]
+    current = month_start(now or timezone.now())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        covered = any((p.lower is None or p.lower <= month) and (p.upper is None or month < p.upper) for p in partitions)
+        if not covered:
+            create_month_partition(month)
+            created.append(partition_name(month))
+    return created
+
+@dataclass
+class ArchivedMonth:
+    label: str
+    rows: int
+    path: Path = None
+    kind: str = "readings" # what rows counts: "readings", "compacted readings" or "raw chunks"
+
+def _expired_months(first, cutoff):
+    """
+    (label, lower, upper) for every month from the one of `first` (None: no data) up to the cutoff.
+    """
+    ranges = []
+    month = month_start(first) if first else cutoff
+    while month < cutoff:
+        ranges.append((f"p{month:%Y_%m}", month, add_months(month, 1)))
+        month = add_months(month, 1)
+    return ranges
+
+def _expired_ranges(cutoff):
+    """
+    (label, lower, upper, partition) for every stretch of readings entirely before the cutoff.
+    """
+    if is_partitioned():
+        return [(p.label, p.lower, p.upper, p) for p in list_partitions()
+                if not p.is_default and p.upper is not None and p.upper <= cutoff]
+    first = EEGReading.objects.aggregate(first=Min("timestamp"))["first"]
+    return [(label, lower, upper, None) for label, lower, upper in _expired_months(first, cutoff)]
+
+def _write_archive(archive_dir, name, data):
+    """
+    Writes the bytes `data` yields to name.npz in archive_dir (name-2.npz, ... if that exists). Returns the path.
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path, number = archive_dir / f"{name}.npz", 1
+    while path.exists():
+        number += 1
+        path = archive_dir / f"{name}-{number}.npz"
+    partial = path.with_suffix(".npz.partial")
+    with open(partial, "wb") as output:
+        for part in data:
+            output.write(part)
+        output.flush()
+        os.fsync(output.fileno()) # the rows are dropped next; the archive has to be on disk first
+    partial.replace(path)
+    return path
+
+def _expire_compacted(cutoff, archive_dir, dry_run):
+    first = CompactedReadings.objects.aggregate(first=Min("last_time"))["first"]
+    handled = []
+    for label, lower, upper in _expired_months(first, cutoff):
+        # fixed up front, so a blob re-compacted meanwhile is neither archived nor deleted half-way
+        ids = list(CompactedReadings.objects.filter(last_time__gte=lower, last_time__lt=upper).values_list("id", flat=True))
+        if not ids:
+            continue
+        compacted = CompactedSelection(CompactedReadings.objects.filter(id__in=ids))
+        readings, row_count = prepare_export(EEGReading.objects.none(), compacted)
+        archived = ArchivedMonth(label, row_count, kind="compacted readings")
+        handled.append(archived)
+        if dry_run:
+            continue
+        name = f"{CompactedReadings._meta.db_table}_{label}"
+        archived.path = _write_archive(archive_dir, name, iter_npz(readings, row_count, compress=True, compacted=compacted))
+        CompactedReadings.objects.filter(id__in=ids).delete()
+    return handled
+
+def _expire_raw(cutoff, archive_dir, dry_run):
+    first = RawEEGChunk.objects.aggregate(first=Min("start_time"))["first"]
+    handled = []
+    for label, lower, upper in _expired_months(first, cutoff):
+        chunks, chunk_count, sample_count = prepare_raw_export(
+            RawEEGChunk.objects.filter(start_time__gte=lower, start_time__lt=upper))
+        if not chunk_count:
+            continue
+        archived = ArchivedMonth(label, chunk_count, kind="raw chunks")
+        handled.append(archived)
+        if dry_run:
+            continue
+        name = f"{RawEEGChunk._meta.db_table}_{label}"
+        archived.path = _write_archive(archive_dir, name, iter_raw_npz(chunks, chunk_count, sample_count, compress=True))
+        chunks.delete()
+    return handled
+
+def apply_retention(months, archive_dir, now=None, keep_detached=False, dry_run=False):
+    """
+    Archives and removes readings of months ending `months` months or more before the current month, then the
+    compacted readings and raw chunks before that cutoff.
+    Returns an ArchivedMonth per month and kind handled (or that would be, with dry_run).
+    """
+    cutoff = add_months(month_start(now or timezone.now()), -months)
+    archive_dir = Path(archive_dir)
+    handled = []
+    for label, lower, upper, partition in _expired_ranges(cutoff):
+        readings = EEGReading.objects.filter(timestamp__lt=upper)
+        if lower is not None:
+            readings = readings.filter(timestamp__gte=lower)
+        readings, row_count = prepare_export(readings)
+        archived = ArchivedMonth(label, row_count)
+        handled.append(archived)
+        if dry_run:
+            continue
+
+        if row_count:
+            archived.path = _write_archive(archive_dir, f"{TABLE}_{label}", iter_npz(readings, row_count, compress=True))
+
+        if partition is None:
+            readings.delete()
+        else:
+            with connection.cursor() as cursor:
+                name = connection.ops.quote_name(partition.name)
+                cursor.execute(f"ALTER TABLE {connection.ops.quote_name(TABLE)} DETACH PARTITION {name}")
+                if not keep_detached:
+                    cursor.execute(f"DROP TABLE {name}")
+    handled += _expire_compacted(cutoff, archive_dir, dry_run)
+    handled += _expire_raw(cutoff, archive_dir, dry_run)
+    return handled
@@ -0,0 +1,100 @@
+"""
+Storage of raw EEG samples (RawEEGChunk).
+Samples are kept as zlib-compressed little-endian int16 arrays, one chunk per second of recording,
+so an hour of 512 Hz data is ~3600 rows instead of ~1.8M.
+"""
+import base64
+import binascii
+import math
+import zlib
+from datetime import timedelta
+
+import numpy as np
+from .models import RawEEGChunk
+
+RAW_DTYPE = np.dtype("<i2") # ThinkGear raw values are signed 16-bit
+DEFAULT_SAMPLE_RATE = 512
+COMPRESSION_LEVEL = 6
+
+def parse_samples(samples=None, data=None):
+    """
+    Returns an int16 array from either a list of ints (samples) or base64 encoded little-endian int16 bytes (data).
+    Raises ValueError if the values are not whole numbers in the int16 range.
+    """
+    if data is not None:
+        try:
+            raw_bytes = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError):
+            raise ValueError("data is not valid base64.")
+        if len(raw_bytes) % RAW_DTYPE.itemsize:
+            raise ValueError("data length is not a multiple of 2 bytes (int16).")
+        return np.frombuffer(raw_bytes, dtype=RAW_DTYPE)
+
+    try:
+        values = np.asarray(samples, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError("samples must be a list of integers.")
+    if values.ndim != 1:
+        raise ValueError("samples must be a flat list of integers.")
+    info = np.iinfo(RAW_DTYPE)
+    if not np.all(np.isfinite(values)) or np.any(values != np.round(values)):
+        raise ValueError("samples must be a list of integers.")
+    if values.size and (values.min() < info.min or values.max() > info.max):
+        raise ValueError(f"samples must be between {info.min} and {info.max}.")
+    return values.astype(RAW_DTYPE)
+
+def encode_chunk(samples):
+    return zlib.compress(np.asarray(samples, dtype=RAW_DTYPE).tobytes(), COMPRESSION_LEVEL)
+
+def decode_chunk(data):
+    return np.frombuffer(zlib.decompress(bytes(data)), dtype=RAW_DTYPE)
+
+def save_raw_samples(session, start_time, sample_rate, samples):
+    """
+    Splits samples into one-second chunks starting at start_time and saves them. Returns the created chunks.
+    """
+    chunks = [
+        RawEEGChunk(
+            session=session,
+            start_time=start_time + timedelta(seconds=offset / sample_rate),
+            sample_rate=sample_rate,
+            sample_count=len(samples[offset:offset + sample_rate]),
+            data=encode_chunk(samples[offset:offset + sample_rate]),
+        )
+        for offset in range(0, len(samples), sample_rate)
+    ]
+    return RawEEGChunk.objects.bulk_create(chunks)
+
+def read_raw_range(session, start=None, end=None):
+    """
+    Returns (first_sample_time, sample_rate, samples) for the session's raw samples in [start, end).
+    Chunks are concatenated in time order; gaps between uploads are not padded.
+    Raises ValueError if the matching chunks were recorded at different sample rates.
+    """
+    chunks = RawEEGChunk.objects.filter(session=session).order_by("start_time")
+    if start is not None:
+        chunks = chunks.filter(start_time__gt=start - timedelta(seconds=1)) # a chunk never spans more than one second
+    if end is not None:
+        chunks = chunks.filter(start_time__lt=end)
+
+    parts, first_time, sample_rate = [], None, None
+    for chunk in chunks:
+        if sample_rate is not None and chunk.sample_rate != sample_rate:
+            raise ValueError("session has raw chunks with different sample rates.")
+        sample_rate = chunk.sample_rate
+        samples = decode_chunk(chunk.data)
+
+        lo, hi = 0, len(samples)
+        if start is not None:
+            lo = min(hi, max(0, math.ceil((start - chunk.start_time).total_seconds() * sample_rate)))
+        if end is not None:
+            hi = min(hi, max(0, math.ceil((end - chunk.start_time).total_seconds() * sample_rate)))
+        if lo >= hi:
+            continue
+
+        if first_time is None:
+            first_time = chunk.start_time + timedelta(seconds=lo / sample_rate)
+        parts.append(samples[lo:hi])
+
+    samples = np.concatenate(parts) if parts else np.empty(0, dtype=RAW_DTYPE)
+    return first_time, sample_rate or DEFAULT_SAMPLE_RATE, samples
@@ -0,0 +1,87 @@
+"""
+Fast JSON rendering of EEG-Readings for the read endpoints.
+
+Rows are read with values_list() and turned into plain dicts and lists, skipping model instances and
+EEGReadingSerializer's per-field to_representation (13 fields per row); FastJSONRenderer then encodes them in one call.
+The row shape is the JSON EEGReadingSerializer produces; the column shape carries one list per field instead:
+
+    rows:     [{"id": 1, "session": 3, "timestamp": "2025-01-05T10:00:00Z", "attention": 0.5, ...}, ...]
+    columns:  {"id": [1, ...], "session": [3, ...], "timestamp": ["2025-01-05T10:00:00Z", ...], "attention": [0.5, ...]}
+
+FastJSONRenderer uses orjson when it is installed, DRF's JSONRenderer otherwise. MessagePackRenderer serves the same
+data as application/msgpack (Accept header or ?format=msgpack): floats as 8-byte binary, timestamps as the
+MessagePack timestamp extension.
+"""
+import msgpack
+from rest_framework import ISO_8601, serializers
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SHAPES = ("rows", "columns")
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+def localize_timestamps(timestamps):
+    """
+    Datetimes to render as DRF's DateTimeField does: in the current time zone, left to the renderer (which writes
+    ISO 8601 with UTC as "Z", like DateTimeField), or formatted here if DATETIME_FORMAT is not ISO 8601.
+    """
+    field = serializers.DateTimeField()
+    output_format = api_settings.DATETIME_FORMAT
+    if output_format is None or output_format.lower() != ISO_8601:
+        return [field.to_representation(value) for value in timestamps]
+
+    zone = field.default_timezone()
+    if zone is None or str(zone) == "UTC": # the database returns UTC datetimes
+        return timestamps
+    return [value.astimezone(zone) for value in timestamps]
+
+def reading_columns(rows, fields):
+    """
+    {field: [values]} from values_list() tuples whose first len(fields) items are `fields` (extra trailing items,
+    e.g. pagination keys, are ignored).
+    """
+    columns = dict(zip(fields, map(list, zip(*rows)))) if rows else {name: [] for name in fields}
+    if "timestamp" in columns:
+        columns["timestamp"] = localize_timestamps(columns["timestamp"])
+    return columns
+
+def reading_rows(rows, fields):
+    """
+    [{field: value}] in EEGReadingSerializer's shape, from values_list() tuples as for reading_columns.
+    """
+    readings = [dict(zip(fields, row)) for row in rows]
+    if "timestamp" in fields:
+        timestamps = localize_timestamps([reading["timestamp"] for reading in readings])
+        for reading, timestamp in zip(readings, timestamps):
+            reading["timestamp"] = timestamp
+    return readings
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer's output (compact UTF-8, datetimes as ISO 8601 with UTC as "Z") encoded by orjson; indented output
+    and data orjson can't encode (e.g. lazy translation strings) go through JSONRenderer.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return orjson.dumps(data, option=orjson.OPT_UTC_Z)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = MSGPACK_MEDIA_TYPE
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # datetimes must be aware (USE_TZ); anything else msgpack doesn't know (e.g. lazy strings) is sent as text
+        return msgpack.packb(data, datetime=True, default=str)
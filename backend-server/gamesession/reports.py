@@ -0,0 +1,81 @@
+"""
+Per-session analytics summary, stored in Report when a session ends.
+All statistics are computed over the session's readings as NumPy arrays (one column per channel), in one pass.
+"""
+import numpy as np
+from django.conf import settings
+
+from .compaction import load_readings
+from .ingest import METRIC_FIELDS
+from .models import Report
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+def _ratio(numerator, denominator):
+    return float(numerator / denominator) if denominator > 0 else None
+
+def compute_summary(timestamps, values):
+    """
+    timestamps: float seconds (sorted), values: array of shape (n, len(METRIC_FIELDS)).
+    Returns the summary dict stored in Report.summary.
+    """
+    threshold = getattr(settings, "REPORT_ESENSE_THRESHOLD", 0.6)
+    max_gap = getattr(settings, "REPORT_GAP_SECONDS", 2.0)
+
+    means = values.mean(axis=0)
+    stds = values.std(axis=0)
+    percentiles = np.percentile(values, PERCENTILES, axis=0) # shape (len(PERCENTILES), channels)
+    stat_names = ["mean", "std"] + [f"p{p}" for p in PERCENTILES]
+    channels = {
+        field: dict(zip(stat_names, [float(means[i]), float(stds[i])] + percentiles[:, i].tolist()))
+        for i, field in enumerate(METRIC_FIELDS)
+    }
+
+    # each reading holds until the next one; intervals longer than max_gap are gaps, not data
+    intervals = np.diff(timestamps)
+    held = np.append(np.where(intervals <= max_gap, intervals, 0.0), 0.0)
+    gaps = intervals[intervals > max_gap]
+    recorded_seconds = float(held.sum())
+
+    above = {}
+    for field in ("attention", "meditation"):
+        seconds = float(held[values[:, METRIC_FIELDS.index(field)] > threshold].sum())
+        above[field] = {"seconds": seconds, "fraction": _ratio(seconds, recorded_seconds)}
+
+    column = {field: means[i] for i, field in enumerate(METRIC_FIELDS)}
+    beta = column["low_beta"] + column["high_beta"]
+    alpha = column["low_alpha"] + column["high_alpha"]
+
+    return {
+        "channels": channels,
+        "time_above_threshold": {"threshold": threshold, **above},
+        "band_ratios": {"theta_beta": _ratio(column["theta"], beta), "alpha_theta": _ratio(alpha, column["theta"])},
+        "gaps": {
+            "threshold_seconds": max_gap,
+            "count": int(gaps.size),
+            "total_seconds": float(gaps.sum()),
+            "longest_seconds": float(gaps.max()) if gaps.size else 0.0,
+            "median_interval_seconds": float(np.median(intervals)) if intervals.size else None,
+        },
+        "recorded_seconds": recorded_seconds,
+    }
+
+def generate_report(session):
+    """
+    Computes and saves the session's Report (replacing an existing one). Returns the Report.
+    """
+    compacted = load_readings(session)
+    if compacted is not None:
+        timestamps, values = compacted.timestamps / 1e6, compacted.values
+    else:
+        rows = list(session.eeg_readings.order_by("timestamp", "id").values_list("timestamp", *METRIC_FIELDS))
+        timestamps = np.array([row[0].timestamp() for row in rows])
+        values = np.array([row[1:] for row in rows], dtype=np.float64)
+    fields = {"sample_count": len(timestamps), "duration_seconds": None, "summary": {}}
+
+    if len(timestamps):
+        fields["duration_seconds"] = float(timestamps[-1] - timestamps[0])
+        fields["summary"] = compute_summary(timestamps, values)
+
+    report, _ = Report.objects.update_or_create(session=session, defaults=fields)
+    return report
@@ -0,0 +1,111 @@
+"""
+Time-bucketed rollups of EEG-Readings for long-term trends: per session-minute, per session and per patient-day.
+Updates are incremental: only the minutes from the first not-yet-rolled-up reading onwards are recomputed from readings;
+session totals and patient days are then re-derived from the (much smaller) minute rollups.
+Runs after a session ends (gamesession.update_rollups job) and in the periodic pass (manage.py compact_rollups).
+Minutes of a compacted session (gamesession/compaction.py) are recomputed from its compacted readings plus the rows
+saved since, so readings added after compaction don't drop the compacted ones out of the rollups.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, FloatField, Max, Min, Sum
+from django.db.models.functions import Cast, TruncDate, TruncMinute
+
+from .ingest import METRIC_FIELDS
+from .models import PatientDayRollup, SessionMinuteRollup, SessionRollup
+
+ROLLUP_METRICS = ("attention", "meditation")
+
+# aggregates are aliased "agg_*" because Django won't annotate a name that is also a field on the model
+def _reading_aggregates():
+    aggregates = {"agg_reading_count": Count("id")}
+    for metric in ROLLUP_METRICS:
+        # summed as double precision: PostgreSQL's sum() of a real column adds up in 4-byte floats
+        aggregates.update({f"agg_{metric}_sum": Sum(Cast(metric, FloatField())), f"agg_{metric}_min": Min(metric),
+                           f"agg_{metric}_max": Max(metric)})
+    return aggregates
+
+def _rollup_aggregates():
+    aggregates = {"agg_reading_count": Sum("reading_count")}
+    for metric in ROLLUP_METRICS:
+        aggregates.update({f"agg_{metric}_sum": Sum(f"{metric}_sum"), f"agg_{metric}_min": Min(f"{metric}_min"),
+                           f"agg_{metric}_max": Max(f"{metric}_max")})
+    return aggregates
+
+def _stats(row):
+    stats = {name[len("agg_"):]: value for name, value in row.items() if name.startswith("agg_")}
+    stats["reading_count"] = stats["reading_count"] or 0
+    for metric in ROLLUP_METRICS:
+        stats[f"{metric}_sum"] = stats[f"{metric}_sum"] or 0
+    return stats
+
+def _array_minute_rollups(session, readings):
+    # the SQL aggregation of _minute_rollups() over ReadingArrays
+    from .compaction import EPOCH # compaction imports update_session_rollups from here
+    buckets, index, counts = np.unique(readings.timestamps // 60_000_000, return_inverse=True, return_counts=True)
+    stats = {"reading_count": counts}
+    for metric in ROLLUP_METRICS:
+        column = readings.values[:, METRIC_FIELDS.index(metric)]
+        minimum, maximum = np.full(len(buckets), np.inf), np.full(len(buckets), -np.inf)
+        np.minimum.at(minimum, index, column)
+        np.maximum.at(maximum, index, column)
+        stats.update({f"{metric}_sum": np.bincount(index, weights=column, minlength=len(buckets)),
+                      f"{metric}_min": minimum, f"{metric}_max": maximum})
+    return [SessionMinuteRollup(session=session, minute=EPOCH + timedelta(minutes=int(bucket)),
+                                **{name: values[i].item() for name, values in stats.items()})
+            for i, bucket in enumerate(buckets)]
+
+def _minute_rollups(session, from_minute, last_id):
+    """
+    SessionMinuteRollups of the session's readings from from_minute on, up to reading last_id.
+    """
+    from .compaction import load_readings # compaction imports update_session_rollups from here
+    compacted = load_readings(session)
+    if compacted is not None:
+        readings = compacted.window(from_minute)
+        return _array_minute_rollups(session, readings.take(readings.ids <= last_id))
+
+    minutes = (session.eeg_readings.filter(timestamp__gte=from_minute, id__lte=last_id)
+               .annotate(bucket=TruncMinute("timestamp")).values("bucket")
+               .annotate(**_reading_aggregates()).order_by())
+    return [SessionMinuteRollup(session=session, minute=row["bucket"], **_stats(row)) for row in minutes]
+
+def update_session_rollups(session):
+    """
+    Rolls up the session's new readings. Returns the SessionRollup.
+    """
+    with transaction.atomic():
+        rollup, _ = SessionRollup.objects.select_for_update().get_or_create(session=session)
+        new = session.eeg_readings.filter(id__gt=rollup.last_reading_id).aggregate(
+            first=Min("timestamp"), last=Max("timestamp"), last_id=Max("id"))
+        if new["last_id"] is None:
+            return rollup
+
+        # readings arrive roughly in time order, so this is usually just the last minute or two
+        from_minute = new["first"].replace(second=0, microsecond=0)
+        session.minute_rollups.filter(minute__gte=from_minute).delete()
+        SessionMinuteRollup.objects.bulk_create(_minute_rollups(session, from_minute, new["last_id"]))
+
+        totals = session.minute_rollups.aggregate(**_rollup_aggregates())
+        for name, value in _stats(totals).items():
+            setattr(rollup, name, value)
+        rollup.last_reading_id = new["last_id"]
+        rollup.save()
+
+        last_day = max(new["last"], session.minute_rollups.aggregate(last=Max("minute"))["last"])
+        update_patient_days(session.patient_id, from_minute.date(), last_day.date())
+    return rollup
+
+def update_patient_days(patient_id, first_day, last_day):
+    """
+    Re-derives the patient's day rollups in [first_day, last_day] from minute rollups.
+    """
+    PatientDayRollup.objects.filter(patient_id=patient_id, day__range=(first_day, last_day)).delete()
+    days = (SessionMinuteRollup.objects.filter(session__patient_id=patient_id, minute__date__range=(first_day, last_day))
+            .annotate(bucket=TruncDate("minute")).values("bucket")
+            .annotate(agg_session_count=Count("session", distinct=True), **_rollup_aggregates()).order_by())
+    PatientDayRollup.objects.bulk_create([
+        PatientDayRollup(patient_id=patient_id, day=row["bucket"], **_stats(row)) for row in days
+    ])
@@ -0,0 +1,22 @@
+"""
+WebSocket routes for gamesession (the HTTP routes are in urls.py). Served by server/asgi.py.
+"""
+import re
+
+from .streaming import ingest_socket, live_socket
+
+# /ws/gamesession/...
+websocket_urlpatterns = [
+    (re.compile(r"^/ws/gamesession/sessions/(?P<session_id>\d+)/ingest/$"), ingest_socket), # where Unity streams eeg-data
+    (re.compile(r"^/ws/gamesession/sessions/(?P<session_id>\d+)/live/$"), live_socket), # doctors watching a session live
+]
+
+async def websocket_application(scope, receive, send):
+    for pattern, handler in websocket_urlpatterns:
+        match = pattern.match(scope["path"])
+        if match:
+            await handler(scope, receive, send, **match.groupdict())
+            return
+
+    await receive() # websocket.connect
+    await send({"type": "websocket.close", "code": 4404})
@@ -1,18 +1,100 @@
 from rest_framework import serializers
-from .models import Session, EEGReading, Game, Prescription
+from .models import Session, EEGReading, Game, Prescription, Report, SessionEvent
+from .ingest import READING_FIELDS, SEQ_FIELD, MAX_BATCH_SIZE, rows_to_columns
+from .raw import DEFAULT_SAMPLE_RATE, parse_samples
 
 class EEGReadingSerializer(serializers.ModelSerializer):
     class Meta:
         model = EEGReading
-        fields = ["id", "session", "timestamp", 
+        fields = ["id", "session", "timestamp",
                   "attention", "meditation",
                   "delta", "theta", "low_alpha", "high_alpha",
-                  "low_beta", "high_beta", "low_gamma", "mid_gamma"]
+                  "low_beta", "high_beta", "low_gamma", "mid_gamma", "seq"]
         read_only_fields = ["id"] # include "session" if Unity POST doesn't already include the session id
+        validators = [] # a resent (session, seq) is acknowledged by EEGReadingCreateView, not rejected
+
+    def __init__(self, *args, fields=None, **kwargs):
+        # fields: optional subset of Meta.fields to render (e.g. ?fields=attention,meditation)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class EEGReadingBatchSerializer(serializers.Serializer):
+    """
+    Many EEG-Readings for one session, sent either as rows ("readings": [{...}, ...])
+    or as columns ("columns": {"timestamp": [...], "attention": [...], ...}).
+    Only checks the shape of the batch; values are validated per row in gamesession/ingest.py.
+    """
+    session = serializers.PrimaryKeyRelatedField(queryset=Session.objects.all())
+    readings = serializers.ListField(child=serializers.DictField(), required=False, max_length=MAX_BATCH_SIZE)
+    columns = serializers.DictField(child=serializers.ListField(max_length=MAX_BATCH_SIZE), required=False)
+
+    def validate(self, attrs):
+        if ("readings" in attrs) == ("columns" in attrs):
+            raise serializers.ValidationError({"batch": "send exactly one of 'readings' or 'columns'."})
+
+        if "readings" in attrs:
+            attrs["columns"] = rows_to_columns(attrs.pop("readings"))
+            return attrs
+
+        columns = attrs["columns"]
+        missing = [field for field in READING_FIELDS if field not in columns]
+        if missing:
+            raise serializers.ValidationError({"columns": f"missing columns: {', '.join(missing)}."})
+        if len({len(columns[field]) for field in READING_FIELDS + [SEQ_FIELD] if field in columns}) > 1:
+            raise serializers.ValidationError({"columns": "all columns must have the same length."})
+        return attrs
+
+class SessionEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SessionEvent
+        fields = ["id", "session", "timestamp", "event_type", "value", "data"]
+        read_only_fields = ["id", "session"] # the session is given once per batch
+
+class SessionEventBatchSerializer(serializers.Serializer):
+    """
+    Many SessionEvents for one session: {"session": 3, "events": [{"timestamp": ..., "event_type": "blink"}, ...]}.
+    """
+    session = serializers.PrimaryKeyRelatedField(queryset=Session.objects.all())
+    events = SessionEventSerializer(many=True, allow_empty=False, max_length=MAX_BATCH_SIZE)
+
+class RawEEGUploadSerializer(serializers.Serializer):
+    """
+    Raw EEG samples for one session, starting at start_time.
+    Samples are sent either as a list of ints ("samples") or as base64 little-endian int16 bytes ("data").
+    """
+    session = serializers.PrimaryKeyRelatedField(queryset=Session.objects.all())
+    start_time = serializers.DateTimeField()
+    sample_rate = serializers.IntegerField(min_value=1, max_value=10000, default=DEFAULT_SAMPLE_RATE)
+    samples = serializers.ListField(required=False) # checked all at once in validate(), not per item
+    data = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if ("samples" in attrs) == ("data" in attrs):
+            raise serializers.ValidationError({"samples": "send exactly one of 'samples' or 'data'."})
+        try:
+            attrs["samples"] = parse_samples(attrs.get("samples"), attrs.pop("data", None))
+        except ValueError as e:
+            raise serializers.ValidationError({"samples": str(e)})
+        return attrs
+
+class BrainLogUploadSerializer(serializers.Serializer):
+    """
+    A BrainLogger CSV, for an existing session or for a new session of a game.
+    """
+    file = serializers.FileField()
+    session = serializers.PrimaryKeyRelatedField(queryset=Session.objects.all(), required=False)
+    game = serializers.PrimaryKeyRelatedField(queryset=Game.objects.all(), required=False)
+    prescription = serializers.PrimaryKeyRelatedField(queryset=Prescription.objects.all(), required=False)
+
+    def validate(self, attrs):
+        if ("session" in attrs) == ("game" in attrs):
+            raise serializers.ValidationError({"session": "send exactly one of 'session' or 'game'."})
+        return attrs
 
 class SessionSerializer(serializers.ModelSerializer):
-    eeg_readings = EEGReadingSerializer(many=True, read_only=True)
-    
+    # readings are not nested here; they are served by the per-session EEG endpoints
     class Meta:
         model = Session
         fields = "__all__" # testing
@@ -30,4 +112,28 @@ class PrescriptionSerializer(serializers.ModelSerializer):
         model = Prescription
         # fields = "__all__" # for testing
         fields = ["id", "doctor", "patient", "game", "notes", "created_at", "active"]
-        read_only_fields = ["id", "created_at", "doctor"]
\ No newline at end of file
+        read_only_fields = ["id", "created_at", "doctor"]
+
+class SessionSummarySerializer(SessionSerializer):
+    """
+    Session plus a summary of its EEG-Readings, for session lists.
+    Expects a queryset from Session.objects.with_reading_summary().
+    """
+    reading_count = serializers.IntegerField(read_only=True)
+    duration_seconds = serializers.SerializerMethodField()
+    attention_min = serializers.FloatField(read_only=True)
+    attention_max = serializers.FloatField(read_only=True)
+    attention_mean = serializers.FloatField(read_only=True)
+    meditation_min = serializers.FloatField(read_only=True)
+    meditation_max = serializers.FloatField(read_only=True)
+    meditation_mean = serializers.FloatField(read_only=True)
+
+    def get_duration_seconds(self, session):
+        if session.end_time is None:
+            return None
+        return (session.end_time - session.start_time).total_seconds()
+
+class ReportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Report
+        fields = ["id", "session", "created_at", "sample_count", "duration_seconds", "summary"]
@@ -0,0 +1,267 @@
+"""
+WebSocket ingestion of EEG-Readings (plain ASGI, routed from server/asgi.py).
+Unity keeps one connection open per session instead of one HTTPS POST per reading:
+
+    ws://<host>/ws/gamesession/sessions/<session_id>/ingest/?token=<JWT access token>
+
+Every text frame is JSON: one reading ({"timestamp": ..., "attention": ...}), or a batch in the same shape as the
+batch POST ({"readings": [...]} or {"columns": {...}}). An optional "id" is echoed back in the ack.
+Readings with a "seq" already stored are counted as duplicates instead of being saved again, so after a reconnect a
+client can resend everything past GET sessions/me/<id>/eeg/ack/ without double rows. A resend must carry the original
+timestamps: on PostgreSQL the database only rejects a repeated (session, seq, timestamp) (see EEGReading.Meta), so a
+re-stamped reading resent concurrently with the first copy can be stored twice. Other databases enforce (session, seq).
+Valid rows are buffered and written with one bulk_create when the buffer is full or its oldest row has waited
+EEG_STREAM_FLUSH_SECONDS, however steadily messages keep arriving.
+
+Server -> client:
+    {"type": "ack", "id": ..., "accepted": n, "errors": [...], "buffered": n, "max_buffered": n}
+    {"type": "flushed", "rows": n, "duplicates": n, "total": n}
+    {"type": "error", "error": "...", "lost": n, "resend_from": "<ack URL>"}, then close (1011), when a flush fails:
+        the n rows buffered since the last "flushed" were not saved; reconnect and resend past the ack endpoint's last_seq
+Backpressure: a message that fills the buffer is only acked after the flush, and nothing more is read from the socket
+until then, so a client that waits for acks (or keeps a small window of unacked messages) never outruns the database.
+
+Doctors (or the patient) watch a session live on
+
+    ws://<host>/ws/gamesession/sessions/<session_id>/live/?token=<JWT access token>
+
+which pushes {"type": "readings", "session": id, "readings": [...]} for every batch saved for that session,
+however it was ingested (see publish_readings in gamesession/ingest.py).
+"""
+import asyncio
+import json
+import logging
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError
+from django.urls import reverse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .ingest import READING_FIELDS, SEQ_FIELD, MAX_BATCH_SIZE, rows_to_columns, validate_columns, save_readings
+from .models import Session
+from .broker import get_broker, session_channel
+
+logger = logging.getLogger("gamesession")
+
+# close codes (4000-4999 are free for applications); mirror the HTTP status they stand for
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+CLOSE_NOT_FOUND = 4404
+CLOSE_INTERNAL_ERROR = 1011 # standard: the server hit an unexpected condition
+
+def get_token(scope):
+    """
+    JWT from ?token= (browsers cannot set headers on WebSockets) or an "Authorization: Bearer" header.
+    """
+    token = parse_qs(scope.get("query_string", b"").decode()).get("token")
+    if token:
+        return token[0]
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            parts = value.decode().split()
+            if len(parts) == 2 and parts[0] in settings.SIMPLE_JWT["AUTH_HEADER_TYPES"]:
+                return parts[1]
+    return None
+
+def authenticate(scope):
+    """
+    Returns the user for the connection's JWT, or None.
+    """
+    raw_token = get_token(scope)
+    if raw_token is None:
+        return None
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+def parse_message(text):
+    """
+    Turns a text frame into (message_id, columns). Raises ValueError with a client-facing message.
+    """
+    try:
+        message = json.loads(text)
+    except ValueError:
+        raise ValueError("message is not valid JSON.")
+    if not isinstance(message, dict):
+        raise ValueError("message must be a JSON object.")
+
+    if "columns" in message:
+        columns = message["columns"]
+        if not isinstance(columns, dict) or any(not isinstance(columns.get(f), list) for f in READING_FIELDS):
+            raise ValueError(f"columns must have a list for each of: {', '.join(READING_FIELDS)}.")
+        fields = READING_FIELDS + [SEQ_FIELD] if isinstance(columns.get(SEQ_FIELD), list) else READING_FIELDS
+        if len({len(columns[f]) for f in fields}) > 1:
+            raise ValueError("all columns must have the same length.")
+        columns = {f: columns[f] for f in fields}
+    else:
+        rows = message["readings"] if "readings" in message else [message]
+        if not isinstance(rows, list) or any(not isinstance(row, dict) for row in rows):
+            raise ValueError("readings must be a list of objects.")
+        columns = rows_to_columns(rows)
+
+    if len(columns["timestamp"]) > MAX_BATCH_SIZE:
+        raise ValueError(f"at most {MAX_BATCH_SIZE} readings per message.")
+    return message.get("id"), columns
+
+class SessionSocket:
+    """
+    A WebSocket connection scoped to one session, authenticated by JWT when it connects.
+    Subclasses implement can_access() and serve().
+    """
+    def __init__(self, scope, receive, send, session_id):
+        self.scope, self.receive, self.send = scope, receive, send
+        self.session_id = session_id
+        self.session = None
+
+    async def run(self):
+        event = await self.receive()
+        if event["type"] != "websocket.connect":
+            return
+
+        close_code = await sync_to_async(self.authorize)()
+        if close_code is not None:
+            await self.send({"type": "websocket.close", "code": close_code})
+            return
+        await self.send({"type": "websocket.accept"})
+        await self.serve()
+
+    def authorize(self):
+        """
+        Returns a close code, or None if the user may use this session's socket.
+        """
+        user = authenticate(self.scope)
+        if user is None:
+            return CLOSE_UNAUTHORIZED
+        try:
+            self.session = Session.objects.get(id=self.session_id)
+        except Session.DoesNotExist:
+            return CLOSE_NOT_FOUND
+        if not self.can_access(user):
+            return CLOSE_FORBIDDEN
+        return None
+
+    def can_access(self, user):
+        raise NotImplementedError
+
+    async def serve(self):
+        raise NotImplementedError
+
+    async def send_json(self, data):
+        await self.send({"type": "websocket.send", "text": json.dumps(data)})
+
+class EEGIngestSocket(SessionSocket):
+    """
+    One connection streaming readings into one open session of the logged-in patient.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buffer = []
+        self.buffered_at = None # loop time the oldest buffered row arrived
+        self.total = 0
+        self.closed = False # by the server, after a failed flush
+        self.flush_rows = getattr(settings, "EEG_STREAM_FLUSH_ROWS", 500)
+        self.flush_seconds = getattr(settings, "EEG_STREAM_FLUSH_SECONDS", 1.0)
+
+    def can_access(self, user):
+        return self.session.patient_id == user.id and self.session.end_time is None
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while not self.closed:
+                # no row waits more than flush_seconds, however steadily messages keep arriving
+                timeout = None if not self.buffer else max(0.0, self.buffered_at + self.flush_seconds - loop.time())
+                try:
+                    event = await asyncio.wait_for(self.receive(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    await self.flush()
+                    continue
+
+                if event["type"] == "websocket.disconnect":
+                    break
+                if event["type"] == "websocket.receive":
+                    await self.handle_text(event.get("text"))
+        finally:
+            await self.flush(notify=False) # socket may already be gone
+
+    async def handle_text(self, text):
+        if text is None:
+            await self.send_json({"type": "error", "error": "only JSON text frames are accepted."})
+            return
+        try:
+            message_id, columns = parse_message(text)
+        except ValueError as e:
+            await self.send_json({"type": "error", "error": str(e)})
+            return
+
+        valid_rows, errors = validate_columns(columns)
+        if valid_rows and not self.buffer:
+            self.buffered_at = asyncio.get_running_loop().time()
+        self.buffer.extend(valid_rows)
+        if len(self.buffer) >= self.flush_rows and not await self.flush():
+            return
+
+        await self.send_json({"type": "ack", "id": message_id, "accepted": len(valid_rows), "errors": errors,
+                              "buffered": len(self.buffer), "max_buffered": self.flush_rows})
+
+    async def flush(self, notify=True):
+        """
+        Saves the buffered rows; returns whether they were saved. If saving fails the rows are dropped and, with notify,
+        the client is told to resend them from the ack endpoint and the socket is closed.
+        """
+        if not self.buffer:
+            return True
+        rows, self.buffer = self.buffer, []
+        try:
+            created = await sync_to_async(save_readings)(self.session, rows)
+        except DatabaseError:
+            logger.exception("session %s: %d streamed readings could not be saved", self.session_id, len(rows))
+            if notify:
+                await self.send_json({"type": "error", "error": "readings could not be saved; reconnect and resend "
+                                      "everything after the ack endpoint's last_seq.", "lost": len(rows),
+                                      "resend_from": reverse("get_my_eeg_ack", args=[self.session_id])})
+                await self.send({"type": "websocket.close", "code": CLOSE_INTERNAL_ERROR})
+            self.closed = True
+            return False
+        self.total += created
+        if notify: # duplicates: rows with a seq that was already stored
+            await self.send_json({"type": "flushed", "rows": created, "duplicates": len(rows) - created,
+                                  "total": self.total})
+        return True
+
+class LiveSessionSocket(SessionSocket):
+    """
+    Pushes readings of one session to a doctor (or the session's patient) as they are saved.
+    Client frames are ignored; the subscription ends when the client disconnects.
+    """
+    def can_access(self, user):
+        return user.is_doctor or self.session.patient_id == user.id
+
+    async def serve(self):
+        async with get_broker().subscribe(session_channel(self.session_id)) as subscription:
+            disconnected = asyncio.ensure_future(self.wait_for_disconnect())
+            try:
+                while True:
+                    message = asyncio.ensure_future(subscription.get())
+                    await asyncio.wait({message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                    if not message.done():
+                        message.cancel()
+                        break
+                    await self.send_json(message.result())
+            finally:
+                disconnected.cancel()
+
+    async def wait_for_disconnect(self):
+        while (await self.receive())["type"] != "websocket.disconnect":
+            pass
+
+async def ingest_socket(scope, receive, send, session_id):
+    await EEGIngestSocket(scope, receive, send, int(session_id)).run()
+
+async def live_socket(scope, receive, send, session_id):
+    await LiveSessionSocket(scope, receive, send, int(session_id)).run()
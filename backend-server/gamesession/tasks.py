@@ -0,0 +1,50 @@
+"""
+Background tasks for gamesession (run by manage.py run_jobs, see jobs/queue.py).
+"""
+import uuid
+
+from django.conf import settings
+
+from jobs.queue import task, enqueue
+from .compaction import compact_session
+from .models import Session
+from .reports import generate_report
+from .rollups import update_session_rollups
+
+@task("gamesession.generate_report")
+def generate_session_report(session_id):
+    report = generate_report(Session.objects.get(id=session_id))
+    return {"report": report.id, "sample_count": report.sample_count}
+
+@task("gamesession.update_rollups")
+def update_rollups(session_id):
+    rollup = update_session_rollups(Session.objects.get(id=session_id))
+    return {"reading_count": rollup.reading_count, "last_reading_id": rollup.last_reading_id}
+
+@task("gamesession.compact_readings")
+def compact_readings(session_id):
+    compacted = compact_session(Session.objects.get(id=session_id))
+    return {"reading_count": compacted.reading_count if compacted else 0,
+            "blob_bytes": len(compacted.data) if compacted else 0}
+
+def enqueue_session_end_jobs(session, key_suffix=""):
+    """
+    Queues the post-session processing of an ended session (once per session), and its compaction
+    EEG_COMPACT_AFTER_SECONDS later if that is set.
+    """
+    enqueue("gamesession.generate_report", {"session_id": session.id},
+            idempotency_key=f"session-{session.id}-report{key_suffix}")
+    enqueue("gamesession.update_rollups", {"session_id": session.id},
+            idempotency_key=f"session-{session.id}-rollups{key_suffix}")
+    compact_after = getattr(settings, "EEG_COMPACT_AFTER_SECONDS", None)
+    if compact_after is not None:
+        enqueue("gamesession.compact_readings", {"session_id": session.id}, delay_seconds=compact_after,
+                idempotency_key=f"session-{session.id}-compact{key_suffix}")
+
+def enqueue_session_import_jobs(session):
+    """
+    Queues the post-session processing again after readings were imported into a session (BrainLogger CSV).
+    The session's own end jobs may have run already, and their keys would return those jobs, so every import
+    gets keys of its own.
+    """
+    enqueue_session_end_jobs(session, key_suffix=f"-import-{uuid.uuid4().hex}")
@@ -0,0 +1,24 @@
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+from gamesession.ingest import METRIC_FIELDS
+from gamesession.models import Game, Session, EEGReading
+from accounts.models import CustomUser
+
+# +++ TESTS +++
+
+@pytest.mark.django_db(transaction=True)
+def test_compact_schema_migration_keeps_readings():
+    user = CustomUser.objects.create_user(email="compact@example.com", username="compact", password="pass", is_patient=True)
+    session = Session.objects.create(patient=user, game=Game.objects.create(name="g"), start_time=timezone.now())
+    EEGReading.objects.create(session=session, timestamp=timezone.now(), seq=1, **dict.fromkeys(METRIC_FIELDS, 0.53))
+
+    executor = MigrationExecutor(connection)
+    executor.migrate([("gamesession", "0009_eegreading_compact_columns")])
+    executor.loader.build_graph()
+    executor.migrate([("gamesession", "0010_eegreading_compact_schema")])
+
+    assert list(EEGReading.objects.values_list(*METRIC_FIELDS)) == [(0.53,) * len(METRIC_FIELDS)]
+    executor.loader.build_graph()
+    executor.migrate(executor.loader.graph.leaf_nodes("gamesession")) # back to the latest schema for later tests
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+import pytest
+from gamesession.compaction import ROW_COLUMNS, ReadingArrays, decode_readings, encode_readings
+from gamesession.ingest import METRIC_FIELDS
+
+# +++ TESTS +++
+
+def test_compacted_readings_encoding_round_trips():
+    timestamps = [datetime(2026, 1, 5, 10, 0, second, microsecond, tzinfo=dt_timezone.utc)
+                  for second, microsecond in ((0, 0), (0, 1953), (1, 999999), (1, 999999))]
+    values = np.random.default_rng(0).random((4, len(METRIC_FIELDS)))
+    rows = [(100 + 7 * i, timestamp, None if i == 2 else i, *values[i]) for i, timestamp in enumerate(timestamps)]
+    arrays = ReadingArrays.from_rows(3, rows)
+
+    decoded = decode_readings(3, encode_readings(arrays), len(rows))
+    assert decoded.rows(ROW_COLUMNS) == rows
+    assert decoded.window(timestamps[1], timestamps[3]).ids.tolist() == [107]
+    assert decoded.position_after(3, timestamps[2], 114) == 3
+    with pytest.raises(ValueError):
+        decode_readings(3, encode_readings(arrays), len(rows) + 1)
@@ -0,0 +1,14 @@
+import numpy as np
+from gamesession.epochs import average_epochs, extract_epochs
+
+# +++ TESTS +++
+
+def test_epochs_are_extracted_with_overlapping_and_empty_windows():
+    timestamps = np.arange(10, dtype=np.int64) * 1000 # a reading every millisecond
+    values = np.arange(20, dtype=float).reshape(10, 2)
+    epochs = extract_epochs(timestamps, values, np.array([2000, 3500, 50000]), 1000, 2000, 1000)
+
+    assert epochs.reading_counts.tolist() == [3, 3, 0] # [1, 4) ms and [2.5, 5.5) ms overlap
+    assert epochs.means[:2].tolist() == [[4, 5], [8, 9]] and np.isnan(epochs.means[2]).all()
+    assert epochs.bin_counts.tolist() == [[1, 1, 1], [1, 1, 1], [0, 0, 0]]
+    assert average_epochs(epochs.bin_means)[:, 0].tolist() == [4, 6, 8]
@@ -0,0 +1,21 @@
+import pytest
+from gamesession.loadgen import LoadTest, LoadTestConfig, Stats
+
+# +++ TESTS +++
+
+def test_load_test_schedule_and_report():
+    def config(mode):
+        return LoadTestConfig(base_url="http://testserver", patients=[], game_id=1, mode=mode, rate=10,
+                              duration=3, batch_interval=0.5)
+    offsets, per_send = LoadTest(config("single")).schedule()
+    assert per_send == 1 and len(offsets) == 30 and offsets[1] == pytest.approx(0.1)
+    offsets, per_send = LoadTest(config("batch")).schedule()
+    assert per_send == 5 and offsets == pytest.approx([0, 0.5, 1, 1.5, 2, 2.5])
+
+    stats = Stats()
+    for ms in range(1, 101):
+        stats.record("POST eeg-readings (batch)", ms / 1000, True, readings=5)
+    stats.record("POST eeg-readings (batch)", 0, False, error="ConnectionResetError()")
+    report = stats.report()
+    assert "POST eeg-readings (batch)" in report and " 101 " in report and "1.0%" in report
+    assert "error: POST eeg-readings (batch): ConnectionResetError()" in report
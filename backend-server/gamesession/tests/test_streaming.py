@@ -0,0 +1,153 @@
+import asyncio
+import json
+import pytest
+from django.db import DatabaseError
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from gamesession.models import Game, Session, EEGReading
+from gamesession import streaming
+from gamesession.routing import websocket_application
+from accounts.models import CustomUser
+
+@pytest.fixture
+def patient_user(db):
+    return CustomUser.objects.create_user(email="pat@example.com", username="pat", password="pass", is_patient=True)
+
+@pytest.fixture
+def session(patient_user):
+    game = Game.objects.create(name="Test Game")
+    return Session.objects.create(patient=patient_user, game=game, start_time=timezone.now())
+
+def reading(i):
+    row = {field: 0.5 for field in ["attention", "meditation", "delta", "theta", "low_alpha", "high_alpha",
+                                    "low_beta", "high_beta", "low_gamma", "mid_gamma"]}
+    row["timestamp"] = (timezone.now() + timezone.timedelta(seconds=i)).isoformat()
+    return row
+
+async def drive_socket(path, token, messages):
+    """
+    Drives the ASGI WebSocket app: connects, sends each message as a text frame, then disconnects.
+    Returns everything the server sent.
+    """
+    incoming = asyncio.Queue()
+    sent = []
+
+    async def send(event):
+        sent.append(event)
+
+    await incoming.put({"type": "websocket.connect"})
+    for message in messages:
+        await incoming.put({"type": "websocket.receive", "text": json.dumps(message)})
+    await incoming.put({"type": "websocket.disconnect", "code": 1000})
+
+    scope = {"type": "websocket", "path": path, "query_string": f"token={token}".encode(), "headers": []}
+    await websocket_application(scope, incoming.get, send)
+    return sent
+
+def run_socket(path, token, messages):
+    return asyncio.run(drive_socket(path, token, messages))
+
+# +++ TESTS +++
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_buffers_acks_and_flushes_readings(settings, patient_user, session):
+    settings.EEG_STREAM_FLUSH_ROWS = 3
+    token = str(AccessToken.for_user(patient_user))
+    messages = [{"id": 1, "readings": [reading(0), reading(1)]}, {"id": 2, **reading(2)}, {"id": 3, "readings": [reading(3), {"attention": "x"}]}]
+
+    sent = run_socket(f"/ws/gamesession/sessions/{session.id}/ingest/", token, messages)
+
+    assert sent[0]["type"] == "websocket.accept"
+    replies = [json.loads(event["text"]) for event in sent[1:]]
+    acks = [r for r in replies if r["type"] == "ack"]
+    assert [a["id"] for a in acks] == [1, 2, 3]
+    assert acks[1]["buffered"] == 0 # third row filled the buffer, flushed before the ack
+    assert acks[2]["accepted"] == 1 and acks[2]["errors"][0]["index"] == 1
+    assert [r["rows"] for r in replies if r["type"] == "flushed"] == [3]
+    assert EEGReading.objects.filter(session=session).count() == 4 # last row written on disconnect
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_flushes_on_deadline_while_messages_keep_coming(settings, patient_user, session):
+    settings.EEG_STREAM_FLUSH_SECONDS = 0.2
+    scope = {"type": "websocket", "path": f"/ws/gamesession/sessions/{session.id}/ingest/",
+             "query_string": f"token={AccessToken.for_user(patient_user)}".encode(), "headers": []}
+    events = [{"type": "websocket.receive", "text": json.dumps(reading(i))} for i in range(8)]
+    sent, flushed_before_disconnect = [], []
+
+    async def receive():
+        if not sent:
+            return {"type": "websocket.connect"}
+        if not events:
+            flushed_before_disconnect.extend(json.loads(e["text"]) for e in sent[1:] if '"flushed"' in e["text"])
+            return {"type": "websocket.disconnect", "code": 1000}
+        await asyncio.sleep(0.1) # steadier than the flush interval: the socket is never idle for 0.2 s
+        return events.pop(0)
+
+    async def send(event):
+        sent.append(event)
+
+    asyncio.run(websocket_application(scope, receive, send))
+    assert len(flushed_before_disconnect) >= 2
+    assert sum(r["rows"] for r in flushed_before_disconnect) >= 6
+    assert EEGReading.objects.filter(session=session).count() == 8
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_failed_flush_sends_error_and_closes(settings, monkeypatch, patient_user, session):
+    settings.EEG_STREAM_FLUSH_ROWS = 2
+    def fail(session, rows):
+        raise DatabaseError("connection lost")
+    monkeypatch.setattr(streaming, "save_readings", fail)
+    token = str(AccessToken.for_user(patient_user))
+    messages = [{"id": 1, **reading(0)}, {"id": 2, **reading(1)}, {"id": 3, **reading(2)}]
+
+    sent = run_socket(f"/ws/gamesession/sessions/{session.id}/ingest/", token, messages)
+
+    replies = [json.loads(event["text"]) for event in sent[1:-1]]
+    assert [r["type"] for r in replies] == ["ack", "error"] # message 2 filled the buffer; it is not acked
+    assert replies[1]["lost"] == 2
+    assert replies[1]["resend_from"] == f"/api/gamesession/sessions/me/{session.id}/eeg/ack/"
+    assert sent[-1] == {"type": "websocket.close", "code": 1011} # message 3 is never read
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_rejects_bad_token_and_other_patients_session(session):
+    other = CustomUser.objects.create_user(email="other@example.com", username="other", password="pass", is_patient=True)
+    path = f"/ws/gamesession/sessions/{session.id}/ingest/"
+
+    assert run_socket(path, "not-a-token", [])[0] == {"type": "websocket.close", "code": 4401}
+    assert run_socket(path, str(AccessToken.for_user(other)), [])[0] == {"type": "websocket.close", "code": 4403}
+
+@pytest.mark.django_db(transaction=True)
+def test_live_subscriber_receives_streamed_readings(patient_user, session):
+    doctor = CustomUser.objects.create_user(email="doc@example.com", username="doc", password="pass", is_doctor=True)
+
+    async def main():
+        live_incoming, live_sent = asyncio.Queue(), []
+
+        async def live_send(event):
+            live_sent.append(event)
+
+        scope = {"type": "websocket", "path": f"/ws/gamesession/sessions/{session.id}/live/",
+                 "query_string": f"token={AccessToken.for_user(doctor)}".encode(), "headers": []}
+        await live_incoming.put({"type": "websocket.connect"})
+        live = asyncio.ensure_future(websocket_application(scope, live_incoming.get, live_send))
+        while not live_sent:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05) # let the subscription start
+
+        await drive_socket(f"/ws/gamesession/sessions/{session.id}/ingest/", str(AccessToken.for_user(patient_user)),
+                           [{"readings": [reading(0), reading(1)]}])
+        for _ in range(100):
+            if len(live_sent) > 1:
+                break
+            await asyncio.sleep(0.01)
+
+        await live_incoming.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(live, timeout=5)
+        return live_sent
+
+    live_sent = asyncio.run(main())
+
+    assert live_sent[0]["type"] == "websocket.accept"
+    pushed = json.loads(live_sent[1]["text"])
+    assert pushed["type"] == "readings" and pushed["session"] == session.id
+    assert len(pushed["readings"]) == 2
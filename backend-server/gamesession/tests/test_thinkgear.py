@@ -0,0 +1,52 @@
+import asyncio
+import json
+import pytest
+from django.utils import timezone
+from gamesession.brainlog import import_brainlog
+from gamesession.models import Game, Session, EEGReading
+from gamesession.thinkgear import SignalModel, ThinkGearEmulator, serve
+from accounts.models import CustomUser
+
+@pytest.fixture
+def session(db):
+    patient = CustomUser.objects.create_user(email="pat@example.com", username="pat", password="pass", is_patient=True)
+    return Session.objects.create(patient=patient, game=Game.objects.create(name="Test Game"), start_time=timezone.now())
+
+# +++ TESTS +++
+
+def test_thinkgear_emulator_packets_are_reproducible_and_realistic():
+    model = SignalModel(seed=3, blink_rate=60)
+    packets = list(ThinkGearEmulator(model).packets(3))
+    assert packets == list(ThinkGearEmulator(model).packets(3))
+    raw = [p["rawEeg"] for _, p in packets if "rawEeg" in p]
+    summaries = [p for _, p in packets if "eSense" in p]
+    assert len(raw) == 3 * 512 and all(-2048 <= value <= 2047 for value in raw)
+    assert len(summaries) == 3 and all(1 <= s["eSense"]["attention"] <= 100 and s["poorSignalLevel"] == 0
+                                       for s in summaries)
+    assert [offset for offset, _ in packets] == sorted(offset for offset, _ in packets)
+
+    dropped = [p for _, p in ThinkGearEmulator(SignalModel(seed=3, dropout_rate=60 * 60)).packets(2) if "eSense" in p]
+    assert all(p["poorSignalLevel"] == 200 and p["eSense"] == {"attention": 0, "meditation": 0} for p in dropped)
+
+def test_thinkgear_emulator_serves_tgc_json_over_tcp():
+    async def client():
+        loop = asyncio.get_running_loop()
+        listening = loop.create_future()
+        server = asyncio.create_task(serve(SignalModel(seed=1), port=0, seconds=2, speed=0,
+                                           on_ready=listening.set_result))
+        reader, writer = await asyncio.open_connection("127.0.0.1", await listening)
+        writer.write(b'{"enableRawOutput":false,"format":"Json"}\n')
+        data = await reader.read() # the emulator closes the connection after --seconds
+        writer.close()
+        server.cancel()
+        return data
+
+    packets = [json.loads(line) for line in asyncio.run(client()).split(b"\r") if line]
+    assert len(packets) == 2 and all("eSense" in p and "eegPower" in p for p in packets)
+
+@pytest.mark.django_db
+def test_thinkgear_emulator_brainlog_imports(session):
+    lines = ThinkGearEmulator(SignalModel(seed=5)).brainlog_lines(timezone.now(), 4)
+    result = import_brainlog(session, lines)
+    assert result.raw_samples == 4 * 512 and result.skipped_count == 0
+    assert result.readings == 3 == EEGReading.objects.filter(session=session).count() # eSense from the 2nd second on
@@ -1,10 +1,22 @@
+import gzip
+import io
+import json
+
+import msgpack
+import numpy as np
 import pytest
 from rest_framework.test import APIClient
 from django.urls import reverse
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
-from gamesession.models import Game, Prescription, EEGReading, Session
+from gamesession.models import Game, Prescription, EEGReading, Session, SessionRollup, PatientDayRollup, CompactedReadings, RawEEGChunk
 from accounts.models import CustomUser
 from gamesession import views
+from gamesession.compaction import compact_session
+from gamesession.raw import save_raw_samples
+from gamesession.serializers import EEGReadingSerializer
 
 @pytest.fixture
 def api_client():
@@ -81,4 +93,673 @@ def test_patient_can_get_their_own_sessions(api_client, patient_user, session_fa
 
     assert response.status_code == 200
     assert len(response.data) == 2
-    assert {s["id"] for s in response.data} == {session1.id, session2.id}
\ No newline at end of file
+    assert {s["id"] for s in response.data} == {session1.id, session2.id}
+
+def make_reading_row(timestamp, value=0.5):
+    return {
+        "timestamp": timestamp.isoformat(),
+        "attention": value, "meditation": value,
+        "delta": value, "theta": value, "low_alpha": value, "high_alpha": value,
+        "low_beta": value, "high_beta": value, "low_gamma": value, "mid_gamma": value,
+    }
+
+@pytest.mark.django_db
+def test_batch_readings_rows_are_bulk_created(api_client, patient_user, session_factory):
+    session = session_factory(patient_user)
+    now = timezone.now()
+    rows = [make_reading_row(now + timezone.timedelta(seconds=i)) for i in range(5)]
+
+    url = reverse("eeg-reading-create")
+    response = api_client.post(url, {"session": session.id, "readings": rows}, format="json")
+
+    assert response.status_code == 201
+    assert response.data["created"] == 5
+    assert response.data["errors"] == []
+    assert EEGReading.objects.filter(session=session).count() == 5
+
+@pytest.mark.django_db
+def test_batch_readings_columns_report_bad_rows_by_index(api_client, patient_user, session_factory):
+    session = session_factory(patient_user)
+    now = timezone.now()
+    columns = {field: [0.1, 0.2, 0.3] for field in make_reading_row(now) if field != "timestamp"}
+    columns["timestamp"] = [now.isoformat(), "not a date", now.isoformat()]
+    columns["attention"] = [0.1, 0.2, "abc"]
+
+    url = reverse("eeg-reading-create")
+    response = api_client.post(url, {"session": session.id, "columns": columns}, format="json")
+
+    assert response.status_code == 201
+    assert response.data["created"] == 1
+    assert [e["index"] for e in response.data["errors"]] == [1, 2]
+    assert "timestamp" in response.data["errors"][0]["errors"]
+    assert "attention" in response.data["errors"][1]["errors"]
+    assert EEGReading.objects.filter(session=session).count() == 1
+
+@pytest.mark.django_db
+def test_batch_readings_rejects_mismatched_columns(api_client, patient_user, session_factory):
+    session = session_factory(patient_user)
+    columns = {field: [0.1] for field in make_reading_row(timezone.now())}
+    columns["attention"] = [0.1, 0.2]
+
+    url = reverse("eeg-reading-create")
+    response = api_client.post(url, {"session": session.id, "columns": columns}, format="json")
+
+    assert response.status_code == 400
+    assert EEGReading.objects.count() == 0
+
+@pytest.mark.django_db
+def test_batch_readings_accept_gzipped_msgpack_and_json(api_client, patient_user, session_factory):
+    session = session_factory(patient_user)
+    now = timezone.now()
+    columns = {field: [0.25, 0.5] for field in make_reading_row(now) if field != "timestamp"}
+    columns["timestamp"] = [now, now + timezone.timedelta(seconds=1)] # MessagePack timestamp extension
+    body = gzip.compress(msgpack.packb({"session": session.id, "columns": columns}, datetime=True))
+
+    url = reverse("eeg-reading-create")
+    response = api_client.post(url, body, content_type="application/msgpack", HTTP_CONTENT_ENCODING="gzip",
+                               HTTP_ACCEPT="application/msgpack")
+    assert response.status_code == 201
+    assert msgpack.unpackb(response.content)["created"] == 2
+    assert EEGReading.objects.get(session=session, timestamp=now).attention == 0.25
+
+    rows = [make_reading_row(now + timezone.timedelta(seconds=i + 2)) for i in range(3)]
+    body = gzip.compress(json.dumps({"session": session.id, "readings": rows}).encode())
+    response = api_client.post(url, body, content_type="application/json", HTTP_CONTENT_ENCODING="gzip")
+    assert response.status_code == 201 and response.data["created"] == 3
+
+    response = api_client.post(url, body, content_type="application/json", HTTP_CONTENT_ENCODING="br")
+    assert response.status_code == 415
+    response = api_client.post(url, body[:-8], content_type="application/json", HTTP_CONTENT_ENCODING="gzip")
+    assert response.status_code == 400
+
+@pytest.mark.django_db
+def test_compressed_body_is_held_to_upload_limit(settings, api_client, patient_user, session_factory):
+    settings.DATA_UPLOAD_MAX_MEMORY_SIZE = 10_000
+    body = gzip.compress(json.dumps({"session": session_factory(patient_user).id, "padding": " " * 20_000}).encode())
+    response = api_client.post(reverse("eeg-reading-create"), body, content_type="application/json",
+                               HTTP_CONTENT_ENCODING="gzip")
+    assert response.status_code == 400
+    assert "larger than" in response.data["detail"]
+
+@pytest.mark.django_db
+def test_resent_readings_with_seq_are_not_saved_twice(api_client, patient_user, session_factory):
+    session = session_factory(patient_user)
+    now = timezone.now()
+    rows = [{**make_reading_row(now + timezone.timedelta(seconds=i)), "seq": i} for i in range(4)]
+    url = reverse("eeg-reading-create")
+
+    response = api_client.post(url, {"session": session.id, "readings": rows[:3]}, format="json")
+    assert (response.data["created"], response.data["duplicates"], response.data["last_seq"]) == (3, 0, 2)
+    # the answer got lost: the client resends the batch with one more reading (and a repeat within the batch)
+    response = api_client.post(url, {"session": session.id, "readings": rows + rows[3:]}, format="json")
+    assert response.status_code == 201
+    assert (response.data["created"], response.data["duplicates"], response.data["last_seq"]) == (1, 4, 3)
+    assert sorted(session.eeg_readings.values_list("seq", flat=True)) == [0, 1, 2, 3]
+
+    single = {**make_reading_row(now + timezone.timedelta(seconds=9)), "session": session.id, "seq": 9}
+    assert api_client.post(url, single, format="json").status_code == 201
+    response = api_client.post(url, single, format="json")
+    assert response.status_code == 200 and response.data["seq"] == 9
+    assert session.eeg_readings.count() == 5
+    # a re-stamped resend that got past the app-level check is rejected by the database (all but PostgreSQL)
+    if connection.vendor != "postgresql":
+        with pytest.raises(IntegrityError), transaction.atomic():
+            EEGReading.objects.create(session=session, seq=9, timestamp=now + timezone.timedelta(hours=1),
+                                      **{field: 0.5 for field in make_reading_row(now) if field != "timestamp"})
+
+    response = api_client.post(url, {"session": session.id, "columns": {
+        **{field: [0.5] for field in make_reading_row(now)}, "timestamp": [now.isoformat()], "seq": [-1]}}, format="json")
+    assert response.status_code == 400 and "seq" in response.data["errors"][0]["errors"]
+
+    api_client.force_authenticate(user=patient_user)
+    response = api_client.get(reverse("get_my_eeg_ack", args=[session.id]))
+    assert response.data == {"session": session.id, "last_seq": 9}
+    other = CustomUser.objects.create_user(email="other@example.com", username="other", password="pass", is_patient=True)
+    api_client.force_authenticate(user=other)
+    assert api_client.get(reverse("get_my_eeg_ack", args=[session.id])).status_code == 404
+
+@pytest.mark.django_db
+def test_raw_eeg_upload_is_chunked_and_read_back_as_int16(api_client, doctor_user, patient_user, session_factory):
+    import numpy as np
+    session = session_factory(patient_user)
+    start = timezone.now().replace(microsecond=0)
+    samples = list(range(-600, 600)) # 1200 samples -> 3 chunks at 512 Hz
+
+    api_client.force_authenticate(user=patient_user)
+    response = api_client.post(reverse("eeg-raw-upload"),
+                               {"session": session.id, "start_time": start.isoformat(), "samples": samples}, format="json")
+    assert response.status_code == 201
+    assert response.data["chunks"] == 3
+    assert session.raw_chunks.count() == 3
+
+    api_client.force_authenticate(user=doctor_user)
+    url = reverse("get_raw_eeg_by_session", args=[session.id])
+    response = api_client.get(url)
+    assert response.status_code == 200
+    assert np.frombuffer(response.content, dtype=response["X-EEG-Dtype"]).tolist() == samples
+
+    window_start = start + timezone.timedelta(seconds=1)
+    response = api_client.get(url, {"start": window_start.isoformat(), "end": (window_start + timezone.timedelta(seconds=1)).isoformat()})
+    assert np.frombuffer(response.content, dtype="<i2").tolist() == samples[512:1024]
+
+@pytest.mark.django_db
+def test_raw_eeg_upload_rejects_out_of_range_samples(api_client, patient_user, session_factory):
+    session = session_factory(patient_user)
+    api_client.force_authenticate(user=patient_user)
+    response = api_client.post(reverse("eeg-raw-upload"),
+                               {"session": session.id, "start_time": timezone.now().isoformat(), "samples": [1, 40000]}, format="json")
+    assert response.status_code == 400
+
+@pytest.mark.django_db
+def test_session_list_returns_reading_summary_without_nested_readings(api_client, patient_user, session_factory, django_assert_max_num_queries):
+    session = session_factory(patient_user)
+    session_factory(patient_user)
+    now = timezone.now()
+    for attention in (0.2, 0.4, 0.9):
+        EEGReading.objects.create(session=session, timestamp=now, attention=attention, meditation=0.5,
+                                  delta=0, theta=0, low_alpha=0, high_alpha=0,
+                                  low_beta=0, high_beta=0, low_gamma=0, mid_gamma=0)
+
+    api_client.force_authenticate(user=patient_user)
+    with django_assert_max_num_queries(1): # one query for the whole list, however many readings
+        response = api_client.get(reverse("get_my_sessions"))
+
+    assert response.status_code == 200
+    summary = next(s for s in response.data if s["id"] == session.id)
+    assert "eeg_readings" not in summary
+    assert summary["reading_count"] == 3
+    assert summary["attention_min"] == pytest.approx(0.2)
+    assert summary["attention_max"] == pytest.approx(0.9)
+    assert summary["attention_mean"] == pytest.approx(0.5)
+    empty = next(s for s in response.data if s["id"] != session.id)
+    assert empty["reading_count"] == 0
+    assert empty["attention_mean"] is None
+
+@pytest.mark.django_db
+def test_patient_can_get_their_own_session_readings(api_client, patient_user, session_factory):
+    session = session_factory(patient_user)
+    EEGReading.objects.create(session=session, timestamp=timezone.now(), attention=0.2, meditation=0.5,
+                              delta=0, theta=0, low_alpha=0, high_alpha=0,
+                              low_beta=0, high_beta=0, low_gamma=0, mid_gamma=0)
+
+    api_client.force_authenticate(user=patient_user)
+    response = api_client.get(reverse("get_my_eeg_by_session", args=[session.id]))
+
+    assert response.status_code == 200
+    assert len(response.data["results"]) == 1
+
+@pytest.fixture
+def reading_factory(db):
+    def make_readings(session, start, count, step_seconds=1):
+        return EEGReading.objects.bulk_create([
+            EEGReading(session=session, timestamp=start + timezone.timedelta(seconds=i * step_seconds),
+                       attention=i, meditation=i, delta=0, theta=0, low_alpha=0, high_alpha=0,
+                       low_beta=0, high_beta=0, low_gamma=0, mid_gamma=0)
+            for i in range(count)
+        ])
+    return make_readings
+
+@pytest.mark.django_db
+def test_doctor_pages_through_session_readings_with_cursor(api_client, doctor_user, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    reading_factory(session, timezone.now(), 7)
+    api_client.force_authenticate(user=doctor_user)
+
+    url = reverse("get_eeg_by_session_doctor", args=[session.id, patient_user.id])
+    response = api_client.get(url, {"page_size": 3, "fields": "attention,meditation"})
+    attention = []
+    while True:
+        assert response.status_code == 200
+        attention += [r["attention"] for r in response.data["results"]]
+        if response.data["next"] is None:
+            break
+        assert set(response.data["results"][0]) == {"attention", "meditation"}
+        response = api_client.get(response.data["next"])
+
+    assert attention == [0, 1, 2, 3, 4, 5, 6]
+
+@pytest.mark.django_db
+def test_session_readings_time_window_and_bad_params(api_client, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    start = timezone.now()
+    reading_factory(session, start, 10)
+    api_client.force_authenticate(user=patient_user)
+    url = reverse("get_my_eeg_by_session", args=[session.id])
+
+    response = api_client.get(url, {"start": (start + timezone.timedelta(seconds=2)).isoformat(),
+                                    "end": (start + timezone.timedelta(seconds=5)).isoformat()})
+    assert [r["attention"] for r in response.data["results"]] == [2, 3, 4]
+
+    assert api_client.get(url, {"fields": "attention,nope"}).status_code == 400
+    assert api_client.get(url, {"start": "yesterday"}).status_code == 400
+    assert api_client.get(url, {"cursor": "garbage"}).status_code == 404
+
+@pytest.mark.django_db
+def test_session_readings_match_serializer_and_come_as_columns(api_client, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    reading_factory(session, timezone.now(), 5)
+    api_client.force_authenticate(user=patient_user)
+    url = reverse("get_my_eeg_by_session", args=[session.id])
+
+    response = api_client.get(url)
+    expected = EEGReadingSerializer(EEGReading.objects.filter(session=session).order_by("timestamp"), many=True).data
+    assert response.json()["results"] == json.loads(json.dumps(expected))
+
+    response = api_client.get(url, {"shape": "columns", "fields": "meditation,timestamp", "page_size": 3})
+    columns = response.json()["results"]
+    assert list(columns) == ["timestamp", "meditation"]
+    assert columns["meditation"] == [0, 1, 2] and columns["timestamp"][0] == expected[0]["timestamp"]
+    columns = api_client.get(response.json()["next"]).json()["results"]
+    assert columns["meditation"] == [3, 4]
+
+    assert api_client.get(url, {"shape": "table"}).status_code == 400
+
+    response = api_client.get(url, {"shape": "columns", "fields": "timestamp,attention"}, HTTP_ACCEPT="application/msgpack")
+    assert response["Content-Type"] == "application/msgpack"
+    columns = msgpack.unpackb(response.content, timestamp=3)["results"]
+    assert columns["attention"] == [0, 1, 2, 3, 4]
+    assert columns["timestamp"][0] == EEGReading.objects.filter(session=session).earliest("timestamp").timestamp
+
+@pytest.mark.django_db
+def test_downsampled_session_keeps_peaks(api_client, doctor_user, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    readings = reading_factory(session, timezone.now(), 1000)
+    spike = readings[437]
+    spike.attention = 500
+    spike.save()
+    api_client.force_authenticate(user=doctor_user)
+    url = reverse("get_downsampled_eeg_doctor", args=[session.id, patient_user.id])
+
+    for method in ("minmax", "lttb"):
+        response = api_client.get(url, {"points": 40, "channels": "attention", "method": method})
+        assert response.status_code == 200
+        assert response.data["source_count"] == 1000
+        columns = response.data["columns"]
+        assert len(columns["timestamp"]) == len(columns["attention"]) <= 40
+        assert 500 in columns["attention"]
+        assert "meditation" not in columns
+
+    assert api_client.get(url, {"method": "mean"}).status_code == 400
+
+@pytest.mark.django_db
+def test_ending_session_stores_report(api_client, doctor_user, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    start = timezone.now()
+    reading_factory(session, start, 10) # attention 0..9, one per second
+    reading_factory(session, start + timezone.timedelta(seconds=30), 5) # after a 21 s gap
+
+    response = api_client.post(reverse("session-end", args=[session.id]))
+    assert response.status_code == 200
+
+    api_client.force_authenticate(user=doctor_user)
+    url = reverse("get_session_report", args=[session.id])
+    assert api_client.get(url).status_code == 404 # report job not run yet
+    call_command("run_jobs", "--once", "--processes", "0")
+    response = api_client.get(url)
+    assert response.status_code == 200
+    assert response.data["sample_count"] == 15
+    assert response.data["duration_seconds"] == pytest.approx(34)
+
+    summary = response.data["summary"]
+    assert summary["channels"]["attention"]["p50"] == pytest.approx(3)
+    assert summary["gaps"]["count"] == 1
+    assert summary["gaps"]["longest_seconds"] == pytest.approx(21)
+    assert summary["time_above_threshold"]["attention"]["seconds"] == pytest.approx(11) # every reading but 0, minus the gap
+
+@pytest.mark.django_db
+def test_rollups_are_updated_incrementally(patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    start = timezone.datetime(2026, 1, 5, 10, 0, 30, tzinfo=timezone.get_current_timezone())
+    reading_factory(session, start, 60) # attention 0..59 over 10:00:30-10:01:29
+
+    call_command("compact_rollups")
+    rollup = SessionRollup.objects.get(session=session)
+    assert rollup.reading_count == 60
+    assert rollup.attention_max == 59
+    assert [(r.minute.minute, r.reading_count) for r in session.minute_rollups.order_by("minute")] == [(0, 30), (1, 30)]
+
+    reading_factory(session, start + timezone.timedelta(seconds=60), 30) # 10:01:30-10:01:59, attention 0..29
+    call_command("compact_rollups")
+    rollup.refresh_from_db()
+    assert rollup.reading_count == 90
+    assert rollup.attention_sum == sum(range(60)) + sum(range(30))
+    assert [(r.minute.minute, r.reading_count) for r in session.minute_rollups.order_by("minute")] == [(0, 30), (1, 60)]
+
+    day = PatientDayRollup.objects.get(patient=patient_user)
+    assert (day.day, day.session_count, day.reading_count) == (start.date(), 1, 90)
+
+@pytest.mark.django_db
+def test_export_streams_npz_of_session_readings(settings, api_client, doctor_user, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    other = session_factory(patient_user)
+    start = timezone.now()
+    reading_factory(session, start, 25)
+    reading_factory(other, start, 3)
+    api_client.force_authenticate(user=doctor_user)
+
+    settings.EEG_EXPORT_CHUNK_ROWS = 7 # several chunks plus a partial one
+    response = api_client.get(reverse("export_eeg"), {"session": session.id})
+    assert response.status_code == 200
+    assert response["X-EEG-Row-Count"] == "25"
+
+    data = np.load(io.BytesIO(b"".join(response.streaming_content)))["readings"]
+    assert data.shape == (25,)
+    assert set(data["session"]) == {session.id}
+    assert data["attention"].tolist() == list(range(25))
+    assert data["timestamp"][0] == np.datetime64(start.replace(tzinfo=None), "us")
+
+@pytest.mark.django_db
+def test_export_patients_only_get_their_own_readings(api_client, patient_user, session_factory, reading_factory):
+    other_patient = CustomUser.objects.create_user(email="other@example.com", username="other", password="pass", is_patient=True)
+    reading_factory(session_factory(patient_user), timezone.now(), 4)
+    reading_factory(session_factory(other_patient), timezone.now(), 2)
+    api_client.force_authenticate(user=patient_user)
+    url = reverse("export_eeg")
+
+    assert api_client.get(url).status_code == 400
+    assert api_client.get(url, {"patient": other_patient.id}).status_code == 403
+    response = api_client.get(url, {"patient": patient_user.id})
+    assert np.load(io.BytesIO(b"".join(response.streaming_content)))["readings"].shape == (4,)
+
+@pytest.mark.django_db
+def test_export_eeg_command_writes_npz(tmp_path, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    start = timezone.now()
+    reading_factory(session, start, 10)
+
+    output = tmp_path / "export.npz"
+    call_command("export_eeg", "--session", str(session.id), "--start", (start + timezone.timedelta(seconds=4)).isoformat(),
+                 "-o", str(output))
+    assert np.load(output)["readings"]["attention"].tolist() == list(range(4, 10))
+    with pytest.raises(CommandError, match="not a date or datetime: garbage"):
+        call_command("export_eeg", "--start", "garbage", "-o", str(output))
+
+@pytest.mark.django_db
+def test_compacted_session_reads_back_unchanged(api_client, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    start = timezone.now()
+    readings = reading_factory(session, start, 9)
+    EEGReading.objects.filter(id=readings[4].id).update(meditation=0.123456789, seq=4)
+    api_client.force_authenticate(user=patient_user)
+    url = reverse("get_my_eeg_by_session", args=[session.id])
+    window = {"start": (start + timezone.timedelta(seconds=2)).isoformat(), "end": (start + timezone.timedelta(seconds=6)).isoformat()}
+
+    def read_all():
+        pages = [api_client.get(url, {"page_size": 4}).json()]
+        while pages[-1]["next"]:
+            pages.append(api_client.get(pages[-1]["next"]).json())
+        return ([page["results"] for page in pages],
+                api_client.get(url, {"shape": "columns", "fields": "timestamp,seq,meditation", **window}).json(),
+                api_client.get(reverse("get_my_sessions")).json(),
+                api_client.get(reverse("get_my_eeg_ack", args=[session.id])).json())
+
+    with pytest.raises(ValueError): # not ended yet
+        compact_session(session)
+    session.end_time = timezone.now()
+    session.save()
+    before = read_all()
+    call_command("compact_sessions", "--ended-hours", "0")
+    assert not session.eeg_readings.exists()
+    assert session.compacted_readings.reading_count == 9
+    assert read_all() == before
+
+    response = api_client.get(reverse("get_my_downsampled_eeg", args=[session.id]), {"points": 4, "channels": "attention"})
+    assert response.data["source_count"] == 9 and 8 in response.data["columns"]["attention"]
+    response = api_client.get(reverse("export_eeg"), {"session": session.id})
+    assert response["X-EEG-Row-Count"] == "9"
+    data = np.load(io.BytesIO(b"".join(response.streaming_content)))["readings"]
+    assert data["attention"].tolist() == list(range(9)) and data["meditation"][4] == 0.123456789
+
+    row = {**make_reading_row(start), "session": session.id}
+    assert api_client.post(reverse("eeg-reading-create"), row, format="json").status_code == 409
+    assert api_client.post(reverse("eeg-reading-create"), {"session": session.id, "readings": [row]}, format="json").status_code == 409
+
+    # rows saved after compaction (e.g. an import) are merged in on read and packed by the next compaction
+    reading_factory(session, start + timezone.timedelta(seconds=30), 2)
+    assert len(api_client.get(url).json()["results"]) == 11
+    compact_session(session)
+    assert CompactedReadings.objects.get(session=session).reading_count == 11
+    assert [r["attention"] for r in api_client.get(url).json()["results"]] == list(range(9)) + [0, 1]
+
+@pytest.mark.django_db
+def test_session_summary_combines_compacted_stats_with_later_rows(api_client, patient_user, session_factory):
+    session = session_factory(patient_user, end_time=timezone.now())
+    now = timezone.now()
+    for attention in (0.1, 0.2, 0.3):
+        EEGReading.objects.create(session=session, timestamp=now, attention=attention, meditation=0.5,
+                                  delta=0, theta=0, low_alpha=0, high_alpha=0,
+                                  low_beta=0, high_beta=0, low_gamma=0, mid_gamma=0)
+    compact_session(session)
+    EEGReading.objects.create(session=session, timestamp=now, attention=0.9, meditation=0.5, delta=0, theta=0,
+                              low_alpha=0, high_alpha=0, low_beta=0, high_beta=0, low_gamma=0, mid_gamma=0)
+
+    api_client.force_authenticate(user=patient_user)
+    summary = api_client.get(reverse("get_my_sessions")).data[0]
+    assert summary["reading_count"] == 4
+    assert summary["attention_min"] == pytest.approx(0.1)
+    assert summary["attention_max"] == pytest.approx(0.9)
+    assert summary["attention_mean"] == pytest.approx(0.375)
+
+@pytest.mark.django_db
+def test_session_events_and_epochs_around_them(api_client, doctor_user, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    start = timezone.now()
+    reading_factory(session, start, 20) # attention 0..19, one per second
+    events = [{"timestamp": (start + timezone.timedelta(seconds=seconds)).isoformat(), "event_type": event_type, "value": value}
+              for seconds, event_type, value in ((5, "level_start", 1), (12.5, "level_start", 2), (3, "blink", None), (100, "level_start", 3))]
+    api_client.force_authenticate(user=patient_user)
+    response = api_client.post(reverse("session-event-create"), {"session": session.id, "events": events}, format="json")
+    assert response.status_code == 201 and response.data["created"] == 4
+    bad = {"session": session.id, "events": [{"timestamp": "soon", "event_type": "blink"}]}
+    assert api_client.post(reverse("session-event-create"), bad, format="json").status_code == 400
+
+    api_client.force_authenticate(user=doctor_user)
+    response = api_client.get(reverse("get_session_events", args=[session.id]), {"event_type": "level_start"})
+    assert [event["value"] for event in response.data] == [1, 2, 3]
+
+    url = reverse("get_session_epochs", args=[session.id])
+    params = {"event_type": "level_start", "before": 2, "after": 3, "channels": "attention"}
+    result = api_client.get(url, params).json()
+    assert result["bin_offsets"] == [-2, -1, 0, 1, 2]
+    assert [epoch["reading_count"] for epoch in result["epochs"]] == [5, 5, 0]
+    assert result["epochs"][0]["bins"]["attention"] == [3, 4, 5, 6, 7]
+    assert result["epochs"][1]["bins"]["attention"] == [11, 12, 13, 14, 15] # event at 12.5 s: 11 s falls in the -2 s bin
+    assert result["epochs"][2]["mean"]["attention"] is None
+    assert result["average"] == {"epoch_count": 2, "mean": {"attention": 9}, "bins": {"attention": [7, 8, 9, 10, 11]}}
+
+    session.end_time = timezone.now()
+    session.save()
+    compact_session(session)
+    assert api_client.get(url, params).json() == result
+    assert api_client.get(url, {"event_type": "blink"}).json()["epochs"][0]["mean"] == {"attention": 4, "meditation": 4} # readings 1..7
+    assert api_client.get(url, {"event_type": "none"}).json()["epochs"] == []
+    assert api_client.get(url).status_code == 400
+    assert api_client.get(url, {**params, "before": 120}).status_code == 400
+    assert api_client.get(url, {**params, "bin_seconds": "x"}).status_code == 400
+
+    other = CustomUser.objects.create_user(email="other@example.com", username="other", password="pass", is_patient=True)
+    api_client.force_authenticate(user=other)
+    assert api_client.get(url, params).status_code == 403
+
+@pytest.mark.django_db
+def test_session_events_only_from_the_sessions_patient(api_client, patient_user, session_factory):
+    session = session_factory(patient_user)
+    body = {"session": session.id, "events": [{"timestamp": timezone.now().isoformat(), "event_type": "blink"}]}
+    assert api_client.post(reverse("session-event-create"), body, format="json").status_code == 401
+
+    other = CustomUser.objects.create_user(email="other@example.com", username="other", password="pass", is_patient=True)
+    api_client.force_authenticate(user=other)
+    assert api_client.post(reverse("session-event-create"), body, format="json").status_code == 403
+    assert session.events.count() == 0
+
+def make_brainlog(start, seconds, rate=512, time_format="%Y-%m-%dT%H:%M:%S.%f0Z"):
+    lines = ["Timestamp,Attention,Meditation,RawEEG,Delta,Theta,LowAlpha,HighAlpha,LowBeta,HighBeta,LowGamma,MidGamma"]
+    for i in range(seconds * rate):
+        second = i // rate
+        attention = -1 if second == 0 else 40 + second # no eSense during the first second
+        timestamp = (start + timezone.timedelta(seconds=i / rate)).strftime(time_format)
+        lines.append(f"{timestamp},{attention},{attention},{i % 200 - 100},{second},1,2,3,4,5,6,7")
+    return "\n".join(lines) + "\n"
+
+@pytest.mark.django_db
+def test_brainlog_upload_creates_session_with_readings_and_raw(api_client, patient_user, game):
+    start = timezone.datetime(2026, 1, 5, 10, 0, 0, tzinfo=timezone.get_current_timezone())
+    content = make_brainlog(start, 4) + "garbage line\n"
+    upload = SimpleUploadedFile("BrainLog_20260105_100000.csv", content.encode(), content_type="text/csv")
+    api_client.force_authenticate(user=patient_user)
+
+    response = api_client.post(reverse("brainlog-upload"), {"file": upload, "game": game.id}, format="multipart")
+    assert response.status_code == 201
+    assert response.data["readings"] == 3 # one per second with eSense
+    assert response.data["raw_samples"] == 4 * 512
+    assert response.data["skipped_lines"] == 1
+
+    session = Session.objects.get(id=response.data["session"])
+    assert (session.start_time, session.end_time) == (start, start + timezone.timedelta(seconds=4 - 1 / 512))
+    readings = list(session.eeg_readings.order_by("timestamp"))
+    assert readings[0].timestamp == start + timezone.timedelta(seconds=1)
+    assert readings[0].attention == pytest.approx(0.41)
+    assert session.raw_chunks.count() == 4
+
+    upload.seek(0)
+    response = api_client.post(reverse("brainlog-upload"), {"file": upload, "session": session.id}, format="multipart")
+    assert response.status_code == 409
+    assert (session.eeg_readings.count(), session.raw_chunks.count()) == (3, 4)
+
+@pytest.mark.django_db
+def test_brainlog_upload_rejects_other_files(api_client, patient_user, game):
+    upload = SimpleUploadedFile("notes.csv", b"a,b,c\n1,2,3\n", content_type="text/csv")
+    api_client.force_authenticate(user=patient_user)
+
+    response = api_client.post(reverse("brainlog-upload"), {"file": upload, "game": game.id}, format="multipart")
+    assert response.status_code == 400
+    assert Session.objects.count() == 0
+
+@pytest.mark.django_db
+def test_import_brainlog_command_streams_file_into_session(tmp_path, patient_user, session_factory):
+    session = session_factory(patient_user)
+    start = timezone.now()
+    path = tmp_path / "BrainLog.csv"
+    path.write_text(make_brainlog(start, 3))
+
+    call_command("import_brainlog", str(path), "--session", str(session.id))
+    assert session.eeg_readings.count() == 2
+    assert session.raw_chunks.count() == 3
+
+@pytest.mark.django_db
+def test_brainlog_timestamps_without_offset_are_local_time(api_client, patient_user, session_factory):
+    session = session_factory(patient_user)
+    local = timezone.localtime(session.start_time).replace(tzinfo=None, microsecond=0) - timezone.timedelta(minutes=1)
+    content = make_brainlog(local, 3, time_format="%Y-%m-%d %H:%M:%S.%f")
+    upload = SimpleUploadedFile("BrainLog.csv", content.encode(), content_type="text/csv")
+    api_client.force_authenticate(user=patient_user)
+
+    response = api_client.post(reverse("brainlog-upload"), {"file": upload, "session": session.id}, format="multipart")
+    assert response.status_code == 201
+    start = timezone.make_aware(local)
+    session.refresh_from_db()
+    assert session.start_time == start
+    assert session.eeg_readings.order_by("timestamp").first().timestamp == start + timezone.timedelta(seconds=1)
+    assert session.raw_chunks.order_by("start_time").first().start_time == start
+
+@pytest.mark.django_db
+def test_import_into_ended_session_recomputes_report_and_rollups(tmp_path, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    start = timezone.now()
+    reading_factory(session, start - timezone.timedelta(minutes=1), 2)
+    api_client = APIClient()
+    api_client.post(reverse("session-end", args=[session.id]))
+    call_command("run_jobs", "--once", "--processes", "0")
+    assert session.report.sample_count == 2
+
+    path = tmp_path / "BrainLog.csv"
+    path.write_text(make_brainlog(start, 3))
+    call_command("import_brainlog", str(path), "--session", str(session.id))
+    call_command("run_jobs", "--once", "--processes", "0")
+    session.report.refresh_from_db()
+    assert session.report.sample_count == 4
+
+    with pytest.raises(CommandError, match="imported before"): # the same file again adds nothing
+        call_command("import_brainlog", str(path), "--session", str(session.id))
+    call_command("run_jobs", "--once", "--processes", "0")
+    session.report.refresh_from_db()
+    assert session.report.sample_count == 4
+    assert SessionRollup.objects.get(session=session).reading_count == 4
+
+    # a later recording: a second import of the session must not get the first import's jobs back
+    path.write_text(make_brainlog(start + timezone.timedelta(seconds=10), 3))
+    call_command("import_brainlog", str(path), "--session", str(session.id))
+    call_command("run_jobs", "--once", "--processes", "0")
+    session.report.refresh_from_db()
+    assert session.report.sample_count == 6
+    assert SessionRollup.objects.get(session=session).reading_count == 6
+
+@pytest.mark.django_db
+def test_rollups_keep_compacted_readings_after_an_import(tmp_path, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    start = timezone.now().replace(second=0, microsecond=0)
+    reading_factory(session, start, 20) # attention 0..19
+    session.end_time = start + timezone.timedelta(seconds=20)
+    session.save()
+    compact_session(session)
+    assert session.eeg_readings.count() == 0
+
+    path = tmp_path / "BrainLog.csv"
+    path.write_text(make_brainlog(start + timezone.timedelta(seconds=30), 3)) # same minute, attention 0.41, 0.42
+    call_command("import_brainlog", str(path), "--session", str(session.id))
+    call_command("compact_rollups")
+
+    rollup = SessionRollup.objects.get(session=session)
+    assert rollup.reading_count == 22
+    assert rollup.attention_sum == pytest.approx(sum(range(20)) + 0.41 + 0.42)
+    assert (rollup.attention_min, rollup.attention_max) == (0, 19)
+    assert [(r.minute, r.reading_count) for r in session.minute_rollups.all()] == [(start, 22)]
+    assert PatientDayRollup.objects.get(patient=patient_user).reading_count == 22
+
+@pytest.mark.django_db
+def test_retention_archives_and_removes_expired_months(tmp_path, settings, patient_user, session_factory, reading_factory):
+    session = session_factory(patient_user)
+    now = timezone.now()
+    old_start = now - timezone.timedelta(days=150)
+    reading_factory(session, old_start, 30)
+    reading_factory(session, now - timezone.timedelta(minutes=5), 10)
+    settings.EEG_RETENTION_MONTHS = 3
+    settings.EEG_ARCHIVE_DIR = tmp_path
+
+    call_command("eeg_partitions", "--retention", "--dry-run")
+    assert session.eeg_readings.count() == 40 # dry run changes nothing
+    assert not any(tmp_path.iterdir())
+
+    call_command("eeg_partitions", "--retention")
+    assert session.eeg_readings.count() == 10
+    archives = list(tmp_path.glob("*.npz"))
+    assert [path.name for path in archives] == [f"gamesession_eegreading_p{old_start:%Y_%m}.npz"]
+    assert np.load(archives[0])["readings"]["attention"].tolist() == list(range(30))
+
+@pytest.mark.django_db
+def test_retention_archives_and_removes_expired_compacted_readings_and_raw_chunks(tmp_path, settings, patient_user,
+                                                                                 session_factory, reading_factory):
+    now = timezone.now()
+    old_start = now - timezone.timedelta(days=150)
+    old_session, session = session_factory(patient_user), session_factory(patient_user)
+    reading_factory(old_session, old_start, 30)
+    old_session.start_time, old_session.end_time = old_start, old_start + timezone.timedelta(minutes=1)
+    old_session.save()
+    compact_session(old_session)
+    save_raw_samples(old_session, old_start, 4, np.arange(10, dtype="<i2"))
+    save_raw_samples(session, now, 4, np.arange(6, dtype="<i2"))
+    settings.EEG_RETENTION_MONTHS = 3
+    settings.EEG_ARCHIVE_DIR = tmp_path
+
+    call_command("eeg_partitions", "--retention", "--dry-run")
+    assert (CompactedReadings.objects.count(), RawEEGChunk.objects.count()) == (1, 5)
+
+    call_command("eeg_partitions", "--retention")
+    assert not CompactedReadings.objects.exists()
+    assert list(RawEEGChunk.objects.values_list("session_id", flat=True)) == [session.id, session.id]
+    month = f"p{old_start:%Y_%m}"
+    compacted = np.load(tmp_path / f"gamesession_compactedreadings_{month}.npz")["readings"]
+    assert compacted["attention"].tolist() == list(range(30))
+    raw = np.load(tmp_path / f"gamesession_raweegchunk_{month}.npz")
+    assert raw["chunks"]["sample_count"].tolist() == [4, 4, 2]
+    assert raw["samples"].tolist() == list(range(10))
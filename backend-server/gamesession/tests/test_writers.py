@@ -0,0 +1,69 @@
+import struct
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+import pytest
+from django.utils import timezone
+from accounts.models import CustomUser
+from gamesession.ingest import METRIC_FIELDS
+from gamesession.models import EEGReading, Game, Session
+from gamesession.writers import BulkCreateWriter, encode_copy_binary
+
+# +++ TESTS +++
+
+def test_copy_binary_encoding_follows_pgcopy_format():
+    """
+    Decodes the writer's COPY payload by the PostgreSQL binary COPY spec: header, then per row a field count and
+    length-prefixed big-endian values, then a -1 trailer.
+    """
+    timestamp = datetime(2000, 1, 1, 0, 0, 1, 500, tzinfo=dt_timezone.utc)
+    values = np.arange(20, dtype=np.float64).reshape(2, len(METRIC_FIELDS))
+    payload = encode_copy_binary(7, [timestamp, timestamp], values)
+
+    assert payload[:11] == b"PGCOPY\n\xff\r\n\x00"
+    offset = 19
+    for row in values:
+        (field_count,) = struct.unpack_from(">h", payload, offset)
+        assert field_count == 2 + len(METRIC_FIELDS)
+        assert struct.unpack_from(">iq", payload, offset + 2) == (8, 7) # session_id
+        assert struct.unpack_from(">iq", payload, offset + 14) == (8, 1000500) # microseconds since 2000-01-01
+        offset += 26
+        for value in row:
+            assert struct.unpack_from(">id", payload, offset) == (8, value)
+            offset += 12
+    assert payload[offset:] == b"\xff\xff"
+
+def test_copy_binary_encoding_puts_seq_after_timestamp():
+    timestamp = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+    values = np.zeros((2, len(METRIC_FIELDS)))
+    payload = encode_copy_binary(7, [timestamp, timestamp], values, seqs=[41, 42])
+
+    row_size = 2 + 12 + 12 + 12 + 12 * len(METRIC_FIELDS)
+    assert len(payload) == 19 + 2 * row_size + 2
+    for i, seq in enumerate([41, 42]):
+        offset = 19 + i * row_size
+        assert struct.unpack_from(">h", payload, offset) == (3 + len(METRIC_FIELDS),)
+        assert struct.unpack_from(">iq", payload, offset + 26) == (8, seq)
+
+def test_copy_binary_encoding_writes_real_metrics_as_four_bytes():
+    timestamp = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+    values = np.full((1, len(METRIC_FIELDS)), 0.53)
+    payload = encode_copy_binary(7, [timestamp], values, metric_dtype=">f4")
+
+    assert len(payload) == 19 + 26 + 8 * len(METRIC_FIELDS) + 2
+    size, value = struct.unpack_from(">if", payload, 19 + 26)
+    assert size == 4 and value == np.float32(0.53)
+
+@pytest.mark.django_db
+def test_bulk_create_writer_counts_only_rows_it_inserted():
+    patient = CustomUser.objects.create_user(email="pat@example.com", username="pat", password="pass", is_patient=True)
+    session = Session.objects.create(patient=patient, game=Game.objects.create(name="Test Game"), start_time=timezone.now())
+    start = timezone.now()
+    timestamps = [start + timezone.timedelta(seconds=i) for i in range(4)]
+    values = np.zeros((4, len(METRIC_FIELDS)))
+    writer = BulkCreateWriter()
+
+    assert writer.write(session.id, timestamps[:2], values[:2], seqs=[1, 2]) == 2
+    assert writer.write(session.id, timestamps, values, seqs=[1, 2, 3, None]) == 2 # seqs 1 and 2 skipped, as if resent concurrently
+    assert writer.write(session.id, timestamps[:1], values[:1]) == 1
+    assert EEGReading.objects.filter(session=session).count() == 5
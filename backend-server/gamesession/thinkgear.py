@@ -0,0 +1,214 @@
+"""
+Emulator of the ThinkGear Connector (TGC), the NeuroSky service Unity reads the headset from (TgcClient.cs, directly on
+TCP port 13854 or through frontend/src/services/tgc-proxy.js), so the ingest path can be exercised without a headset.
+
+It speaks TGC's JSON protocol: the client sends {"enableRawOutput": true, "format": "Json"}, then receives
+'\\r'-terminated JSON packets:
+
+    {"rawEeg": -37}                                                    512 per second
+    {"blinkStrength": 84}                                              on a blink
+    {"eSense": {"attention": 53, "meditation": 61},
+     "eegPower": {"delta": 412345, ..., "lowGamma": 2210, "highGamma": 1874}, "poorSignalLevel": 0}   once a second
+
+Signals come from a SignalModel: eSense values drifting around a mean, log-normal band powers, raw EEG as a sum of
+band oscillations plus noise, Poisson blinks (a large deflection in the raw signal) and dropouts (headset contact
+lost: poorSignalLevel 200, zero eSense, railed raw values). Everything is drawn from a seeded generator, so a seed
+always produces the same recording.
+
+    ThinkGearEmulator(model).packets(seconds)       in-process: (offset in seconds, packet) pairs
+    ThinkGearEmulator(model).brainlog_lines(start)  the same recording as a BrainLogger CSV (gamesession/brainlog.py)
+    serve(model, host, port)                        a TGC look-alike on TCP, paced in real time (or faster)
+
+Run it with manage.py tgc_emulator.
+"""
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass, replace
+from datetime import timedelta
+
+import numpy as np
+
+from .brainlog import BRAINLOG_HEADER
+from .raw import DEFAULT_SAMPLE_RATE
+
+TGC_PORT = 13854
+PACKET_TERMINATOR = b"\r"
+POOR_SIGNAL_NO_CONTACT = 200
+RAW_RANGE = (-2048, 2047) # the TGAM chip's ADC range
+CONFIG_TIMEOUT = 1.0 # seconds to wait for the client's configuration before streaming with defaults
+MIN_SLEEP = 0.01 # the server only sleeps once it is this far ahead of schedule
+
+# eegPower names, in METRIC_FIELDS order; TGC calls the last band highGamma, Unity (TgcClient.cs) reads midGamma
+EEG_POWER_BANDS = ["delta", "theta", "lowAlpha", "highAlpha", "lowBeta", "highBeta", "lowGamma", "highGamma"]
+
+@dataclass
+class SignalModel:
+    attention: float = 55.0 # mean eSense, 1..100
+    meditation: float = 50.0
+    esense_swing: float = 20.0 # amplitude of the slow drift around the means
+    esense_period: float = 60.0 # seconds per drift cycle
+    band_power: tuple = (400000, 120000, 30000, 25000, 15000, 12000, 5000, 3000) # median eegPower per band
+    noise: float = 1.0 # scales raw EEG noise, eSense jitter and band power spread
+    blink_rate: float = 15.0 # blinks per minute
+    dropout_rate: float = 0.0 # contact losses per minute
+    dropout_seconds: float = 3.0
+    sample_rate: int = DEFAULT_SAMPLE_RATE
+    seed: int = None
+
+# raw EEG: (frequency Hz, amplitude) of the oscillations summed per band, before noise
+RAW_OSCILLATIONS = [(2.0, 60.0), (6.0, 40.0), (10.0, 30.0), (20.0, 15.0), (40.0, 5.0)]
+RAW_NOISE = 20.0
+BLINK_AMPLITUDE = 4.0 # raw units per unit of blinkStrength
+BLINK_WIDTH = 0.08 # seconds (standard deviation of the deflection)
+
+class ThinkGearEmulator:
+    def __init__(self, model=None):
+        self.model = model or SignalModel()
+        self.rng = np.random.default_rng(self.model.seed)
+        self.second = 0
+        self.dropout_until = -1.0
+        self.phases = self.rng.uniform(0, 2 * math.pi, size=len(RAW_OSCILLATIONS) + 2)
+
+    def _esense(self, t):
+        model = self.model
+        jitter = self.rng.normal(0, 5 * model.noise, size=2)
+        drift = model.esense_swing * np.sin(2 * math.pi * t / model.esense_period + self.phases[-2:])
+        return np.clip(np.rint([model.attention, model.meditation] + drift + jitter), 1, 100).astype(int)
+
+    def _band_power(self):
+        spread = 0.4 * self.model.noise
+        powers = np.asarray(self.model.band_power, dtype=np.float64) * self.rng.lognormal(0, spread, size=8)
+        return np.rint(powers).astype(int)
+
+    def next_second(self):
+        """
+        Emulates the next second of recording. Returns (raw samples, blinks as (sample index, strength), summary packet).
+        """
+        model = self.model
+        rate = model.sample_rate
+        t0 = self.second
+        self.second += 1
+
+        if model.dropout_rate and t0 >= self.dropout_until and self.rng.random() < model.dropout_rate / 60:
+            self.dropout_until = t0 + model.dropout_seconds
+        if t0 < self.dropout_until:
+            raw = self.rng.choice(RAW_RANGE, size=rate) + self.rng.integers(-8, 8, size=rate) # electrode off: railed
+            summary = {"eSense": {"attention": 0, "meditation": 0},
+                       "eegPower": dict.fromkeys(EEG_POWER_BANDS, 0), "poorSignalLevel": POOR_SIGNAL_NO_CONTACT}
+            return np.clip(raw, *RAW_RANGE).astype(int), [], summary
+
+        t = t0 + np.arange(rate) / rate
+        raw = self.rng.normal(0, RAW_NOISE * model.noise, size=rate)
+        for (frequency, amplitude), phase in zip(RAW_OSCILLATIONS, self.phases):
+            raw += amplitude * np.sin(2 * math.pi * frequency * t + phase)
+
+        blinks = []
+        for _ in range(self.rng.poisson(model.blink_rate / 60)):
+            index, strength = int(self.rng.integers(rate)), int(self.rng.integers(30, 200))
+            raw += strength * BLINK_AMPLITUDE * np.exp(-0.5 * ((t - t[index]) / BLINK_WIDTH) ** 2)
+            blinks.append((index, strength))
+        blinks.sort()
+
+        attention, meditation = self._esense(t0)
+        summary = {"eSense": {"attention": int(attention), "meditation": int(meditation)},
+                   "eegPower": dict(zip(EEG_POWER_BANDS, self._band_power().tolist())), "poorSignalLevel": 0}
+        return np.clip(np.rint(raw), *RAW_RANGE).astype(int), blinks, summary
+
+    def packets(self, seconds=None, raw_output=True):
+        """
+        Yields (offset in seconds, packet dict) in stream order, for `seconds` seconds (None: without end).
+        """
+        rate = self.model.sample_rate
+        while seconds is None or self.second < seconds:
+            t0 = self.second
+            raw, blinks, summary = self.next_second()
+            blinks = iter(blinks)
+            blink = next(blinks, None)
+            for index, value in enumerate(raw.tolist() if raw_output else []):
+                offset = t0 + index / rate
+                while blink is not None and blink[0] <= index:
+                    yield offset, {"blinkStrength": blink[1]}
+                    blink = next(blinks, None)
+                yield offset, {"rawEeg": value}
+            for index, strength in ([blink] if blink else []) + list(blinks):
+                yield t0 + index / rate, {"blinkStrength": strength}
+            yield t0 + 1, summary
+
+    def brainlog_lines(self, start, seconds):
+        """
+        Yields the lines of a BrainLogger CSV (header first) of `seconds` seconds starting at `start` (aware datetime):
+        one line per raw sample with the latest eSense and band power values, -1 before the first summary, as Unity
+        writes them.
+        """
+        rate = self.model.sample_rate
+        yield ",".join(BRAINLOG_HEADER) + "\n"
+        esense, bands = "-1,-1", ",".join(["-1"] * len(EEG_POWER_BANDS))
+        for _ in range(seconds):
+            t0 = self.second
+            raw, _, summary = self.next_second()
+            for index, value in enumerate(raw.tolist()):
+                timestamp = start + timedelta(seconds=t0 + index / rate)
+                yield f"{timestamp.isoformat()},{esense},{value},{bands}\n"
+            esense = f"{summary['eSense']['attention']},{summary['eSense']['meditation']}"
+            bands = ",".join(map(str, summary["eegPower"].values()))
+
+def encode(packet):
+    return json.dumps(packet, separators=(",", ":")).encode() + PACKET_TERMINATOR
+
+async def _read_config(reader):
+    """
+    The client's configuration, e.g. {"enableRawOutput": true, "format": "Json"}; {} if it sends none in time.
+    """
+    try:
+        line = await asyncio.wait_for(reader.readline(), CONFIG_TIMEOUT)
+        return json.loads(line.decode().strip() or "{}")
+    except (asyncio.TimeoutError, ValueError):
+        return {}
+
+async def stream(writer, emulator, seconds=None, speed=1.0, raw_output=True):
+    """
+    Writes packets to a stream paced in real time (speed 2: twice as fast; 0: as fast as the client reads).
+    Returns the number of packets written.
+    """
+    started, written = time.monotonic(), 0
+    for offset, packet in emulator.packets(seconds, raw_output):
+        if speed:
+            ahead = offset / speed - (time.monotonic() - started)
+            if ahead >= MIN_SLEEP:
+                await writer.drain()
+                await asyncio.sleep(ahead)
+        writer.write(encode(packet))
+        written += 1
+        if not speed and written % 512 == 0:
+            await writer.drain()
+    await writer.drain()
+    return written
+
+async def serve(model=None, host="127.0.0.1", port=TGC_PORT, seconds=None, speed=1.0, on_ready=None):
+    """
+    Runs a TGC look-alike until cancelled. Each connection gets its own recording (the model's seed plus the
+    connection number), starting when the client connects. on_ready(port) is called once listening.
+    """
+    model = model or SignalModel()
+    connections = 0
+
+    async def handle(reader, writer):
+        nonlocal connections
+        seed = None if model.seed is None else model.seed + connections
+        connections += 1
+        config = await _read_config(reader)
+        try:
+            await stream(writer, ThinkGearEmulator(replace(model, seed=seed)), seconds, speed,
+                         raw_output=bool(config.get("enableRawOutput", True)))
+        except ConnectionError:
+            pass # the client went away
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        if on_ready:
+            on_ready(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
@@ -1,7 +1,9 @@
 from django.urls import path
 from gamesession.views import (EEGReadingCreateView, SessionStartView, SessionEndView, PrescriptionListCreateView, 
                                GameListCreateView, SessionListCreateView, GetMySession, GetSessionByUserIDDoctor,
-                               GetEEGBySessionIDDoctor, GetMyEEGBySession)
+                               GetEEGBySessionIDDoctor, GetMyEEGBySession, RawEEGUploadView, GetRawEEGBySession,
+                               GetDownsampledEEGBySessionIDDoctor, GetMyDownsampledEEGBySession, GetSessionReport, ExportEEG,
+                               BrainLogUploadView, GetMyEEGAck, SessionEventCreateView, GetSessionEvents, GetSessionEpochs)
 
 # /gamesessions/...
 urlpatterns = [
@@ -11,12 +13,23 @@ urlpatterns = [
     path('sessions/start/', SessionStartView.as_view(), name='session-start'), # start a session
     path('sessions/<int:session_id>/end/', SessionEndView.as_view(), name='session-end'), # end a session
     path('eeg-readings/', EEGReadingCreateView.as_view(), name="eeg-reading-create"), # where Unity streams eeg-data
+    path('eeg-raw/', RawEEGUploadView.as_view(), name="eeg-raw-upload"), # raw 512 Hz samples, stored as compressed chunks
+    path('eeg-brainlog/', BrainLogUploadView.as_view(), name='brainlog-upload'), # BrainLogger CSV recorded offline
+    path('session-events/', SessionEventCreateView.as_view(), name='session-event-create'), # where Unity sends in-game events (markers)
+    path('eeg/export/', ExportEEG.as_view(), name='export_eeg'), # .npz download of a session's / patient's readings
 
     # viewing sessions
     path('sessions/me/',GetMySession.as_view(), name='get_my_sessions'), # patient only
     path('sessions/<int:target_patient_id>/', GetSessionByUserIDDoctor.as_view(), name='get_sessions_by_user_id'), # doctor only
 
     # viewing eeg readings
-    path('sessions/me/<int_target_session_id>/eeg/', GetMyEEGBySession.as_view(), name='get_my_eeg_by_session'), # patient only 
-    path('sessions/<int:target_session_id>/<int:target_patient_id/eeg/', GetEEGBySessionIDDoctor.as_view(), name='get_eeg_by_session_doctor'), # doctor only
+    path('sessions/me/<int:target_session_id>/eeg/', GetMyEEGBySession.as_view(), name='get_my_eeg_by_session'), # patient only 
+    path('sessions/<int:target_session_id>/<int:target_patient_id>/eeg/', GetEEGBySessionIDDoctor.as_view(), name='get_eeg_by_session_doctor'), # doctor only
+    path('sessions/me/<int:target_session_id>/eeg/ack/', GetMyEEGAck.as_view(), name='get_my_eeg_ack'), # patient only; highest stored seq
+    path('sessions/me/<int:target_session_id>/eeg/downsampled/', GetMyDownsampledEEGBySession.as_view(), name='get_my_downsampled_eeg'), # patient only
+    path('sessions/<int:target_session_id>/<int:target_patient_id>/eeg/downsampled/', GetDownsampledEEGBySessionIDDoctor.as_view(), name='get_downsampled_eeg_doctor'), # doctor only
+    path('sessions/<int:target_session_id>/report/', GetSessionReport.as_view(), name='get_session_report'), # doctor or owning patient
+    path('sessions/<int:target_session_id>/eeg/raw/', GetRawEEGBySession.as_view(), name='get_raw_eeg_by_session'), # doctor or owning patient
+    path('sessions/<int:target_session_id>/events/', GetSessionEvents.as_view(), name='get_session_events'), # doctor or owning patient
+    path('sessions/<int:target_session_id>/epochs/', GetSessionEpochs.as_view(), name='get_session_epochs'), # doctor or owning patient; EEG around events
 ]
\ No newline at end of file
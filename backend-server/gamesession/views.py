@@ -1,11 +1,29 @@
+import io
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Session, EEGReading, Prescription, Game
+from .models import Session, EEGReading, Prescription, Game, Report, CompactedReadings, SessionEvent
 from accounts.models import CustomUser
-from .serializers import SessionSerializer, EEGReadingSerializer, PrescriptionSerializer, GameSerializer
+from .serializers import (SessionSerializer, SessionSummarySerializer, EEGReadingSerializer, EEGReadingBatchSerializer, RawEEGUploadSerializer, BrainLogUploadSerializer,
+                          PrescriptionSerializer, GameSerializer, ReportSerializer, SessionEventSerializer, SessionEventBatchSerializer)
+from .ingest import METRIC_FIELDS, validate_columns, save_readings, publish_readings
+from .raw import RAW_DTYPE, save_raw_samples, read_raw_range
+from .pagination import EEGReadingKeysetPagination, filter_time_window, parse_fields, parse_time_window
+from .downsample import METHODS, downsample
+from .rendering import SHAPES, FastJSONRenderer, MessagePackRenderer, reading_columns, reading_rows
+from .parsers import CompressedJSONParser, MessagePackParser
+from .export import EXPORT_CONTENT_TYPE, select_readings, select_compacted, prepare_export, iter_npz
+from .compaction import ReadingArrays, load_readings
+from .epochs import session_epochs
+from .tasks import enqueue_session_end_jobs, enqueue_session_import_jobs
+from .brainlog import BrainLogOverlap, import_brainlog_file
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.parsers import FormParser, MultiPartParser
 from django.utils import timezone
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.http import HttpResponse, StreamingHttpResponse
 
 class GameListCreateView(APIView): 
     """
@@ -56,8 +74,8 @@ class PrescriptionListCreateView(APIView):
     
 class SessionListCreateView(APIView):
     def get(self, request):
-        sessions = Session.objects.all()
-        serializer = SessionSerializer(sessions, many=True)
+        sessions = Session.objects.with_reading_summary()
+        serializer = SessionSummarySerializer(sessions, many=True)
         return Response(serializer.data)
 
     def post(self, request):
@@ -71,6 +89,7 @@ class GetSessionByUserIDDoctor(APIView):
     """
     For doctors.
     Returns list of all sessions associated to the ID of the patient passed into the URL.
+    Each session carries a summary of its readings (counts, min/max/mean attention and meditation), not the readings themselves.
     """
     permission_classes = [IsAuthenticated]
 
@@ -88,14 +107,15 @@ class GetSessionByUserIDDoctor(APIView):
         if target_user.is_doctor:
             return Response("cannot view other doctors' sessions", status=status.HTTP_403_FORBIDDEN)
         
-        sessions = target_user.sessions.all()
-        serializer = SessionSerializer(sessions, many=True)
+        sessions = target_user.sessions.with_reading_summary()
+        serializer = SessionSummarySerializer(sessions, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 class GetMySession(APIView):
     """
     For patients.
     Returns list of all sessions associated to the logged-in patient.
+    Each session carries a summary of its readings (counts, min/max/mean attention and meditation), not the readings themselves.
     """
     permission_classes = [IsAuthenticated]
 
@@ -105,8 +125,8 @@ class GetMySession(APIView):
         if not user.is_patient:
             return Response("patient only action", status=status.HTTP_403_FORBIDDEN)
         
-        sessions = user.sessions.all()
-        serializer = SessionSerializer(sessions, many=True)
+        sessions = user.sessions.with_reading_summary()
+        serializer = SessionSummarySerializer(sessions, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 # Start a session    
@@ -138,40 +158,165 @@ class SessionEndView(APIView):
     Ends a session. 
     Expects the session_id of a created session. 
     Saves an end time for to that Session object; otherwise, returns error if not found.
+    Post-session processing (the Report) is queued as a background job so Unity isn't kept waiting.
     """
     def post(self, request, session_id): # session_id in header
         try:
             session = Session.objects.get(id=session_id)
             session.end_time = timezone.now()
             session.save()
+            enqueue_session_end_jobs(session)
             return Response(SessionSerializer(session).data)
         except Session.DoesNotExist:
             return Response({"error": "Session not found"}, status=status.HTTP_404_NOT_FOUND)
 
+def paginated_readings_response(request, readings):
+    """
+    Shared GET for the EEG-Reading endpoints: ?start=&end= time window, ?fields= projection,
+    ?shape=rows (default, EEGReadingSerializer's JSON) or columns, and keyset pagination (see gamesession/pagination.py).
+    Rows are read as tuples and rendered directly (see gamesession/rendering.py), not through EEGReadingSerializer.
+    readings: a queryset, or the ReadingArrays of a compacted session (see session_readings_response).
+    """
+    requested = parse_fields(request, EEGReadingSerializer.Meta.fields)
+    fields = [name for name in EEGReadingSerializer.Meta.fields if requested is None or name in requested]
+    shape = request.query_params.get("shape", "rows")
+    if shape not in SHAPES:
+        return Response({"shape": f"must be one of: {', '.join(SHAPES)}."}, status=status.HTTP_400_BAD_REQUEST)
+    paginator = EEGReadingKeysetPagination()
+    columns = ["session_id" if name == "session" else name for name in fields]
+    if isinstance(readings, ReadingArrays):
+        rows = paginator.paginate_arrays(readings.window(**parse_time_window(request)), request, columns)
+    else:
+        rows = paginator.paginate_values(filter_time_window(readings, request), request, columns)
+    render = reading_columns if shape == "columns" else reading_rows
+    return paginator.get_paginated_response(render(rows, fields))
+
+def session_readings_response(request, session):
+    """
+    paginated_readings_response for one session, read from its compacted blob if it has one.
+    """
+    compacted = load_readings(session)
+    return paginated_readings_response(request, session.eeg_readings.all() if compacted is None else compacted)
+
+def downsampled_readings_response(request, session):
+    """
+    Shared GET for the downsampled EEG endpoints.
+    Query params: points (default 500, max 5000), channels (default attention,meditation),
+    method (minmax or lttb, default minmax), and the same start/end window as the paginated endpoints.
+    Returns columns that share one timestamp axis: {"timestamp": [...], "attention": [...], ...}.
+    """
+    channels = parse_fields(request, METRIC_FIELDS, param="channels") or ["attention", "meditation"]
+    method = request.query_params.get("method", "minmax")
+    if method not in METHODS:
+        return Response({"method": f"must be one of: {', '.join(METHODS)}."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        points = min(int(request.query_params.get("points", 500)), 5000)
+    except ValueError:
+        return Response({"points": "A valid integer is required."}, status=status.HTTP_400_BAD_REQUEST)
+    if points < 2:
+        return Response({"points": "Ensure this value is greater than or equal to 2."}, status=status.HTTP_400_BAD_REQUEST)
+
+    compacted = load_readings(session)
+    if compacted is not None:
+        rows = compacted.window(**parse_time_window(request))
+        timestamps = rows.column("timestamp")
+        values = {name: rows.column(name) for name in channels}
+    else:
+        # plain tuples straight from the cursor; no model instances or per-field serialization
+        readings = filter_time_window(session.eeg_readings.all(), request).order_by("timestamp", "id")
+        rows = list(readings.values_list("timestamp", *channels))
+        timestamps = [row[0] for row in rows]
+        values = {name: [row[i + 1] for row in rows] for i, name in enumerate(channels)}
+
+    keep = downsample(timestamps, values, points, method).tolist()
+    columns = {"timestamp": [timestamps[i].isoformat() for i in keep]}
+    for name in channels:
+        columns[name] = [values[name][i] for i in keep]
+    return Response({"session": session.id, "method": method, "source_count": len(rows), "count": len(keep), "columns": columns})
+
 # Create an EEG-Reading instance (unity POSTs here -> serializer -> model with all data -> DB)
 class EEGReadingCreateView(APIView):
     """
-    Lists all EEG-Readings, currently for testing purposes (GET).
+    Lists all EEG-Readings, currently for testing purposes (GET), paginated like the per-session EEG endpoints.
     Creates an EEG-Reading object out of the incoming data from Unity (POST). 
+    Batch mode (POST): a body with "session" plus "readings" (rows) or "columns" (arrays) creates many readings at once.
+        Valid rows are saved in one transaction; invalid rows are returned by index under "errors".
+        Returns 400 only if every row was invalid.
+    Readings may carry a per-session "seq": a resent reading is not saved twice (single POST: 200 with the stored
+    reading; batch: counted under "duplicates").
+    Bodies may be JSON or MessagePack, either one gzip-compressed (see gamesession/parsers.py).
     """
+    renderer_classes = [FastJSONRenderer, MessagePackRenderer, BrowsableAPIRenderer]
+    parser_classes = [CompressedJSONParser, MessagePackParser, FormParser, MultiPartParser]
+
     def get(self, request):
-        readings = EEGReading.objects.all()
-        serializer = EEGReadingSerializer(readings, many=True)
-        return Response(serializer.data)
+        return paginated_readings_response(request, EEGReading.objects.all())
 
     def post(self, request): 
+        if "readings" in request.data or "columns" in request.data:
+            return self.post_batch(request)
+
         serializer = EEGReadingSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        session, seq = serializer.validated_data.get("session"), serializer.validated_data.get("seq")
+        if self.is_compacted(session):
+            return self.compacted_response(session)
+        stored = self.stored_reading(session, seq)
+        if stored is not None:
+            return Response(EEGReadingSerializer(stored).data, status=status.HTTP_200_OK)
+        try:
+            with transaction.atomic():
+                reading = serializer.save()
+        except IntegrityError:
+            stored = self.stored_reading(session, seq) # the same seq was saved concurrently
+            if stored is None:
+                raise
+            return Response(EEGReadingSerializer(stored).data, status=status.HTTP_200_OK)
+        publish_readings(reading.session_id, [(reading.timestamp, {field: getattr(reading, field) for field in METRIC_FIELDS})])
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def is_compacted(session):
+        # only ended sessions are compacted (gamesession/compaction.py), so live ones cost no query
+        return session is not None and session.end_time is not None and CompactedReadings.objects.filter(session=session).exists()
+
+    @staticmethod
+    def compacted_response(session):
+        return Response({"session": f"session {session.id} has been compacted and takes no more readings."},
+                        status=status.HTTP_409_CONFLICT)
+
+    @staticmethod
+    def stored_reading(session, seq):
+        if session is None or seq is None:
+            return None
+        return EEGReading.objects.filter(session=session, seq=seq).first()
+
+    def post_batch(self, request):
+        serializer = EEGReadingBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        session = serializer.validated_data["session"]
+        if self.is_compacted(session):
+            return self.compacted_response(session)
+        valid_rows, errors = validate_columns(serializer.validated_data["columns"])
+        created = save_readings(session, valid_rows)
+        seqs = [seq for _, _, _, seq in valid_rows if seq is not None]
+
+        response_status = status.HTTP_400_BAD_REQUEST if errors and not valid_rows else status.HTTP_201_CREATED
+        return Response({"session": session.id, "created": created, "duplicates": len(valid_rows) - created,
+                         "last_seq": max(seqs, default=None), "errors": errors}, status=response_status)
     
 class GetEEGBySessionIDDoctor(APIView):
     """
     For doctors.
-    Returns all the eeg-readings of a particular session (target_session_id) by a particular patient (target_user_id).
+    Returns the eeg-readings of a particular session (target_session_id) by a particular patient (target_user_id).
+    Paginated by cursor; supports ?start=&end= time filters and ?fields= projection (see paginated_readings_response).
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, MessagePackRenderer, BrowsableAPIRenderer]
 
     def get(self, request, target_session_id, target_patient_id):
         user = request.user
@@ -192,16 +337,16 @@ class GetEEGBySessionIDDoctor(APIView):
         except Session.DoesNotExist:
             return Response({"error": f"session with ID {target_session_id} not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        eeg_readings = target_session.egg_readings.all()
-        serializer = EEGReadingSerializer(eeg_readings, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return session_readings_response(request, target_session)
     
 class GetMyEEGBySession(APIView):
     """
     For patients.
     Returns list of a patient's own eeg-readings associated to a particular session.
+    Paginated by cursor; supports ?start=&end= time filters and ?fields= projection (see paginated_readings_response).
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, MessagePackRenderer, BrowsableAPIRenderer]
 
     def get(self, request, target_session_id):
         user = request.user
@@ -214,6 +359,311 @@ class GetMyEEGBySession(APIView):
         except Session.DoesNotExist:
             return Response({"error": f"session with ID {target_session_id} not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        eeg_readings = target_session.eeg_readings.all()
-        serializer = EEGReadingSerializer(eeg_readings, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return session_readings_response(request, target_session)
+
+class GetMyEEGAck(APIView):
+    """
+    For patients.
+    Returns the highest reading seq stored for one of the patient's sessions (null if none), so a client that lost its
+    connection can resend only the readings after it.
+    Resent readings must keep their original timestamps: on PostgreSQL uniqueness is enforced on (session, seq, timestamp)
+    only, so a re-stamped copy racing the original can be stored twice (other databases enforce (session, seq)).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, target_session_id):
+        user = request.user
+
+        if not user.is_patient:
+            return Response("patient only action", status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            target_session = Session.objects.get(id=target_session_id, patient=user)
+        except Session.DoesNotExist:
+            return Response({"error": f"session with ID {target_session_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        compacted = load_readings(target_session)
+        if compacted is None:
+            last_seq = target_session.eeg_readings.aggregate(last_seq=Max("seq"))["last_seq"]
+        else:
+            last_seq = int(compacted.seqs.max()) if len(compacted) and compacted.seqs.max() >= 0 else None
+        return Response({"session": target_session.id, "last_seq": last_seq})
+
+# Raw EEG (BrainLogger's RawEegReceived samples, 512 Hz)
+class RawEEGUploadView(APIView):
+    """
+    Stores raw EEG samples for a session as compressed one-second chunks (POST).
+    Only the patient who owns the session can upload to it.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [CompressedJSONParser, MessagePackParser, FormParser, MultiPartParser]
+
+    def post(self, request):
+        serializer = RawEEGUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        if data["session"].patient_id != request.user.id:
+            return Response("cannot upload to another patient's session", status=status.HTTP_403_FORBIDDEN)
+
+        chunks = save_raw_samples(data["session"], data["start_time"], data["sample_rate"], data["samples"])
+        return Response({"session": data["session"].id, "chunks": len(chunks), "samples": len(data["samples"])},
+                        status=status.HTTP_201_CREATED)
+
+class BrainLogUploadView(APIView):
+    """
+    Imports a BrainLogger CSV recorded offline (multipart "file"; see gamesession/brainlog.py) (POST).
+    Goes into the patient's own `session`, or into a new session of `game` (optional `prescription`).
+    The file is parsed as a stream; report and rollups are queued as for an ended session.
+    A file overlapping the session's stored EEG data (e.g. uploaded before) is rejected with 409.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BrainLogUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        if data.get("session") is not None and data["session"].patient_id != request.user.id:
+            return Response("cannot upload to another patient's session", status=status.HTTP_403_FORBIDDEN)
+
+        lines = io.TextIOWrapper(data["file"], encoding="utf-8-sig", newline="")
+        try:
+            session, result = import_brainlog_file(lines, request.user, session=data.get("session"), game=data.get("game"),
+                                                   prescription=data.get("prescription"))
+        except BrainLogOverlap as e:
+            return Response({"file": [str(e)]}, status=status.HTTP_409_CONFLICT)
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({"file": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+
+        enqueue_session_import_jobs(session)
+        return Response({"session": session.id, "readings": result.readings, "raw_samples": result.raw_samples,
+                         "skipped_lines": result.skipped_count, "first_skipped_lines": result.skipped_lines},
+                        status=status.HTTP_201_CREATED)
+
+class GetRawEEGBySession(APIView):
+    """
+    For doctors, and patients viewing their own sessions.
+    Returns a session's raw EEG samples as binary little-endian int16 (decode with numpy.frombuffer(body, dtype="<i2")).
+    Optional query params start and end (ISO datetimes) select a time range [start, end).
+    Response headers give the sample rate, the time of the first sample, and the sample count.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, target_session_id):
+        user = request.user
+
+        try:
+            target_session = Session.objects.get(id=target_session_id)
+        except Session.DoesNotExist:
+            return Response({"error": f"session with ID {target_session_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        if not user.is_doctor and target_session.patient_id != user.id:
+            return Response("cannot view other patients' sessions", status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            first_time, sample_rate, samples = read_raw_range(target_session, **parse_time_window(request))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+
+        response = HttpResponse(samples.tobytes(), content_type="application/octet-stream")
+        response["X-EEG-Dtype"] = RAW_DTYPE.str
+        response["X-EEG-Sample-Rate"] = str(sample_rate)
+        response["X-EEG-Sample-Count"] = str(len(samples))
+        if first_time is not None:
+            response["X-EEG-Start-Time"] = first_time.isoformat()
+        return response
+
+
+class ExportEEG(APIView):
+    """
+    For doctors, and patients exporting their own data.
+    Streams EEG-Readings as a NumPy .npz file (see gamesession/export.py) instead of paged JSON.
+    Query params: session and/or patient (ids), optional start and end (ISO datetimes).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        ids = {}
+        for name in ("session", "patient"):
+            value = request.query_params.get(name)
+            if value is None:
+                continue
+            if not value.isdigit():
+                return Response({name: "expected an id."}, status=status.HTTP_400_BAD_REQUEST)
+            ids[name] = int(value)
+        if not ids:
+            return Response({"error": "give a session or a patient to export."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not user.is_doctor:
+            if ids.get("patient", user.id) != user.id:
+                return Response("cannot export other patients' readings", status=status.HTTP_403_FORBIDDEN)
+            ids["patient"] = user.id
+
+        window = parse_time_window(request)
+        readings = select_readings(session_id=ids.get("session"), patient_id=ids.get("patient"), **window)
+        compacted = select_compacted(session_id=ids.get("session"), patient_id=ids.get("patient"), **window)
+        readings, row_count = prepare_export(readings, compacted)
+
+        name = "-".join(f"{key}-{value}" for key, value in ids.items())
+        response = StreamingHttpResponse(iter_npz(readings, row_count, compacted=compacted), content_type=EXPORT_CONTENT_TYPE)
+        response["Content-Disposition"] = f'attachment; filename="eeg-{name}.npz"'
+        response["X-EEG-Row-Count"] = str(row_count)
+        return response
+
+# Downsampled EEG for charts
+class GetDownsampledEEGBySessionIDDoctor(APIView):
+    """
+    For doctors.
+    Returns a session's channels downsampled to about `points` readings, keeping peaks (see downsampled_readings_response).
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, MessagePackRenderer, BrowsableAPIRenderer]
+
+    def get(self, request, target_session_id, target_patient_id):
+        user = request.user
+
+        if not user.is_doctor:
+            return Response("doctor only action", status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            target_session = Session.objects.get(id=target_session_id, patient_id=target_patient_id)
+        except Session.DoesNotExist:
+            return Response({"error": f"session with ID {target_session_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return downsampled_readings_response(request, target_session)
+
+class GetMyDownsampledEEGBySession(APIView):
+    """
+    For patients.
+    Returns one of the patient's own sessions downsampled to about `points` readings (see downsampled_readings_response).
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, MessagePackRenderer, BrowsableAPIRenderer]
+
+    def get(self, request, target_session_id):
+        user = request.user
+
+        if not user.is_patient:
+            return Response("patient only action", status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            target_session = Session.objects.get(id=target_session_id, patient=user)
+        except Session.DoesNotExist:
+            return Response({"error": f"session with ID {target_session_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return downsampled_readings_response(request, target_session)
+
+
+class GetSessionReport(APIView):
+    """
+    For doctors, and patients viewing their own sessions.
+    Returns the analytics summary computed after the session ended (404 until the report job has run).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, target_session_id):
+        user = request.user
+
+        try:
+            report = Report.objects.select_related("session").get(session_id=target_session_id)
+        except Report.DoesNotExist:
+            return Response({"error": f"report for session with ID {target_session_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        if not user.is_doctor and report.session.patient_id != user.id:
+            return Response("cannot view other patients' sessions", status=status.HTTP_403_FORBIDDEN)
+
+        return Response(ReportSerializer(report).data, status=status.HTTP_200_OK)
+
+# In-game events (markers) and event-locked EEG epochs
+class SessionEventCreateView(APIView):
+    """
+    Creates a batch of SessionEvents for one session (POST), sent by Unity like the EEG-Readings:
+    {"session": 3, "events": [{"timestamp": ..., "event_type": "level_start", "value": 2, "data": {...}}, ...]}.
+    The whole batch is rejected if any event is invalid. Only the patient who owns the session can add events to it.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [CompressedJSONParser, MessagePackParser, FormParser, MultiPartParser]
+
+    def post(self, request):
+        serializer = SessionEventBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        session = serializer.validated_data["session"]
+        if session.patient_id != request.user.id:
+            return Response("cannot add events to another patient's session", status=status.HTTP_403_FORBIDDEN)
+
+        events = SessionEvent.objects.bulk_create([SessionEvent(session=session, **event)
+                                                   for event in serializer.validated_data["events"]])
+        return Response({"session": session.id, "created": len(events)}, status=status.HTTP_201_CREATED)
+
+class GetSessionEvents(APIView):
+    """
+    For doctors, and patients viewing their own sessions.
+    Returns a session's events in time order, optionally only those of one ?event_type=.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, target_session_id):
+        user = request.user
+
+        try:
+            target_session = Session.objects.get(id=target_session_id)
+        except Session.DoesNotExist:
+            return Response({"error": f"session with ID {target_session_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        if not user.is_doctor and target_session.patient_id != user.id:
+            return Response("cannot view other patients' sessions", status=status.HTTP_403_FORBIDDEN)
+
+        events = target_session.events.order_by("timestamp", "id")
+        if "event_type" in request.query_params:
+            events = events.filter(event_type=request.query_params["event_type"])
+        return Response(SessionEventSerializer(events, many=True).data)
+
+class GetSessionEpochs(APIView):
+    """
+    For doctors, and patients viewing their own sessions.
+    Returns the EEG around every event of one type (see gamesession/epochs.py), per epoch and averaged over epochs.
+    Query params: event_type (required), before and after (seconds around the event, default 2 and 5, max 60 each),
+    bin_seconds (default 1), channels (default attention,meditation).
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, MessagePackRenderer, BrowsableAPIRenderer]
+    MAX_WINDOW_SECONDS = 60.0
+    MAX_BINS = 1200
+
+    def get(self, request, target_session_id):
+        user = request.user
+
+        try:
+            target_session = Session.objects.get(id=target_session_id)
+        except Session.DoesNotExist:
+            return Response({"error": f"session with ID {target_session_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        if not user.is_doctor and target_session.patient_id != user.id:
+            return Response("cannot view other patients' sessions", status=status.HTTP_403_FORBIDDEN)
+
+        event_type = request.query_params.get("event_type")
+        if not event_type:
+            return Response({"event_type": "This field is required."}, status=status.HTTP_400_BAD_REQUEST)
+        channels = parse_fields(request, METRIC_FIELDS, param="channels") or ["attention", "meditation"]
+
+        window = {}
+        for name, default in (("before", 2.0), ("after", 5.0), ("bin_seconds", 1.0)):
+            try:
+                window[name] = float(request.query_params.get(name, default))
+            except ValueError:
+                return Response({name: "A valid number is required."}, status=status.HTTP_400_BAD_REQUEST)
+            if not 0 <= window[name] <= self.MAX_WINDOW_SECONDS:
+                return Response({name: f"must be between 0 and {self.MAX_WINDOW_SECONDS:g} seconds."},
+                                status=status.HTTP_400_BAD_REQUEST)
+        if window["before"] + window["after"] <= 0 or window["bin_seconds"] < 0.001:
+            return Response({"window": "before + after and bin_seconds must be positive."}, status=status.HTTP_400_BAD_REQUEST)
+        if (window["before"] + window["after"]) / window["bin_seconds"] > self.MAX_BINS:
+            return Response({"bin_seconds": f"at most {self.MAX_BINS} bins per epoch."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(session_epochs(target_session, event_type, channels, **window))
@@ -0,0 +1,134 @@
+"""
+Writers for validated batches of EEG-Readings, used by every ingest path (batch POST, WebSocket, BrainLogger import).
+Chosen by settings.EEG_INGEST_WRITER:
+
+    'gamesession.writers.CopyWriter'        # PostgreSQL: COPY ... FROM STDIN (FORMAT BINARY); elsewhere bulk_create
+    'gamesession.writers.BulkCreateWriter'  # ORM bulk_create everywhere
+
+COPY skips building a model instance and a parameterized INSERT per row: the whole batch is encoded as one
+binary COPY stream by NumPy. Compare the two with manage.py benchmark_eeg_ingest.
+
+With seqs (see gamesession/ingest.py) both writers leave out rows that would break the (session, seq, timestamp)
+unique constraint, e.g. a batch saved concurrently by a resend: bulk_create with ignore_conflicts, COPY (which can't
+skip rows) by retrying the batch that way. The count they return leaves the skipped rows out.
+"""
+import io
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils.module_loading import import_string
+
+from .ingest import METRIC_FIELDS
+from .models import EEGReading
+
+DEFAULT_WRITER = "gamesession.writers.CopyWriter"
+BULK_CREATE_BATCH_SIZE = 1000 # rows per INSERT statement
+
+PG_EPOCH = datetime(2000, 1, 1, tzinfo=dt_timezone.utc) # binary timestamptz is microseconds since this
+ONE_MICROSECOND = timedelta(microseconds=1)
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00" + b"\x00\x00\x00\x00" + b"\x00\x00\x00\x00" # header, flags, extension length
+COPY_TRAILER = b"\xff\xff"
+
+class BulkCreateWriter:
+    def write(self, session_id, timestamps, values, seqs=None):
+        """
+        Saves readings for one session. timestamps: aware datetimes; values: float array of shape
+        (len(timestamps), len(METRIC_FIELDS)) in METRIC_FIELDS order; seqs: optional sequence numbers (or None) per row.
+        Returns the number of rows written, rows skipped as duplicates not counted.
+        """
+        readings = [
+            EEGReading(session_id=session_id, timestamp=timestamp, seq=seq, **dict(zip(METRIC_FIELDS, row)))
+            for timestamp, row, seq in zip(timestamps, np.asarray(values, dtype=np.float64).tolist(),
+                                           seqs or [None] * len(timestamps))
+        ]
+        numbered = [seq for seq in seqs or [] if seq is not None]
+        if not numbered:
+            EEGReading.objects.bulk_create(readings, batch_size=BULK_CREATE_BATCH_SIZE)
+            return len(readings)
+
+        # ignore_conflicts can only skip rows with a seq; bulk_create doesn't say which, so count the stored ones
+        # (exact as long as nobody else writes this session's seqs meanwhile, see save_readings)
+        stored = EEGReading.objects.filter(session_id=session_id, seq__range=(min(numbered), max(numbered)))
+        before = stored.count()
+        EEGReading.objects.bulk_create(readings, batch_size=BULK_CREATE_BATCH_SIZE, ignore_conflicts=True)
+        return len(readings) - len(numbered) + stored.count() - before
+
+def _copy_row_dtype(session_id_dtype, metric_count, with_seq=False, metric_dtype=">f8"):
+    # every field is preceded by its length in bytes; each row by its field count
+    fields = [("field_count", ">i2"), ("session_id_size", ">i4"), ("session_id", session_id_dtype),
+              ("timestamp_size", ">i4"), ("timestamp", ">i8")]
+    if with_seq:
+        fields += [("seq_size", ">i4"), ("seq", ">i8")]
+    for i in range(metric_count):
+        fields += [(f"metric_{i}_size", ">i4"), (f"metric_{i}", metric_dtype)]
+    return np.dtype(fields)
+
+def encode_copy_binary(session_id, timestamps, values, session_id_dtype=">i8", seqs=None, metric_dtype=">f8"):
+    """
+    Returns the readings as a PostgreSQL binary COPY stream with columns (session_id, timestamp, *METRIC_FIELDS),
+    or (session_id, timestamp, seq, *METRIC_FIELDS) with seqs (integers, no None).
+    metric_dtype: ">f8" for double precision metric columns, ">f4" for real.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    dtype = _copy_row_dtype(session_id_dtype, values.shape[1], with_seq=seqs is not None, metric_dtype=metric_dtype)
+    rows = np.empty(len(timestamps), dtype=dtype)
+    rows["field_count"] = 2 + values.shape[1] + (seqs is not None)
+    rows["session_id_size"] = np.dtype(session_id_dtype).itemsize
+    rows["session_id"] = session_id
+    rows["timestamp_size"] = 8
+    rows["timestamp"] = [(timestamp - PG_EPOCH) // ONE_MICROSECOND for timestamp in timestamps]
+    if seqs is not None:
+        rows["seq_size"] = 8
+        rows["seq"] = seqs
+    for i in range(values.shape[1]):
+        rows[f"metric_{i}_size"] = np.dtype(metric_dtype).itemsize
+        rows[f"metric_{i}"] = values[:, i]
+    return COPY_SIGNATURE + rows.tobytes() + COPY_TRAILER
+
+class CopyWriter(BulkCreateWriter):
+    def write(self, session_id, timestamps, values, seqs=None):
+        # a fixed-width binary row can't hold a NULL seq next to integer ones
+        if connection.vendor != "postgresql" or (seqs is not None and None in seqs):
+            return super().write(session_id, timestamps, values, seqs)
+        if not len(timestamps):
+            return 0
+
+        session_id_type = EEGReading._meta.get_field("session").target_field.get_internal_type()
+        payload = encode_copy_binary(session_id, timestamps, values, seqs=seqs, metric_dtype=self.metric_dtype(),
+                                     session_id_dtype=">i8" if session_id_type == "BigAutoField" else ">i4")
+        names = ["session_id", "timestamp"] + (["seq"] if seqs is not None else []) + METRIC_FIELDS
+        columns = ", ".join(connection.ops.quote_name(name) for name in names)
+        sql = f"COPY {connection.ops.quote_name(EEGReading._meta.db_table)} ({columns}) FROM STDIN (FORMAT BINARY)"
+
+        try:
+            with transaction.atomic(), connection.cursor() as cursor: # a savepoint, so a conflict can be retried
+                raw_cursor = cursor.cursor
+                if hasattr(raw_cursor, "copy_expert"): # psycopg2
+                    raw_cursor.copy_expert(sql, io.BytesIO(payload))
+                else: # psycopg 3
+                    with raw_cursor.copy(sql) as copy:
+                        copy.write(payload)
+        except IntegrityError:
+            if seqs is None:
+                raise
+            return super().write(session_id, timestamps, values, seqs) # ON CONFLICT DO NOTHING
+        return len(timestamps)
+
+    @staticmethod
+    def metric_dtype():
+        # binary COPY doesn't cast: the metrics are real once migration 0010 has run, double precision before
+        # (looked up per batch, as 0010 can run while the app is up; see gamesession/compact_schema.py)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+                           "WHERE attrelid = %s::regclass AND attname = %s", [EEGReading._meta.db_table, METRIC_FIELDS[0]])
+            return ">f4" if cursor.fetchone()[0] == "real" else ">f8"
+
+_writer = None
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        _writer = import_string(getattr(settings, "EEG_INGEST_WRITER", DEFAULT_WRITER))()
+    return _writer
@@ -0,0 +1,61 @@
+"""
+Background worker for the job queue (jobs/queue.py).
+
+    python manage.py run_jobs                  # one process per CPU, runs until stopped
+    python manage.py run_jobs --processes 4
+    python manage.py run_jobs --once           # drain what is due now, then exit
+    python manage.py run_jobs --processes 0    # run jobs in this process (debugging)
+
+Run several workers for more throughput; they never claim the same job.
+"""
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.pool import setup_process, run_in_process
+from jobs.queue import claim_jobs, record_outcome, run_task
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs in a process pool, with retries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="pool size; 0 runs jobs inline")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds to wait when no job is due")
+        parser.add_argument("--once", action="store_true", help="exit when no job is due")
+
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        processes = options["processes"]
+        pool = None
+        if processes > 0:
+            pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=setup_process)
+        try:
+            while True:
+                close_old_connections()
+                jobs = claim_jobs(worker_id, limit=max(processes, 1))
+                if not jobs:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+
+                if pool is None:
+                    outcomes = [run_task(job.name, job.payload) for job in jobs]
+                else:
+                    futures = [pool.submit(run_in_process, job.name, job.payload) for job in jobs]
+                    outcomes = [future.result() for future in futures]
+
+                for job, (outcome, value) in zip(jobs, outcomes):
+                    record_outcome(job, outcome, value)
+                    self.stdout.write(f"{job} (attempt {job.attempts})")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if pool is not None:
+                pool.shutdown()
@@ -0,0 +1,33 @@
+from django.db import models
+
+# Create your models here.
+
+class Job(models.Model):
+    """
+    A unit of background work (see jobs/queue.py). Workers (manage.py run_jobs) claim queued jobs whose run_after has passed.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (RUNNING, "Running"), (SUCCEEDED, "Succeeded"), (FAILED, "Failed")]
+
+    name = models.CharField(max_length=100) # registered task name, e.g. "gamesession.generate_report"
+    payload = models.JSONField(default=dict) # keyword arguments for the task
+    idempotency_key = models.CharField(max_length=200, unique=True, blank=True, null=True) # one job per key; enqueue re-queues it once failed
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField() # not claimed before this (used for retry backoff)
+    locked_by = models.CharField(max_length=100, blank=True, null=True) # worker that claimed it
+    locked_at = models.DateTimeField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"], name="job_status_run_after_idx")]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
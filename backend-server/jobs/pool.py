@@ -0,0 +1,12 @@
+"""
+Entry points for run_jobs' pool processes. They are spawned fresh (no inherited DB connections),
+so nothing here may import models before django.setup() has run.
+"""
+import django
+
+def setup_process():
+    django.setup() # also registers every app's tasks (JobsConfig.ready)
+
+def run_in_process(name, payload):
+    from .queue import run_task
+    return run_task(name, payload)
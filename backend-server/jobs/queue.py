@@ -0,0 +1,104 @@
+"""
+Database-backed job queue: works on PostgreSQL and SQLite with no extra services.
+
+    from jobs.queue import task, enqueue
+
+    @task("gamesession.generate_report")      # in <app>/tasks.py, found by JobsConfig.ready()
+    def generate_report(session_id): ...
+
+    enqueue("gamesession.generate_report", {"session_id": 5}, idempotency_key="session-5-report")
+
+Workers (manage.py run_jobs) claim due jobs, run them in a process pool, and record the outcome.
+A failed job is retried with exponential backoff until max_attempts; a job whose worker died is reclaimed
+once its lease (JOBS_LEASE_SECONDS) runs out.
+"""
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Job
+
+_tasks = {}
+
+def task(name):
+    """
+    Registers a function as a job task under `name`. The function takes the job's payload as keyword arguments
+    and returns something JSON-serializable (stored as Job.result).
+    """
+    def register(func):
+        _tasks[name] = func
+        return func
+    return register
+
+def get_task(name):
+    return _tasks[name]
+
+def enqueue(name, payload=None, idempotency_key=None, max_attempts=5, delay_seconds=0):
+    """
+    Queues a job and returns it. If a job with the same idempotency_key exists, returns that one instead;
+    if that job has failed for good, it is queued again first (fresh attempts, this call's payload).
+    """
+    if name not in _tasks:
+        raise ValueError(f"unknown task: {name}")
+    fields = {"name": name, "payload": payload or {}, "max_attempts": max_attempts,
+              "run_after": timezone.now() + timedelta(seconds=delay_seconds)}
+    if idempotency_key is None:
+        return Job.objects.create(**fields)
+    try:
+        with transaction.atomic():
+            return Job.objects.create(idempotency_key=idempotency_key, **fields)
+    except IntegrityError: # already queued (or done) under this key
+        # conditional on the status, so concurrent callers re-queue a failed job only once
+        Job.objects.filter(idempotency_key=idempotency_key, status=Job.FAILED).update(
+            status=Job.QUEUED, attempts=0, result=None, last_error=None, finished_at=None, **fields)
+        return Job.objects.get(idempotency_key=idempotency_key)
+
+def claim_jobs(worker_id, limit):
+    """
+    Marks up to `limit` due jobs as running for this worker and returns them.
+    Rows are locked with SKIP LOCKED where supported, so concurrent workers never claim the same job.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, "JOBS_LEASE_SECONDS", 600))
+    with transaction.atomic():
+        due = (Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+               | Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - lease)) # worker died mid-job
+        jobs = list(due.select_for_update(skip_locked=True).order_by("run_after", "id")[:limit])
+        for job in jobs:
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.locked_by = worker_id
+            job.locked_at = now
+        Job.objects.bulk_update(jobs, ["status", "attempts", "locked_by", "locked_at"])
+    return jobs
+
+def run_task(name, payload):
+    """
+    Runs a task (in a pool process) and returns ("ok", result) or ("error", traceback), so nothing needs pickling but strings.
+    """
+    try:
+        return "ok", get_task(name)(**payload)
+    except Exception:
+        return "error", traceback.format_exc()
+
+def backoff_seconds(attempts):
+    base = getattr(settings, "JOBS_RETRY_BASE_SECONDS", 10)
+    return min(base * 2 ** (attempts - 1), getattr(settings, "JOBS_RETRY_MAX_SECONDS", 3600))
+
+def record_outcome(job, outcome, value):
+    """
+    Saves the result of a claimed job: succeeded, queued again after a backoff, or failed for good.
+    """
+    now = timezone.now()
+    job.locked_by = job.locked_at = None
+    if outcome == "ok":
+        job.status, job.result, job.finished_at = Job.SUCCEEDED, value, now
+    elif job.attempts < job.max_attempts:
+        job.status, job.last_error = Job.QUEUED, value
+        job.run_after = now + timedelta(seconds=backoff_seconds(job.attempts))
+    else:
+        job.status, job.last_error, job.finished_at = Job.FAILED, value, now
+    job.save()
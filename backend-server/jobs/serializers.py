@@ -0,0 +1,9 @@
+from rest_framework import serializers
+from .models import Job
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ["id", "name", "payload", "idempotency_key", "status", "attempts", "max_attempts",
+                  "run_after", "result", "last_error", "created_at", "finished_at"]
+        read_only_fields = fields
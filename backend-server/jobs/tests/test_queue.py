@@ -0,0 +1,92 @@
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from jobs.models import Job
+from jobs.queue import task, enqueue, claim_jobs, record_outcome, run_task
+
+calls = []
+
+@task("tests.record")
+def record(value):
+    calls.append(value)
+    return {"value": value}
+
+@task("tests.fail")
+def fail():
+    raise RuntimeError("boom")
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+# +++ TESTS +++
+
+@pytest.mark.django_db
+def test_enqueue_is_idempotent_per_key():
+    first = enqueue("tests.record", {"value": 1}, idempotency_key="session-1-report")
+    second = enqueue("tests.record", {"value": 2}, idempotency_key="session-1-report")
+
+    assert first.id == second.id
+    assert Job.objects.count() == 1
+
+@pytest.mark.django_db
+def test_enqueue_requeues_a_failed_job_under_its_key():
+    job = enqueue("tests.fail", idempotency_key="session-1-report", max_attempts=1)
+    call_command("run_jobs", "--once", "--processes", "0")
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+
+    again = enqueue("tests.record", {"value": 3}, idempotency_key="session-1-report")
+    assert again.id == job.id
+    assert (again.status, again.attempts, again.last_error, again.payload) == (Job.QUEUED, 0, None, {"value": 3})
+    call_command("run_jobs", "--once", "--processes", "0")
+    assert calls == [3]
+    assert enqueue("tests.record", {"value": 4}, idempotency_key="session-1-report").status == Job.SUCCEEDED
+
+@pytest.mark.django_db
+def test_enqueue_rejects_unknown_task():
+    with pytest.raises(ValueError):
+        enqueue("tests.nope")
+
+@pytest.mark.django_db
+def test_worker_runs_due_jobs_inline():
+    job = enqueue("tests.record", {"value": 7})
+    later = enqueue("tests.record", {"value": 8}, delay_seconds=3600)
+
+    call_command("run_jobs", "--once", "--processes", "0")
+
+    job.refresh_from_db()
+    later.refresh_from_db()
+    assert calls == [7]
+    assert job.status == Job.SUCCEEDED and job.result == {"value": 7} and job.attempts == 1
+    assert later.status == Job.QUEUED
+
+@pytest.mark.django_db
+def test_failed_job_retries_with_backoff_then_fails(settings):
+    settings.JOBS_RETRY_BASE_SECONDS = 10
+    job = enqueue("tests.fail", max_attempts=2)
+
+    [claimed] = claim_jobs("worker-1", limit=5)
+    assert claim_jobs("worker-2", limit=5) == [] # already running
+    before = timezone.now()
+    record_outcome(claimed, *run_task(claimed.name, claimed.payload))
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+    assert "boom" in job.last_error
+    assert (job.run_after - before).total_seconds() == pytest.approx(10, abs=1)
+
+    Job.objects.filter(id=job.id).update(run_after=timezone.now())
+    [claimed] = claim_jobs("worker-1", limit=5)
+    record_outcome(claimed, *run_task(claimed.name, claimed.payload))
+    job.refresh_from_db()
+    assert job.status == Job.FAILED and job.attempts == 2
+
+@pytest.mark.django_db
+def test_stale_running_job_is_reclaimed(settings):
+    settings.JOBS_LEASE_SECONDS = 60
+    job = enqueue("tests.record", {"value": 1})
+    claim_jobs("dead-worker", limit=1)
+    Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timezone.timedelta(minutes=5))
+
+    [claimed] = claim_jobs("worker-2", limit=1)
+    assert claimed.id == job.id and claimed.locked_by == "worker-2" and claimed.attempts == 2
@@ -0,0 +1,39 @@
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from accounts.models import CustomUser
+from jobs.models import Job
+from jobs.queue import enqueue
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def doctor_user(db):
+    return CustomUser.objects.create_user(email="doc@example.com", username="doc", password="pass", is_doctor=True)
+
+@pytest.fixture
+def patient_user(db):
+    return CustomUser.objects.create_user(email="pat@example.com", username="pat", password="pass", is_patient=True)
+
+# +++ TESTS +++
+
+@pytest.mark.django_db
+def test_doctor_can_see_job_status_by_session(api_client, doctor_user):
+    job = enqueue("gamesession.generate_report", {"session_id": 42}, idempotency_key="session-42-report")
+    enqueue("gamesession.generate_report", {"session_id": 43})
+    api_client.force_authenticate(user=doctor_user)
+
+    response = api_client.get(reverse("job-list"), {"session": 42})
+    assert response.status_code == 200
+    assert [j["id"] for j in response.data] == [job.id]
+
+    response = api_client.get(reverse("job-detail", args=[job.id]))
+    assert response.status_code == 200
+    assert response.data["status"] == Job.QUEUED
+
+@pytest.mark.django_db
+def test_patient_cannot_see_jobs(api_client, patient_user):
+    api_client.force_authenticate(user=patient_user)
+    assert api_client.get(reverse("job-list")).status_code == 403
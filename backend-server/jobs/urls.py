@@ -0,0 +1,8 @@
+from django.urls import path
+from jobs.views import JobListView, JobDetailView
+
+# /api/jobs/...
+urlpatterns = [
+    path('', JobListView.as_view(), name='job-list'), # doctor or admin
+    path('<int:job_id>/', JobDetailView.as_view(), name='job-detail'), # doctor or admin
+]
@@ -0,0 +1,52 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from .models import Job
+from .serializers import JobSerializer
+
+# Create your views here.
+
+def can_view_jobs(user):
+    return user.is_staff or user.is_doctor
+
+class JobListView(APIView):
+    """
+    For doctors and admin.
+    Returns the 100 most recent jobs, optionally filtered by ?status=, ?name= and ?session= (payload session_id).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not can_view_jobs(request.user):
+            return Response("doctor or admin only action", status=status.HTTP_403_FORBIDDEN)
+
+        jobs = Job.objects.order_by("-created_at")
+        for param, lookup in (("status", "status"), ("name", "name"), ("session", "payload__session_id")):
+            value = request.query_params.get(param)
+            if value is not None:
+                if param == "session":
+                    if not value.isdigit():
+                        return Response({"session": "A valid integer is required."}, status=status.HTTP_400_BAD_REQUEST)
+                    value = int(value)
+                jobs = jobs.filter(**{lookup: value})
+
+        serializer = JobSerializer(jobs[:100], many=True)
+        return Response(serializer.data)
+
+class JobDetailView(APIView):
+    """
+    For doctors and admin.
+    Returns the status of one job.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        if not can_view_jobs(request.user):
+            return Response("doctor or admin only action", status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            job = Job.objects.get(id=job_id)
+        except Job.DoesNotExist:
+            return Response({"error": f"job with ID {job_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(JobSerializer(job).data)
@@ -0,0 +1,76 @@
+"""
+Per-endpoint request histograms, kept in memory by each server process and exposed in Prometheus text format
+(GET /api/metrics/, see monitoring/views.py). Recorded by monitoring.middleware.RequestMetricsMiddleware.
+With several server processes, each reports its own counts; Prometheus sums them per scrape target.
+"""
+import threading
+from bisect import bisect_left
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# name: (help, buckets)
+HISTOGRAMS = {
+    "api_request_duration_seconds": ("Total time to produce the response.", SECONDS_BUCKETS),
+    "api_db_duration_seconds": ("Time spent in database queries.", SECONDS_BUCKETS),
+    "api_db_queries": ("Database queries per request.", QUERY_BUCKETS),
+    "api_serialize_duration_seconds": ("Time spent rendering the response body (e.g. JSON).", SECONDS_BUCKETS),
+}
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # last one is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {} # (name, endpoint, method) -> Histogram
+
+    def observe(self, endpoint, method, values):
+        """
+        values: {histogram name: value} for one request.
+        """
+        with self.lock:
+            for name, value in values.items():
+                key = (name, endpoint, method)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(HISTOGRAMS[name][1])
+                self.histograms[key].observe(value)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def render(self):
+        """
+        Returns all histograms in the Prometheus text exposition format.
+        """
+        with self.lock:
+            snapshot = {key: (list(h.counts), h.sum) for key, h in self.histograms.items()}
+
+        lines = []
+        for name, (help_text, buckets) in HISTOGRAMS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, endpoint, method), (counts, total) in sorted(snapshot.items()):
+                if metric != name:
+                    continue
+                labels = f'endpoint="{_escape(endpoint)}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ["+Inf"], counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {total}")
+                lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+registry = MetricsRegistry()
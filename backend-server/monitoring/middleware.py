@@ -0,0 +1,86 @@
+"""
+Records, for every API request: DB query count, DB time, serialization (response rendering) time and total time,
+into per-endpoint histograms (monitoring/metrics.py). Endpoints are labeled by URL route, e.g.
+"api/gamesession/sessions/<int:session_id>/end/", so ids don't multiply the series.
+
+Optional per-request output (settings):
+    API_METRICS_HEADERS   add Server-Timing and X-DB-Query-Count response headers (readable in browser dev tools)
+    API_METRICS_LOG       log every request's numbers to the "monitoring" logger (DEBUG)
+    API_METRICS_MAX_QUERIES / API_METRICS_SLOW_SECONDS
+                          log a WARNING for requests above these, to catch N+1 queries and slow views
+"""
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import registry
+
+logger = logging.getLogger("monitoring")
+
+class QueryTimer:
+    """
+    Database execute wrapper counting queries and the time spent in them.
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        request._metrics_serialize_seconds = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        endpoint = match.route if match is not None else "unmatched"
+        serialize = request._metrics_serialize_seconds
+        registry.observe(endpoint, request.method, {
+            "api_request_duration_seconds": total,
+            "api_db_duration_seconds": queries.seconds,
+            "api_db_queries": queries.count,
+            "api_serialize_duration_seconds": serialize,
+        })
+
+        if getattr(settings, "API_METRICS_HEADERS", False):
+            response["Server-Timing"] = (f'db;dur={queries.seconds * 1000:.1f};desc="{queries.count} queries", '
+                                         f"serialize;dur={serialize * 1000:.1f}, total;dur={total * 1000:.1f}")
+            response["X-DB-Query-Count"] = str(queries.count)
+
+        message = "%s %s: %d queries, db %.1f ms, serialize %.1f ms, total %.1f ms"
+        args = (request.method, endpoint, queries.count, queries.seconds * 1000, serialize * 1000, total * 1000)
+        max_queries = getattr(settings, "API_METRICS_MAX_QUERIES", None)
+        slow_seconds = getattr(settings, "API_METRICS_SLOW_SECONDS", None)
+        if (max_queries is not None and queries.count > max_queries) or (slow_seconds is not None and total > slow_seconds):
+            logger.warning(message, *args)
+        elif getattr(settings, "API_METRICS_LOG", False):
+            logger.debug(message, *args)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook; time it from here to the post-render callback
+        rendering_started = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_serialize_seconds += time.perf_counter() - rendering_started
+
+        response.add_post_render_callback(rendered)
+        return response
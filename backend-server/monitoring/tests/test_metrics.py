@@ -0,0 +1,69 @@
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from accounts.models import CustomUser
+from monitoring.metrics import MetricsRegistry, registry
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def admin_user(db):
+    return CustomUser.objects.create_user(email="admin@example.com", username="admin", password="pass", is_staff=True)
+
+@pytest.fixture
+def patient_user(db):
+    return CustomUser.objects.create_user(email="pat@example.com", username="pat", password="pass", is_patient=True)
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    registry.reset()
+    yield
+    registry.reset()
+
+# +++ Tests +++ #
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    metrics = MetricsRegistry()
+    for count in (0, 3, 3, 700):
+        metrics.observe("api/x/<int:id>/", "GET", {"api_db_queries": count})
+
+    text = metrics.render()
+    assert "# TYPE api_db_queries histogram" in text
+    assert 'api_db_queries_bucket{endpoint="api/x/<int:id>/",method="GET",le="0"} 1' in text
+    assert 'api_db_queries_bucket{endpoint="api/x/<int:id>/",method="GET",le="5"} 3' in text
+    assert 'api_db_queries_bucket{endpoint="api/x/<int:id>/",method="GET",le="+Inf"} 4' in text
+    assert 'api_db_queries_sum{endpoint="api/x/<int:id>/",method="GET"} 706' in text
+
+@pytest.mark.django_db
+def test_requests_are_recorded_per_route(settings, api_client, admin_user, patient_user):
+    settings.API_METRICS_HEADERS = True
+    api_client.force_authenticate(user=patient_user)
+    response = api_client.get(reverse("get_my_sessions"))
+    assert int(response["X-DB-Query-Count"]) >= 1
+    assert "serialize;dur=" in response["Server-Timing"]
+
+    api_client.force_authenticate(user=admin_user)
+    text = api_client.get(reverse("metrics")).content.decode()
+    assert 'api_request_duration_seconds_count{endpoint="api/gamesession/sessions/me/",method="GET"} 1' in text
+    assert 'api_db_queries_count{endpoint="api/gamesession/sessions/me/",method="GET"} 1' in text
+
+@pytest.mark.django_db
+def test_metrics_are_for_admins_or_the_scraper_token(settings, api_client, patient_user):
+    settings.API_METRICS_TOKEN = "scrape-secret"
+    url = reverse("metrics")
+    assert api_client.get(url).status_code in (401, 403)
+    assert api_client.get(url, HTTP_X_METRICS_TOKEN="wrong").status_code in (401, 403)
+    assert api_client.get(url, HTTP_X_METRICS_TOKEN="scrape-secret").status_code == 200
+
+    api_client.force_authenticate(user=patient_user)
+    assert api_client.get(url).status_code == 403
+
+@pytest.mark.django_db
+def test_requests_over_the_query_budget_are_logged(settings, caplog, api_client, patient_user):
+    settings.API_METRICS_MAX_QUERIES = 0
+    api_client.force_authenticate(user=patient_user)
+    with caplog.at_level("WARNING", logger="monitoring"):
+        api_client.get(reverse("get_my_sessions"))
+    assert "GET api/gamesession/sessions/me/" in caplog.text
@@ -0,0 +1,7 @@
+from django.urls import path
+from monitoring.views import MetricsView
+
+# /api/metrics/
+urlpatterns = [
+    path('', MetricsView.as_view(), name='metrics'), # admin or scraper token; Prometheus text format
+]
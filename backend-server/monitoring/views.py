@@ -0,0 +1,29 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.permissions import BasePermission, IsAdminUser
+from rest_framework.views import APIView
+
+from .metrics import registry
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class HasMetricsToken(BasePermission):
+    """
+    Lets a scraper in with "X-Metrics-Token: <settings.API_METRICS_TOKEN>" (Prometheus can't log in for a JWT).
+    """
+    def has_permission(self, request, view):
+        expected = getattr(settings, "API_METRICS_TOKEN", None)
+        given = request.headers.get("X-Metrics-Token")
+        return bool(expected and given and hmac.compare_digest(expected, given))
+
+class MetricsView(APIView):
+    """
+    For admin (staff) users and the metrics scraper.
+    Returns per-endpoint request, DB and serialization histograms in Prometheus text format.
+    """
+    permission_classes = [IsAdminUser | HasMetricsToken]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
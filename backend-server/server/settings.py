@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -41,11 +42,14 @@ INSTALLED_APPS = [
     'accounts',
     'dashboards',
     'gamesession',
+    'jobs',
+    'monitoring',
     'rest_framework',
     'rest_framework_simplejwt.token_blacklist',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.RequestMetricsMiddleware', # first, so its timing covers every other middleware
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -145,4 +149,49 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
-}
\ No newline at end of file
+}
+# EEG WebSocket ingestion (gamesession/streaming.py): buffered readings are written when
+# this many have accumulated, or when the oldest buffered row has waited this long
+EEG_STREAM_FLUSH_ROWS = 500
+EEG_STREAM_FLUSH_SECONDS = 1.0
+
+# Ingest writer (gamesession/writers.py): CopyWriter uses COPY FROM STDIN (binary) on PostgreSQL and falls back
+# to bulk_create on other databases; BulkCreateWriter always uses the ORM
+EEG_INGEST_WRITER = 'gamesession.writers.CopyWriter'
+
+# EEG-Reading partitions and retention (gamesession/partitions.py, manage.py eeg_partitions): monthly partitions are
+# created this many months ahead; readings older than EEG_RETENTION_MONTHS (None: keep forever) are archived to
+# compressed .npz files in EEG_ARCHIVE_DIR and their partitions dropped, and so are compacted readings and raw chunks
+EEG_PARTITION_MONTHS_AHEAD = 3
+EEG_RETENTION_MONTHS = None
+EEG_ARCHIVE_DIR = BASE_DIR / 'eeg-archive'
+
+# Request metrics (monitoring/middleware.py, GET /api/metrics/): Server-Timing headers in development,
+# warnings for requests with more queries or more time than these; scrapers authenticate with API_METRICS_TOKEN
+API_METRICS_HEADERS = DEBUG
+API_METRICS_LOG = False
+API_METRICS_MAX_QUERIES = 50
+API_METRICS_SLOW_SECONDS = 1.0
+API_METRICS_TOKEN = os.environ.get('API_METRICS_TOKEN')
+
+# Live session feed (gamesession/broker.py): in-process pub/sub; replace with a shared broker
+# backend (same publish/subscribe interface) when running more than one server process
+EEG_LIVE_BROKER = 'gamesession.broker.InProcessBroker'
+
+# Session reports (gamesession/reports.py): attention/meditation above this count as "time above threshold"
+# (Unity sends eSense values scaled to 0..1); reading intervals longer than REPORT_GAP_SECONDS are data gaps
+REPORT_ESENSE_THRESHOLD = 0.6
+REPORT_GAP_SECONDS = 2.0
+
+# .npz export (gamesession/export.py): rows fetched and written per chunk; bounds the memory an export uses
+EEG_EXPORT_CHUNK_ROWS = 10000
+
+# Compaction (gamesession/compaction.py): an ended session's readings are packed into one compressed blob this many
+# seconds after it ends (None: only by manage.py compact_sessions)
+EEG_COMPACT_AFTER_SECONDS = None
+
+# Background jobs (jobs/queue.py): failed jobs retry after JOBS_RETRY_BASE_SECONDS * 2^(attempt-1), capped;
+# a running job whose worker has been silent for JOBS_LEASE_SECONDS is handed to another worker
+JOBS_RETRY_BASE_SECONDS = 10
+JOBS_RETRY_MAX_SECONDS = 3600
+JOBS_LEASE_SECONDS = 600
@@ -22,4 +22,6 @@ urlpatterns = [
     path('api/accounts/', include('accounts.urls')), # accounts/hello
     path('api/dashboards/', include('dashboards.urls')),
     path('api/gamesession/', include('gamesession.urls')),
+    path('api/jobs/', include('jobs.urls')),
+    path('api/metrics/', include('monitoring.urls')),
 ]
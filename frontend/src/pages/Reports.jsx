@@ -2,7 +2,8 @@
 import { useEffect, useState } from "react";
 import { LineChart, Line, XAxis, YAxis, Tooltip, Legend, CartesianGrid, ResponsiveContainer,  } from "recharts";
 import jsPDF from "jspdf";
-import { fetchSessions, getSessionsByUserId, getEegBySessionDoctor } from "../services/games.js";
+import { fetchSessions, getSessionsByUserId, getMyEegBySession, getEegBySessionDoctor,
+         getMyDownsampledEeg, getDownsampledEegDoctor } from "../services/games.js";
 
 export default function Reports({ isDoctor = false, patientId, patientName }) {
   const [sessions, setSessions] = useState([]);
@@ -40,7 +41,7 @@ export default function Reports({ isDoctor = false, patientId, patientName }) {
 
   // Helper to convert API session → display row
   const displayRows = sessions.map((s, index) => {
-    const hasEeg = s.eeg_readings && s.eeg_readings.length > 0;
+    const hasEeg = s.reading_count > 0;
 
     const date =
       s.start_time
@@ -63,7 +64,7 @@ export default function Reports({ isDoctor = false, patientId, patientName }) {
   });
 
   function transformEegToChartData(eegReadings) {
-    // If data is dense downsample later
+    // data is already downsampled by the server
     return eegReadings.map((r, idx) => ({
       index: idx + 1,
       time: new Date(r.timestamp).toLocaleTimeString("en-US", {
@@ -79,9 +80,9 @@ export default function Reports({ isDoctor = false, patientId, patientName }) {
 
   async function fetchEegDataForSession(sessionId) {
     if (!isDoctor) {
-      // PATIENT: use the EEG readings already embedded in the session object
-      const session = sessions.find((s) => s.id === sessionId);
-      return session?.eeg_readings || [];
+      // PATIENT: session lists only carry a summary, so fetch the readings for this session
+      const eegData = await getMyEegBySession(sessionId);
+      return eegData;
     } else {
       // DOCTOR: use the doctor endpoint
       const eegData = await getEegBySessionDoctor(patientId, sessionId);
@@ -96,7 +97,10 @@ export default function Reports({ isDoctor = false, patientId, patientName }) {
       setGraphLoading(true);
       setGraphOpen(true); // open modal so spinner shows
 
-      const eegData = await fetchEegDataForSession(selectedSessionId);
+      // charts only need the downsampled shape of the session, not every reading
+      const eegData = isDoctor
+        ? await getDownsampledEegDoctor(patientId, selectedSessionId)
+        : await getMyDownsampledEeg(selectedSessionId);
       const chartData = transformEegToChartData(eegData);
       setGraphData(chartData);
     } catch (err) {
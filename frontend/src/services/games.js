@@ -15,6 +15,24 @@ async function jsonOrThrow(res) {
     return res.json();
   }
 
+// EEG endpoints are cursor-paginated: { next, results }. Follows `next` until done.
+// onPage (optional) receives each page's results as it arrives, so long sessions can render progressively.
+const EEG_CHART_FIELDS = "timestamp,attention,meditation";
+
+async function fetchAllEegPages(path, onPage) {
+    const readings = [];
+    let url = `${path}?fields=${EEG_CHART_FIELDS}&page_size=2000`;
+    while (url) {
+      const res = await authFetch(url);
+      const page = await jsonOrThrow(res);
+      readings.push(...page.results);
+      if (onPage) onPage(page.results);
+      // keep requests relative so they still go through the dev proxy
+      url = page.next ? new URL(page.next).pathname + new URL(page.next).search : null;
+    }
+    return readings;
+}
+
 // ---------- GAMES ----------
 
 // GET all games
@@ -73,27 +91,31 @@ export async function getSessionsByUserId(patientId) {
 }
 
 // For patients looking at their own EEG data
-export async function getMyEegBySession(sessionId) {
-  const res = await authFetch(
-    `/api/dashboards/eeg/get_my_eeg_by_session/${sessionId}/`
-  );
-  if (!res.ok) {
-    throw new Error(
-      `Failed to fetch my EEG for session ${sessionId}: HTTP ${res.status}`
-    );
-  }
-  return res.json();
+export async function getMyEegBySession(sessionId, onPage) {
+  return fetchAllEegPages(`/api/gamesession/sessions/me/${sessionId}/eeg/`, onPage);
 }
 
 // For doctors looking at a specific patient's session
-export async function getEegBySessionDoctor(patientId, sessionId) {
-  const res = await authFetch(
-    `/api/dashboards/eeg/get_eeg_by_session_doctor/${patientId}/${sessionId}/`
-  );
-  if (!res.ok) {
-    throw new Error(
-      `Failed to fetch EEG for patient ${patientId} session ${sessionId}: HTTP ${res.status}`
-    );
-  }
-  return res.json();
-}
\ No newline at end of file
+export async function getEegBySessionDoctor(patientId, sessionId, onPage) {
+  return fetchAllEegPages(`/api/gamesession/sessions/${sessionId}/${patientId}/eeg/`, onPage);
+}
+
+// Downsampled EEG for charts: the server keeps each bucket's peaks and returns shared-timestamp columns.
+// Converted back to rows ({ timestamp, attention, meditation }) for the chart.
+async function fetchDownsampledEeg(path, points) {
+  const res = await authFetch(`${path}?points=${points}&channels=attention,meditation`);
+  const { columns } = await jsonOrThrow(res);
+  return columns.timestamp.map((timestamp, i) => ({
+    timestamp,
+    attention: columns.attention[i],
+    meditation: columns.meditation[i],
+  }));
+}
+
+export async function getMyDownsampledEeg(sessionId, points = 600) {
+  return fetchDownsampledEeg(`/api/gamesession/sessions/me/${sessionId}/eeg/downsampled/`, points);
+}
+
+export async function getDownsampledEegDoctor(patientId, sessionId, points = 600) {
+  return fetchDownsampledEeg(`/api/gamesession/sessions/${sessionId}/${patientId}/eeg/downsampled/`, points);
+}